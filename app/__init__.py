@@ -11,27 +11,28 @@ from tna_utilities.string import slugify
 from app.lib.cache import cache
 from app.lib.context_processor import (
     cookie_preference,
-    incident_calendar_count,
-    incident_calendar_duration,
-    incident_calendar_heartbeats,
+    incident_analytics,
     now_iso_8601,
     now_iso_8601_date,
     now_pretty,
+    rollup_calendar,
 )
+from app.lib.heartbeat_store import heartbeat_store
+from app.lib.incidents import pretty_uptime_kuma_status
+from app.lib.metrics import metrics
+from app.lib.server_timing import server_timing
+from app.lib.status_events import status_events
+from app.lib.status_poller import status_poller
 from app.lib.talisman import talisman
 from app.lib.template_filters import (
-    average_incident_time,
-    incident_count,
-    longest_incident_time,
+    heartbeats_version,
     markdown,
     pretty_percentage,
-    pretty_uptime_kuma_status,
     previous_incidents,
     seconds_to_time,
     time_ago,
-    total_incident_time,
-    total_maintenance_time,
 )
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
 
 
 def create_app(config_class):
@@ -69,6 +70,13 @@ def create_app(config_class):
         },
     )
 
+    heartbeat_store.init_app(app)
+    status_poller.init_app(app)
+    status_events.init_app(app)
+    uptime_kuma_pool.init_app(app)
+    server_timing.init_app(app)
+    metrics.init_app(app)
+
     talisman.init_app(
         app,
         content_security_policy=app.config["CONTENT_SECURITY_POLICY"],
@@ -88,9 +96,6 @@ def create_app(config_class):
     def seconds_to_duration(value):
         return seconds_to_duration_raw(value, simplify=True)
 
-    app.add_template_filter(average_incident_time)
-    app.add_template_filter(incident_count)
-    app.add_template_filter(longest_incident_time)
     app.add_template_filter(markdown)
     app.add_template_filter(pretty_date)
     app.add_template_filter(pretty_datetime)
@@ -101,8 +106,7 @@ def create_app(config_class):
     app.add_template_filter(seconds_to_duration)
     app.add_template_filter(slugify)
     app.add_template_filter(time_ago)
-    app.add_template_filter(total_incident_time)
-    app.add_template_filter(total_maintenance_time)
+    app.add_template_filter(heartbeats_version)
 
     @app.context_processor
     def context_processor():
@@ -111,9 +115,8 @@ def create_app(config_class):
             now_iso_8601=now_iso_8601,
             now_iso_8601_date=now_iso_8601_date,
             now_pretty=now_pretty,
-            incident_calendar_heartbeats=incident_calendar_heartbeats,
-            incident_calendar_count=incident_calendar_count,
-            incident_calendar_duration=incident_calendar_duration,
+            incident_analytics=incident_analytics,
+            rollup_calendar=rollup_calendar,
             app_config={
                 "ENVIRONMENT_NAME": app.config.get("ENVIRONMENT_NAME"),
                 "CONTAINER_IMAGE": app.config.get("CONTAINER_IMAGE"),
@@ -123,6 +126,7 @@ def create_app(config_class):
                 "STATUS_PAGE_REFRESH_SECONDS": app.config.get(
                     "STATUS_PAGE_REFRESH_SECONDS"
                 ),
+                "FRAGMENT_CACHE_DURATION": app.config.get("FRAGMENT_CACHE_DURATION"),
             },
             feature={},
         )
@@ -1,6 +1,7 @@
 from flask import current_app
 
 from app.healthcheck import bp
+from app.lib.metrics import CONTENT_TYPE, metrics
 
 
 @bp.route("/live/")
@@ -11,3 +12,12 @@ def healthcheck():
 @bp.route("/version/")
 def healthcheck_version():
     return current_app.config["BUILD_VERSION"]
+
+
+@bp.route("/metrics")
+def healthcheck_metrics():
+    return current_app.response_class(
+        metrics.render(),
+        content_type=CONTENT_TYPE,
+        headers={"Cache-Control": "no-store"},
+    )
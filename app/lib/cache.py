@@ -1,9 +1,175 @@
-from flask import request
-from flask_caching import Cache
+import threading
+import time
+import uuid
+import weakref
+from functools import wraps
+
+from flask import current_app, request
+from flask_caching import Cache, CachedResponse
+
+from app.lib.compression import for_request, precompress
+from app.lib.metrics import metrics
 
 cache = Cache()
 
+_regeneration_locks = weakref.WeakValueDictionary()
+_regeneration_locks_lock = threading.Lock()
+
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 def cache_key_prefix():
     """Make a key that includes GET parameters."""
     return f"{request.path}{'+refresh' if 'refresh' in request.args else ''}"
+
+
+class RegenerationLease:
+    """A lease on regenerating a cached response, shared by every worker on
+    every node that uses the same Redis cache.
+
+    The lease expires after CACHE_REGENERATION_LEASE_DURATION seconds so a
+    worker that dies while holding it can't block the key. With any other
+    cache backend, or if Redis can't be reached, the lease is always granted
+    and only the per-process lock applies."""
+
+    def __init__(self, key):
+        backend = cache.cache
+        self.client = getattr(backend, "_write_client", None)
+        prefix = backend._get_prefix() if self.client is not None else ""
+        self.key = f"{prefix}lease/{key}"
+        self.duration = current_app.config.get("CACHE_REGENERATION_LEASE_DURATION")
+        self.token = None
+
+    def acquire(self):
+        if self.client is None:
+            return True
+        token = uuid.uuid4().hex
+        try:
+            if not self.client.set(
+                self.key, token, nx=True, px=int(self.duration * 1000)
+            ):
+                return False
+        except Exception as e:
+            current_app.logger.warning(f"Failed to take regeneration lease: {e}")
+            return True
+        self.token = token
+        return True
+
+    def release(self):
+        if self.token is None:
+            return
+        try:
+            # only delete the lease if it hasn't expired and been taken by
+            # another worker in the meantime
+            self.client.eval(_RELEASE_LEASE_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            current_app.logger.warning(f"Failed to release regeneration lease: {e}")
+        self.token = None
+
+
+def _timeout(value):
+    return current_app.config.get(value) if isinstance(value, str) else value
+
+
+def _regeneration_lock(key):
+    with _regeneration_locks_lock:
+        lock = _regeneration_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _regeneration_locks[key] = lock
+        return lock
+
+
+def _is_fresh(entry):
+    return entry and entry[0] > time.time()
+
+
+def _is_server_error(rv):
+    return isinstance(rv, CachedResponse) and rv.status_code >= 500
+
+
+def stale_while_revalidate(soft_timeout, hard_timeout, key_prefix=cache_key_prefix):
+    """Cache a view and keep serving the cached response for up to
+    `hard_timeout` seconds, regenerating it once it is older than
+    `soft_timeout` seconds.
+
+    Only one caller regenerates a response at a time, both within a process
+    and, with a Redis cache, across every worker sharing it. Other callers get
+    the stale response while it does, or wait for the new one if nothing has
+    been cached yet. If regenerating fails with a server error the stale
+    response is kept. Timeouts can be seconds or the names of config values.
+
+    Responses are compressed once when they are cached and each caller gets
+    the encoding it accepts."""
+
+    def decorator(f):
+        def regenerate(key, entry, *args, **kwargs):
+            rv = f(*args, **kwargs)
+            now = time.time()
+            soft = _timeout(soft_timeout)
+            hard = max(soft, _timeout(hard_timeout))
+            if isinstance(rv, CachedResponse) and rv.timeout:
+                soft = hard = rv.timeout
+            if entry and _is_server_error(rv):
+                cache.set(
+                    key,
+                    (now + soft, entry[1], entry[2]),
+                    timeout=max(1, int(entry[1] - now)),
+                )
+                return entry[2]
+            rv = precompress(rv)
+            cache.set(key, (now + soft, now + hard, rv), timeout=hard)
+            return rv
+
+        def cached(*args, **kwargs):
+            key = f"swr/{key_prefix()}"
+            entry = cache.get(key)
+            if _is_fresh(entry):
+                metrics.count_page_cache("hit")
+                return entry[2]
+            lock = _regeneration_lock(key)
+            if not lock.acquire(blocking=entry is None):
+                # another caller in this process is regenerating the response
+                metrics.count_page_cache("stale")
+                return entry[2]
+            try:
+                if entry is None:
+                    # the caller that held the lock may have cached a response
+                    entry = cache.get(key)
+                    if _is_fresh(entry):
+                        metrics.count_page_cache("hit")
+                        return entry[2]
+                lease = RegenerationLease(key)
+                deadline = time.monotonic() + lease.duration
+                while not lease.acquire():
+                    # another worker is regenerating the response
+                    if entry:
+                        metrics.count_page_cache("stale")
+                        return entry[2]
+                    if time.monotonic() > deadline:
+                        break
+                    time.sleep(0.1)
+                    entry = cache.get(key)
+                    if _is_fresh(entry):
+                        metrics.count_page_cache("hit")
+                        return entry[2]
+                metrics.count_page_cache("miss")
+                try:
+                    return regenerate(key, entry, *args, **kwargs)
+                finally:
+                    lease.release()
+            finally:
+                lock.release()
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            return for_request(cached(*args, **kwargs))
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,74 @@
+import gzip
+
+from flask import Response, current_app, request
+from werkzeug.datastructures import Headers
+
+COMPRESSIBLE_MIMETYPES = {"text/html", "text/plain", "application/json"}
+
+
+def _brotli():
+    # fall back to gzip alone if brotli has been left out of the environment
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def precompress(rv):
+    """Compress a response that is about to be cached with each encoding that
+    is available, so that compressing it is paid for once per cache fill
+    rather than once per request.
+
+    Only successful text responses of at least CACHE_COMPRESS_MIN_SIZE bytes
+    are compressed, and brotli is only used if it is installed."""
+    min_size = current_app.config.get("CACHE_COMPRESS_MIN_SIZE")
+    if (
+        not min_size
+        or not isinstance(rv, Response)
+        or rv.status_code != 200
+        or rv.mimetype not in COMPRESSIBLE_MIMETYPES
+        or rv.direct_passthrough
+        or "Content-Encoding" in rv.headers
+    ):
+        return rv
+    body = rv.get_data()
+    if len(body) < min_size:
+        return rv
+    variants = {}
+    brotli = _brotli()
+    if brotli:
+        variants["br"] = brotli.compress(
+            body, quality=current_app.config.get("CACHE_BROTLI_QUALITY")
+        )
+    variants["gzip"] = gzip.compress(
+        body, compresslevel=current_app.config.get("CACHE_GZIP_LEVEL"), mtime=0
+    )
+    rv.precompressed = variants
+    return rv
+
+
+def encoded_etags(etag):
+    """The ETags a response can have once it has been encoded."""
+    return [etag, f"{etag}-br", f"{etag}-gzip"]
+
+
+def for_request(rv):
+    """Pick the compressed variant of a cached response that the client
+    prefers, or the uncompressed response if it doesn't accept any."""
+    variants = getattr(rv, "precompressed", None)
+    if not variants:
+        return rv
+    encoding = request.accept_encodings.best_match(list(variants))
+    if not encoding:
+        rv.vary.add("Accept-Encoding")
+        return rv
+    response = current_app.response_class(
+        variants[encoding], status=rv.status, headers=Headers(rv.headers)
+    )
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    etag, weak = rv.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
@@ -0,0 +1,108 @@
+import datetime
+import hashlib
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+from werkzeug.http import is_resource_modified
+
+from app.lib.cache import cache, cache_key_prefix
+from app.lib.compression import encoded_etags
+
+
+def _etag(data_version):
+    # the same data renders differently in different builds and with
+    # different query strings, such as ?refresh
+    return hashlib.sha256(
+        "\n".join(
+            [
+                str(current_app.config.get("BUILD_VERSION")),
+                request.path,
+                request.query_string.decode(),
+                str(data_version),
+            ]
+        ).encode()
+    ).hexdigest()[:32]
+
+
+def epoch_ms_to_datetime(epoch_ms):
+    """Turn a heartbeat version, in milliseconds since the epoch, into a time
+    that can be used for Last-Modified."""
+    if not epoch_ms:
+        return None
+    return datetime.datetime.fromtimestamp(epoch_ms / 1000, datetime.timezone.utc)
+
+
+def conditional_get(validators):
+    """Answer conditional requests for a view from the version of the data it
+    shows, without calling the view or rendering anything when the client
+    already has that version.
+
+    `validators` is called with the view's arguments and returns the data
+    version and the time it last changed, or None if they aren't known. The
+    view should pass what it renders through :func:`with_validators` so that a
+    response that was cached before the data changed is tagged with the version
+    it was rendered from, not the current one."""
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            current = validators(*args, **kwargs)
+            g.conditional_validators = None
+            if current:
+                data_version, last_modified = current
+                etag = _etag(data_version)
+                g.conditional_validators = (etag, last_modified)
+                # the client may have a compressed copy, which has its own ETag
+                for candidate in encoded_etags(etag):
+                    if not is_resource_modified(
+                        request.environ, etag=candidate, last_modified=last_modified
+                    ):
+                        response = with_validators(("", 304))
+                        response.set_etag(candidate)
+                        response.vary.add("Accept-Encoding")
+                        return response
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and response.get_etag()[0]:
+                response.make_conditional(request)
+            return response
+
+        return decorated_function
+
+    return decorator
+
+
+def with_validators(rv):
+    """Tag a response with the ETag and Last-Modified time of the data it is
+    being rendered from."""
+    response = make_response(rv)
+    validators = g.get("conditional_validators")
+    if validators:
+        etag, last_modified = validators
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _saved_validators_key():
+    return f"validators/{cache_key_prefix()}"
+
+
+def save_validators(data_version, last_modified, timeout):
+    """Tag the response being rendered with the version of the data it shows,
+    for views that only know that version once they have fetched their data,
+    and keep the version for `timeout` seconds so :func:`saved_validators` can
+    answer conditional requests without fetching anything.
+
+    `timeout` should be no longer than the view is cached for before being
+    rendered again, so that a stale page goes through the view."""
+    g.conditional_validators = (_etag(data_version), last_modified)
+    cache.set(_saved_validators_key(), (data_version, last_modified), timeout=timeout)
+
+
+def saved_validators(*args, **kwargs):
+    """Get the data version and last modified time kept by
+    :func:`save_validators` for this page, or None if it hasn't been rendered
+    recently."""
+    return cache.get(_saved_validators_key())
@@ -0,0 +1,253 @@
+import datetime
+import json
+import math
+
+from tna_utilities.datetime import pretty_date, pretty_datetime
+
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+
+
+class PingSketch:
+    """A histogram of response times in bins that are each 5% wider than the
+    last, so percentiles can be estimated to within a few percent from a few
+    hundred numbers. Sketches are merged by adding their counts together."""
+
+    GROWTH = 1.05
+
+    def __init__(self, counts=None):
+        self.counts = counts or {}
+
+    def add(self, ping):
+        bin_ = 0 if ping <= 1 else math.ceil(math.log(ping, self.GROWTH))
+        self.counts[bin_] = self.counts.get(bin_, 0) + 1
+
+    def merge(self, other):
+        for bin_, count in other.counts.items():
+            self.counts[bin_] = self.counts.get(bin_, 0) + count
+
+    def percentile(self, q):
+        total = sum(self.counts.values())
+        if not total:
+            return None
+        rank = q / 100 * (total - 1)
+        seen = 0
+        for bin_ in sorted(self.counts):
+            seen += self.counts[bin_]
+            if seen > rank:
+                break
+        if bin_ == 0:
+            return 1
+        # the middle of the bin, which is never more than 2.5% out
+        return 2 * self.GROWTH**bin_ / (1 + self.GROWTH)
+
+    def to_json(self):
+        return json.dumps(self.counts, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, value):
+        return cls({int(bin_): count for bin_, count in json.loads(value).items()})
+
+
+class HeartbeatRollup:
+    """The heartbeats of one monitor in one hour or day, summarised."""
+
+    __slots__ = (
+        "monitor_id",
+        "start_ms",
+        "period_ms",
+        "up",
+        "down",
+        "pending",
+        "maintenance",
+        "downtime_ms",
+        "ping_count",
+        "ping_total",
+        "ping_min",
+        "ping_max",
+        "ping_sketch",
+        "transitions",
+    )
+
+    def __init__(self, monitor_id, start_ms, period_ms):
+        self.monitor_id = monitor_id
+        self.start_ms = start_ms
+        self.period_ms = period_ms
+        self.up = 0
+        self.down = 0
+        self.pending = 0
+        self.maintenance = 0
+        self.downtime_ms = 0
+        self.ping_count = 0
+        self.ping_total = 0
+        self.ping_min = None
+        self.ping_max = None
+        self.ping_sketch = PingSketch()
+        self.transitions = 0
+
+    @property
+    def start(self):
+        return datetime.datetime(1970, 1, 1) + datetime.timedelta(
+            milliseconds=self.start_ms
+        )
+
+    @property
+    def heartbeats(self):
+        return self.up + self.down + self.pending + self.maintenance
+
+    @property
+    def downtime_seconds(self):
+        return self.downtime_ms // 1000
+
+    @property
+    def average_ping(self):
+        return self.ping_total / self.ping_count if self.ping_count else None
+
+    @property
+    def status(self):
+        """The worst status the monitor had during the period."""
+        if self.down or self.downtime_ms:
+            return MonitorStatus.DOWN
+        if self.maintenance:
+            return MonitorStatus.MAINTENANCE
+        if self.pending:
+            return MonitorStatus.PENDING
+        return MonitorStatus.UP
+
+    def percentile_ping(self, q):
+        return self.ping_sketch.percentile(q)
+
+    def add(self, status, ping):
+        if status == 0:
+            self.down += 1
+        elif status == 1:
+            self.up += 1
+        elif status == 2:
+            self.pending += 1
+        elif status == 3:
+            self.maintenance += 1
+        if ping is not None:
+            self.ping_count += 1
+            self.ping_total += ping
+            self.ping_min = ping if self.ping_min is None else min(self.ping_min, ping)
+            self.ping_max = ping if self.ping_max is None else max(self.ping_max, ping)
+            self.ping_sketch.add(ping)
+
+    def __repr__(self):
+        return (
+            f"<HeartbeatRollup monitor_id={self.monitor_id} start={self.start} "
+            f"heartbeats={self.heartbeats} status={self.status.name}>"
+        )
+
+
+def rollup_series(series, period_ms, from_ms=0, until_ms=None):
+    """Summarise a series of heartbeats into periods of `period_ms`.
+
+    Only periods from `from_ms` are returned but heartbeats before it still
+    count towards the downtime and status transitions of the first period, so
+    the series should start with the heartbeat before `from_ms` if there is
+    one. A down heartbeat counts as downtime until the next heartbeat, or until
+    `until_ms` for the newest.
+
+    :return: The rollups, oldest first.
+    :rtype: list[HeartbeatRollup]
+    """
+    rollups = {}
+
+    def rollup_at(time_ms):
+        start_ms = time_ms - time_ms % period_ms
+        rollup = rollups.get(start_ms)
+        if rollup is None:
+            rollup = rollups[start_ms] = HeartbeatRollup(
+                series.monitor_id, start_ms, period_ms
+            )
+        return rollup
+
+    times = series.times
+    statuses = series.statuses
+    pings = series.pings
+    count = len(times)
+    for index in range(count):
+        time_ms = times[index]
+        status = statuses[index]
+        if time_ms >= from_ms:
+            rollup = rollup_at(time_ms)
+            rollup.add(status, None if pings[index] < 0 else pings[index])
+            if index and statuses[index - 1] != status:
+                rollup.transitions += 1
+        if status == 0:
+            down_from = max(time_ms, from_ms)
+            down_until = times[index + 1] if index + 1 < count else until_ms
+            while down_until is not None and down_from < down_until:
+                rollup = rollup_at(down_from)
+                period_end_ms = rollup.start_ms + period_ms
+                rollup.downtime_ms += min(down_until, period_end_ms) - down_from
+                down_from = period_end_ms
+    return [rollups[start_ms] for start_ms in sorted(rollups)]
+
+
+class RollupSummary:
+    """The heartbeats and downtime of a monitor over a window, added up from
+    the rollups that cover it."""
+
+    def __init__(self, rollups, from_ms, until_ms):
+        self.heartbeats = 0
+        self.downtime_ms = 0
+        # the time covered by rollups, which leaves out any periods the monitor
+        # had no heartbeats in
+        self.observed_ms = 0
+        for rollup in rollups:
+            self.heartbeats += rollup.heartbeats
+            self.downtime_ms += rollup.downtime_ms
+            self.observed_ms += max(
+                0,
+                min(rollup.start_ms + rollup.period_ms, until_ms)
+                - max(rollup.start_ms, from_ms),
+            )
+
+    @property
+    def downtime_seconds(self):
+        return self.downtime_ms // 1000
+
+    @property
+    def uptime(self):
+        """The fraction of the observed time the monitor wasn't down, or None
+        if no time was observed."""
+        if not self.observed_ms:
+            return None
+        return max(0.0, 1 - self.downtime_ms / self.observed_ms)
+
+
+def rollup_calendar(rollups, days, now=None):
+    """A heartbeat for each of the last `days` days, with the worst status of
+    the day, in the same form as :attr:`IncidentAnalytics.calendar_heartbeats`.
+
+    Pending heartbeats aren't incidents, so like the incident calendar a day
+    with pending heartbeats but no down or maintenance ones is shown as up.
+    """
+    now = now or datetime.datetime.now()
+    statuses = {
+        rollup.start.date(): (
+            MonitorStatus.UP
+            if rollup.status == MonitorStatus.PENDING
+            else rollup.status
+        )
+        for rollup in rollups or []
+        if rollup.period_ms == DAY_MS
+    }
+    calendar = []
+    for index in range(days + 1):
+        day = now - datetime.timedelta(days=days - index)
+        midnight = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        calendar.append(
+            {
+                "time": midnight.isoformat(),
+                "datetime": midnight,
+                "pretty_time": pretty_datetime(midnight),
+                "title": pretty_date(day),
+                "status": statuses.get(day.date(), MonitorStatus.UP),
+            }
+        )
+    return calendar
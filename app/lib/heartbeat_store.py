@@ -0,0 +1,484 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from app.lib.heartbeat_rollups import (
+    DAY_MS,
+    HOUR_MS,
+    HeartbeatRollup,
+    PingSketch,
+    RollupSummary,
+    rollup_series,
+)
+from app.lib.uptime_kuma_api import HeartbeatSeries
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    msg TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS heartbeats (
+    monitor_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    time_ms INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    ping INTEGER,
+    important INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    down_count INTEGER NOT NULL,
+    message_id INTEGER NOT NULL REFERENCES messages (id),
+    PRIMARY KEY (monitor_id, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS heartbeats_by_time ON heartbeats (monitor_id, time_ms);
+CREATE TABLE IF NOT EXISTS monitors (
+    monitor_id INTEGER PRIMARY KEY,
+    max_id INTEGER NOT NULL,
+    complete_from_ms INTEGER NOT NULL,
+    synced_at_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    monitor_id INTEGER NOT NULL,
+    period_ms INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    up INTEGER NOT NULL,
+    down INTEGER NOT NULL,
+    pending INTEGER NOT NULL,
+    maintenance INTEGER NOT NULL,
+    downtime_ms INTEGER NOT NULL,
+    ping_count INTEGER NOT NULL,
+    ping_total INTEGER NOT NULL,
+    ping_min INTEGER,
+    ping_max INTEGER,
+    ping_sketch TEXT NOT NULL,
+    transitions INTEGER NOT NULL,
+    PRIMARY KEY (monitor_id, period_ms, start_ms)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_COLUMNS = (
+    "up",
+    "down",
+    "pending",
+    "maintenance",
+    "downtime_ms",
+    "ping_count",
+    "ping_total",
+    "ping_min",
+    "ping_max",
+    "ping_sketch",
+    "transitions",
+)
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class HeartbeatStore:
+    """A local SQLite copy of the heartbeats of each monitor.
+
+    The first time a monitor's heartbeats are needed the whole window is
+    fetched from Uptime Kuma. After that only the heartbeats since the last
+    sync are fetched and anything with an ID that has already been stored is
+    skipped, so reading a long window costs about the same however often it is
+    asked for. Heartbeats older than the retention period are compacted away.
+
+    Hourly and daily rollups of each monitor's heartbeats are kept alongside
+    them. Only the periods from the newest heartbeat stored before a sync
+    onwards are recalculated, as earlier periods can't change.
+
+    The database is shared by every worker using the same file."""
+
+    def __init__(self, app=None):
+        self._local = threading.local()
+        self._compact_lock = threading.Lock()
+        self._compacted_at = 0
+        self._pid = None
+        self.path = ""
+        self.retention_days = 91
+        self.compact_interval = 3600
+        self.logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.path = app.config.get("HEARTBEAT_STORE_PATH")
+        self.retention_days = app.config.get("HEARTBEAT_STORE_RETENTION_DAYS")
+        self.compact_interval = app.config.get("HEARTBEAT_STORE_COMPACT_SECONDS")
+        self.logger = app.logger
+        self._local = threading.local()
+        self._compacted_at = 0
+        app.extensions["heartbeat_store"] = self
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def connection(self):
+        # connections can't be shared between threads or survive a fork so each
+        # thread in each process opens its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _sync_state(self, monitor_ids):
+        rows = (
+            self.connection()
+            .execute(
+                "SELECT monitor_id, max_id, complete_from_ms, synced_at_ms "
+                "FROM monitors WHERE monitor_id IN "
+                f"({', '.join('?' for _ in monitor_ids)})",
+                list(monitor_ids),
+            )
+            .fetchall()
+        )
+        return {row[0]: row[1:] for row in rows}
+
+    def _hours_to_fetch(self, state, hours, now_ms):
+        """Work out how many hours of heartbeats to ask Uptime Kuma for, which
+        is the whole window unless the store already has all of it."""
+        if state is None:
+            return hours
+        _, complete_from_ms, synced_at_ms = state
+        if complete_from_ms > now_ms - hours * HOUR_MS:
+            return hours
+        # overlap the last sync by an hour in case heartbeats arrived late
+        return min(hours, math.ceil((now_ms - synced_at_ms) / HOUR_MS) + 1)
+
+    def _message_ids(self, connection, messages):
+        connection.executemany(
+            "INSERT OR IGNORE INTO messages (msg) VALUES (?)",
+            [(msg,) for msg in messages],
+        )
+        message_ids = {}
+        for i in range(0, len(messages), 500):
+            chunk = messages[i : i + 500]
+            message_ids.update(
+                connection.execute(
+                    "SELECT msg, id FROM messages WHERE msg IN "
+                    f"({', '.join('?' for _ in chunk)})",
+                    chunk,
+                ).fetchall()
+            )
+        return message_ids
+
+    def ingest(self, series, hours, state=None, now_ms=None):
+        """Store the heartbeats in a series that are newer than any already
+        stored for its monitor.
+
+        :param HeartbeatSeries series: Heartbeats fetched from Uptime Kuma.
+        :param int hours: The number of hours of heartbeats that were fetched.
+        """
+        now_ms = now_ms or _now_ms()
+        fetched_from_ms = now_ms - hours * HOUR_MS
+        max_id, complete_from_ms, _ = state or (0, fetched_from_ms, 0)
+        if fetched_from_ms < complete_from_ms:
+            # the window reaches further back than what is stored so there can
+            # be older heartbeats than the newest one stored to fill in
+            complete_from_ms = fetched_from_ms
+            new = range(len(series))
+        else:
+            new = [i for i, id_ in enumerate(series.ids) if id_ > max_id]
+        connection = self.connection()
+        with connection:
+            (newest_ms,) = connection.execute(
+                "SELECT MAX(time_ms) FROM heartbeats WHERE monitor_id = ?",
+                (series.monitor_id,),
+            ).fetchone()
+            message_ids = self._message_ids(connection, series.messages)
+            connection.executemany(
+                "INSERT OR IGNORE INTO heartbeats (monitor_id, id, time_ms, status, "
+                "ping, important, duration, down_count, message_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        series.monitor_id,
+                        series.ids[i],
+                        series.times[i],
+                        series.statuses[i],
+                        series[i]["ping"],
+                        series.important[i],
+                        series.durations[i],
+                        series.down_counts[i],
+                        message_ids[series.messages[series.message_ids[i]]],
+                    )
+                    for i in new
+                ],
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO monitors "
+                "(monitor_id, max_id, complete_from_ms, synced_at_ms) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    series.monitor_id,
+                    max([max_id] + [series.ids[i] for i in new]),
+                    complete_from_ms,
+                    now_ms,
+                ),
+            )
+            new_times = [series.times[i] for i in new]
+            if new_times or newest_ms is not None:
+                self._update_rollups(
+                    connection,
+                    series.monitor_id,
+                    min(new_times + ([newest_ms] if newest_ms is not None else [])),
+                    now_ms,
+                )
+        return len(new)
+
+    def _update_rollups(self, connection, monitor_id, from_ms, now_ms):
+        day_from_ms = from_ms - from_ms % DAY_MS
+        series = self._read_series(
+            connection, monitor_id, day_from_ms, include_previous=True
+        )
+        for period_ms in [HOUR_MS, DAY_MS]:
+            period_from_ms = from_ms - from_ms % period_ms
+            connection.execute(
+                "DELETE FROM rollups "
+                "WHERE monitor_id = ? AND period_ms = ? AND start_ms >= ?",
+                (monitor_id, period_ms, period_from_ms),
+            )
+            connection.executemany(
+                "INSERT INTO rollups (monitor_id, period_ms, start_ms, "
+                f"{', '.join(ROLLUP_COLUMNS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' for _ in ROLLUP_COLUMNS)})",
+                [
+                    (monitor_id, period_ms, rollup.start_ms)
+                    + tuple(
+                        (
+                            rollup.ping_sketch.to_json()
+                            if column == "ping_sketch"
+                            else getattr(rollup, column)
+                        )
+                        for column in ROLLUP_COLUMNS
+                    )
+                    for rollup in rollup_series(
+                        series, period_ms, period_from_ms, now_ms
+                    )
+                ],
+            )
+
+    def _read_rollups(self, monitor_id, period_ms, from_ms, until_ms=None):
+        rollups = []
+        for row in self.connection().execute(
+            f"SELECT start_ms, {', '.join(ROLLUP_COLUMNS)} FROM rollups "
+            "WHERE monitor_id = ? AND period_ms = ? AND start_ms >= ? "
+            "AND (? IS NULL OR start_ms < ?) ORDER BY start_ms",
+            (monitor_id, period_ms, from_ms, until_ms, until_ms),
+        ):
+            rollup = HeartbeatRollup(monitor_id, row[0], period_ms)
+            for column, value in zip(ROLLUP_COLUMNS, row[1:]):
+                setattr(
+                    rollup,
+                    column,
+                    PingSketch.from_json(value) if column == "ping_sketch" else value,
+                )
+            rollups.append(rollup)
+        return rollups
+
+    def get_rollups(self, monitor_id, period_ms, hours, now_ms=None):
+        """Read the hourly or daily rollups of a monitor that start in the last
+        `hours` hours, oldest first.
+
+        :param int period_ms: Either ``HOUR_MS`` or ``DAY_MS``.
+        """
+        now_ms = now_ms or _now_ms()
+        from_ms = now_ms - hours * HOUR_MS
+        return self._read_rollups(monitor_id, period_ms, from_ms - from_ms % period_ms)
+
+    def get_summary(self, monitor_id, hours, now_ms=None):
+        """Add up the heartbeats and downtime of a monitor in the last `hours`
+        hours from its daily rollups, using hourly rollups for the days at
+        either end of the window that it only partly covers. The window is
+        rounded out to the start of its first hour.
+
+        :rtype: RollupSummary
+        """
+        now_ms = now_ms or _now_ms()
+        from_ms = now_ms - hours * HOUR_MS
+        hour_from_ms = from_ms - from_ms % HOUR_MS
+        today_ms = now_ms - now_ms % DAY_MS
+        first_day_ms = min(-(-from_ms // DAY_MS) * DAY_MS, today_ms)
+        rollups = (
+            self._read_rollups(monitor_id, HOUR_MS, hour_from_ms, first_day_ms)
+            + self._read_rollups(monitor_id, DAY_MS, first_day_ms, today_ms)
+            + self._read_rollups(monitor_id, HOUR_MS, max(today_ms, hour_from_ms))
+        )
+        return RollupSummary(rollups, hour_from_ms, now_ms)
+
+    def _read_series(self, connection, monitor_id, from_ms, include_previous=False):
+        if include_previous:
+            # start from the heartbeat before from_ms, which is still needed to
+            # know the status at from_ms
+            (previous_ms,) = connection.execute(
+                "SELECT MAX(time_ms) FROM heartbeats "
+                "WHERE monitor_id = ? AND time_ms < ?",
+                (monitor_id, from_ms),
+            ).fetchone()
+            if previous_ms is not None:
+                from_ms = previous_ms
+        series = HeartbeatSeries(monitor_id, time_spec="milliseconds")
+        for row in connection.execute(
+            "SELECT h.id, h.time_ms, h.status, h.ping, h.important, h.duration, "
+            "h.down_count, m.msg FROM heartbeats h "
+            "JOIN messages m ON m.id = h.message_id "
+            "WHERE h.monitor_id = ? AND h.time_ms >= ? ORDER BY h.time_ms, h.id",
+            (monitor_id, from_ms),
+        ):
+            series.append_values(*row)
+        return series
+
+    def get_series(self, monitor_id, hours, now_ms=None):
+        """Read the stored heartbeats of a monitor from the last `hours` hours,
+        oldest first."""
+        now_ms = now_ms or _now_ms()
+        return self._read_series(
+            self.connection(), monitor_id, now_ms - hours * HOUR_MS
+        )
+
+    def get_version(self, monitor_ids):
+        """Get the time of the newest stored heartbeat of any of the monitors,
+        in milliseconds since the epoch, or None if there aren't any."""
+        (version,) = (
+            self.connection()
+            .execute(
+                "SELECT MAX(time_ms) FROM heartbeats WHERE monitor_id IN "
+                f"({', '.join('?' for _ in monitor_ids)})",
+                list(monitor_ids),
+            )
+            .fetchone()
+        )
+        return version
+
+    def get_incident_series(self, monitor_id, hours, now_ms=None):
+        """Read only the stored heartbeats of a monitor from the last `hours`
+        hours that are needed to find its incidents, oldest first.
+
+        These are the heartbeats in the hours with down or maintenance
+        heartbeats or downtime, and the heartbeats either side of each run of
+        those hours, so the incidents found are the same as from
+        :meth:`get_series` without reading every heartbeat in the window."""
+        now_ms = now_ms or _now_ms()
+        from_ms = now_ms - hours * HOUR_MS
+        connection = self.connection()
+        runs = []
+        for (start_ms,) in connection.execute(
+            "SELECT start_ms FROM rollups "
+            "WHERE monitor_id = ? AND period_ms = ? AND start_ms >= ? "
+            "AND (down > 0 OR maintenance > 0 OR downtime_ms > 0) ORDER BY start_ms",
+            (monitor_id, HOUR_MS, from_ms - from_ms % HOUR_MS),
+        ):
+            if runs and runs[-1][1] == start_ms:
+                runs[-1][1] = start_ms + HOUR_MS
+            else:
+                runs.append([start_ms, start_ms + HOUR_MS])
+        series = HeartbeatSeries(monitor_id, time_spec="milliseconds")
+        for run_from_ms, run_until_ms in runs:
+            (previous_ms,) = connection.execute(
+                "SELECT MAX(time_ms) FROM heartbeats "
+                "WHERE monitor_id = ? AND time_ms >= ? AND time_ms < ?",
+                (monitor_id, from_ms, run_from_ms),
+            ).fetchone()
+            (next_ms,) = connection.execute(
+                "SELECT MIN(time_ms) FROM heartbeats "
+                "WHERE monitor_id = ? AND time_ms >= ?",
+                (monitor_id, run_until_ms),
+            ).fetchone()
+            read_from_ms = max(
+                from_ms, run_from_ms if previous_ms is None else previous_ms
+            )
+            if len(series):
+                # the heartbeat after one run can also be the one before the next
+                read_from_ms = max(read_from_ms, series.times[-1] + 1)
+            for row in connection.execute(
+                "SELECT h.id, h.time_ms, h.status, h.ping, h.important, "
+                "h.duration, h.down_count, m.msg FROM heartbeats h "
+                "JOIN messages m ON m.id = h.message_id "
+                "WHERE h.monitor_id = ? AND h.time_ms >= ? "
+                "AND (? IS NULL OR h.time_ms <= ?) ORDER BY h.time_ms, h.id",
+                (monitor_id, read_from_ms, next_ms, next_ms),
+            ):
+                series.append_values(*row)
+        return series
+
+    def get_monitors_beats(
+        self, api, ids, hours, max_workers=4, timeout=None, incidents_only=False
+    ):
+        """Bring the stored heartbeats of several monitors up to date from an
+        Uptime Kuma session and return the last `hours` hours of each.
+
+        If `incidents_only` is set only the heartbeats needed to find incidents
+        are returned, as read by :meth:`get_incident_series`.
+
+        :raises Timeout: If Uptime Kuma doesn't send the heartbeats in time.
+        """
+        now_ms = _now_ms()
+        states = self._sync_state(ids)
+        by_hours = {}
+        for id_ in ids:
+            fetch = self._hours_to_fetch(states.get(id_), hours, now_ms)
+            by_hours.setdefault(fetch, []).append(id_)
+        for fetch, fetch_ids in by_hours.items():
+            fetched = api.get_monitors_beats(
+                fetch_ids,
+                fetch,
+                max_workers=max_workers,
+                timeout=timeout,
+                series=True,
+            )
+            for id_, series in fetched.items():
+                self.ingest(series, fetch, states.get(id_), now_ms)
+        self.compact_if_due()
+        read = self.get_incident_series if incidents_only else self.get_series
+        return {id_: read(id_, hours, now_ms) for id_ in ids}
+
+    def compact_if_due(self):
+        with self._compact_lock:
+            if time.monotonic() - self._compacted_at < self.compact_interval:
+                return
+            self._compacted_at = time.monotonic()
+        try:
+            self.compact()
+        except sqlite3.Error as e:
+            if self.logger:
+                self.logger.error(f"Failed to compact heartbeat store: {e}")
+
+    def compact(self, now_ms=None):
+        """Delete heartbeats and rollups older than the retention period and
+        messages that are no longer used, and give the free space back."""
+        cutoff_ms = (now_ms or _now_ms()) - self.retention_days * 86_400_000
+        connection = self.connection()
+        with connection:
+            connection.execute("DELETE FROM heartbeats WHERE time_ms < ?", (cutoff_ms,))
+            connection.execute(
+                "DELETE FROM rollups WHERE start_ms + period_ms <= ?", (cutoff_ms,)
+            )
+            connection.execute(
+                "DELETE FROM messages WHERE id NOT IN "
+                "(SELECT DISTINCT message_id FROM heartbeats)"
+            )
+            connection.execute(
+                "UPDATE monitors SET complete_from_ms = ? WHERE complete_from_ms < ?",
+                (cutoff_ms, cutoff_ms),
+            )
+        connection.execute("PRAGMA incremental_vacuum")
+
+
+heartbeat_store = HeartbeatStore()
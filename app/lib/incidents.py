@@ -0,0 +1,279 @@
+import datetime
+
+from tna_utilities.datetime import pretty_date, pretty_datetime
+
+from app.lib.uptime_kuma_api.heartbeat import heartbeat_datetime
+from app.lib.uptime_kuma_api.heartbeat_series import HeartbeatSeries
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+def pretty_uptime_kuma_status(s):
+    if s == MonitorStatus(0):
+        return {
+            "title": "Issues detected",
+            "accent_colour": "tna-accent-pink",
+            "fontawesome_icon": "fa-circle-xmark",
+            "status_class": "down",
+            "status_code": 0,
+        }
+    if s == MonitorStatus(1):
+        return {
+            "title": "No issues detected",
+            "accent_colour": "tna-accent-green",
+            "fontawesome_icon": "fa-circle-check",
+            "status_class": "up",
+            "status_code": 1,
+        }
+    if s == MonitorStatus(2):
+        return {
+            "title": "Pending…",
+            "accent_colour": "tna-accent-yellow",
+            "fontawesome_icon": "fa-hourglass-half",
+            "status_class": "pending",
+            "status_code": 2,
+        }
+    if s == MonitorStatus(3):
+        return {
+            "title": "Planned maintenance",
+            "accent_colour": "tna-accent-blue",
+            "fontawesome_icon": "fa-wrench",
+            "status_class": "maintenance",
+            "status_code": 3,
+        }
+    return {"title": "Unknown", "accent_colour": "", "fontawesome_icon": "fa-question"}
+
+
+class _NotInTimeOrder(Exception):
+    pass
+
+
+def _newest_first(heartbeats):
+    """Iterate over heartbeats that are ordered oldest first from the newest,
+    stopping as soon as two are out of order or share a time."""
+    newer_time = None
+    for index in range(len(heartbeats) - 1, -1, -1):
+        heartbeat = heartbeats[index]
+        time = heartbeat.get("time", "")
+        if newer_time is not None and time >= newer_time:
+            raise _NotInTimeOrder()
+        newer_time = time
+        yield heartbeat
+
+
+def _incident(start, end, has_start, has_end):
+    end_time = heartbeat_datetime(end) if has_end else datetime.datetime.now()
+    start_time = heartbeat_datetime(start)
+    return {
+        "start": start,
+        "end": end if has_end else None,
+        "has_start": has_start,
+        "has_end": has_end,
+        "duration_seconds": int((end_time - start_time).total_seconds()),
+        "status": pretty_uptime_kuma_status(MonitorStatus(start.get("status"))),
+    }
+
+
+def _find_incidents(statuses, heartbeat_at, count, valid_earliest_heartbeat_start):
+    """Find incidents from the statuses of heartbeats, newest first.
+
+    Incidents are tracked by position in the statuses and heartbeat_at is only
+    called to get the heartbeats that start and end each one."""
+    incidents = []
+    start = None
+    end = None
+    has_start = False
+    has_end = False
+    for index, status in enumerate(statuses):
+        is_incident = status == 0 or status == 3
+        if index == 0 and is_incident:
+            # the newest heartbeat is part of an ongoing incident
+            end = index
+        elif index == count - 1 and is_incident:
+            # the oldest heartbeat is part of an incident that started earlier
+            start = index
+            if valid_earliest_heartbeat_start:
+                has_start = True
+        if end is not None:
+            if not is_incident:
+                start = index - 1 if index > 0 else index
+                has_start = True
+        elif is_incident:
+            end = index - 1 if index > 0 else index
+            has_end = True
+        if start is not None and end is not None:
+            incidents.append(
+                _incident(heartbeat_at(start), heartbeat_at(end), has_start, has_end)
+            )
+            start = None
+            end = None
+            has_start = False
+            has_end = False
+    return incidents
+
+
+def find_incidents(heartbeats, valid_earliest_heartbeat_start=False):
+    """Find the periods where a monitor was down or in maintenance, most recent
+    first.
+
+    Each incident starts at its first down or maintenance heartbeat and ends at
+    the first heartbeat after it that is neither. Incidents with no end are
+    ongoing. The earliest incident is only treated as having a known start if
+    valid_earliest_heartbeat_start is set.
+
+    Heartbeats are expected oldest first, as Uptime Kuma returns them, and are
+    only sorted if they turn out not to be. They can be a list of dicts or a
+    HeartbeatSeries."""
+    if not heartbeats:
+        return []
+    count = len(heartbeats)
+    if isinstance(heartbeats, HeartbeatSeries) and heartbeats.in_time_order():
+        # read the status column directly and only look at whole heartbeats at
+        # the start and end of each incident
+        return _find_incidents(
+            reversed(heartbeats.statuses),
+            lambda index: heartbeats[count - 1 - index],
+            count,
+            valid_earliest_heartbeat_start,
+        )
+    try:
+        return _find_incidents(
+            (heartbeat.get("status") for heartbeat in _newest_first(heartbeats)),
+            lambda index: heartbeats[count - 1 - index],
+            count,
+            valid_earliest_heartbeat_start,
+        )
+    except _NotInTimeOrder:
+        newest_first = sorted(heartbeats, key=lambda x: x.get("time", ""), reverse=True)
+        return _find_incidents(
+            (heartbeat.get("status") for heartbeat in newest_first),
+            lambda index: newest_first[index],
+            count,
+            valid_earliest_heartbeat_start,
+        )
+
+
+class IncidentAnalytics:
+    """Calendars and summary statistics for the incidents in the last `days`
+    days.
+
+    Everything is built together in one pass over the incidents, which are
+    sorted into days once, and one pass over the days."""
+
+    def __init__(self, incidents, days, now=None):
+        now = now or datetime.datetime.now()
+        size = days + 1
+        first_day = (now - datetime.timedelta(days=days)).date()
+        counts = [0] * size
+        durations = [0] * size
+        # the number of down, maintenance and other incidents covering each day,
+        # stored as the change from the previous day
+        covering = {0: [0] * (size + 1), 3: [0] * (size + 1), None: [0] * (size + 1)}
+
+        self.incident_count = 0
+        self.total_incident_time = 0
+        self.longest_incident_time = 0
+        self.total_maintenance_time = 0
+        for incident in incidents or []:
+            status_code = (incident.get("status") or {}).get("status_code")
+            duration = incident.get("duration_seconds", 0)
+            if status_code == 0:
+                self.incident_count += 1
+                self.total_incident_time += duration
+                self.longest_incident_time = max(self.longest_incident_time, duration)
+            elif status_code == 3:
+                self.total_maintenance_time += duration
+
+            start = incident.get("start")
+            if not start or not start.get("time"):
+                continue
+            start_status = start.get("status", None)
+            start_index = (heartbeat_datetime(start).date() - first_day).days
+            if start_status != 3 and 0 <= start_index < size:
+                counts[start_index] += 1
+                durations[start_index] += duration
+
+            end = incident.get("end")
+            end_index = (
+                (heartbeat_datetime(end).date() - first_day).days
+                if end and end.get("time")
+                else start_index
+            )
+            changes = covering[
+                start_status if start_status == 0 or start_status == 3 else None
+            ]
+            spans = (
+                [(start_index, end_index)]
+                if end_index >= start_index
+                else [(start_index, start_index), (end_index, end_index)]
+            )
+            for first, last in spans:
+                first = max(first, 0)
+                last = min(last, size - 1)
+                if first <= last:
+                    changes[first] += 1
+                    changes[last + 1] -= 1
+
+        self.average_incident_time = (
+            self.total_incident_time / self.incident_count if self.incident_count else 0
+        )
+
+        count_calendar = []
+        duration_calendar = []
+        heartbeat_calendar = []
+        down = maintenance = other = 0
+        for index in range(size):
+            day = now - datetime.timedelta(days=days - index)
+            date = day.date()
+            date_iso = date.isoformat()
+            short_date = date.strftime("%-d %b")
+            title = pretty_date(day)
+            count_calendar.append(
+                {
+                    "date": date_iso,
+                    "short_date": short_date,
+                    "pretty_date": title,
+                    "count": counts[index],
+                }
+            )
+            duration_calendar.append(
+                {
+                    "date": date_iso,
+                    "short_date": short_date,
+                    "pretty_date": title,
+                    "duration": durations[index],
+                }
+            )
+            down += covering[0][index]
+            maintenance += covering[3][index]
+            other += covering[None][index]
+            midnight = day.replace(hour=0, minute=0, second=0, microsecond=0)
+            heartbeat_calendar.append(
+                {
+                    "time": midnight.isoformat(),
+                    "datetime": midnight,
+                    "pretty_time": pretty_datetime(midnight),
+                    "title": title,
+                    "status": (
+                        MonitorStatus(0)
+                        if down
+                        else (
+                            MonitorStatus(3)
+                            if maintenance
+                            else MonitorStatus(2) if other else MonitorStatus(1)
+                        )
+                    ),
+                }
+            )
+
+        start_day_offset = first_day.weekday()
+        self.calendar_count = {
+            "calendar": count_calendar,
+            "max_incidents": max(counts),
+            "start_day_offset": start_day_offset,
+        }
+        self.calendar_duration = {
+            "calendar": duration_calendar,
+            "max_duration": max(durations),
+            "start_day_offset": start_day_offset,
+        }
+        self.calendar_heartbeats = heartbeat_calendar
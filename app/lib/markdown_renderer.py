@@ -0,0 +1,48 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from markdown_it import MarkdownIt
+
+
+class MarkdownRenderer:
+    """Convert Markdown to HTML with one shared parser, remembering the HTML
+    for the most recently used pieces of text.
+
+    Incident, maintenance and status page descriptions rarely change between
+    renders, so most calls are answered from the cache. Entries are keyed on a
+    hash of the text so that long descriptions aren't held twice."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._md = MarkdownIt()
+        self._rendered = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, s):
+        key = hashlib.sha256(s.encode()).digest()
+        with self._lock:
+            html = self._rendered.get(key)
+            if html is not None:
+                self._rendered.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+        html = self._md.render(s)
+        with self._lock:
+            self._rendered[key] = html
+            self._rendered.move_to_end(key)
+            while len(self._rendered) > self.max_size:
+                self._rendered.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._rendered.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+markdown_renderer = MarkdownRenderer()
@@ -0,0 +1,280 @@
+import json
+import math
+import os
+import threading
+import time
+
+from flask import (
+    before_render_template,
+    current_app,
+    g,
+    request,
+    template_rendered,
+)
+
+from app.lib.status_poller import status_poller
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
+
+# the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """A count for each combination of label values that only goes up."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _empty(self):
+        return [0.0]
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            values = self._values.setdefault(key, self._empty())
+            values[0] += amount
+
+    def state(self):
+        """The values of the counter as lists that can be saved as JSON."""
+        with self._lock:
+            return [[list(key), list(values)] for key, values in self._values.items()]
+
+    def samples(self, key, values):
+        labels = list(zip(self.labelnames, key))
+        yield f"{self.name}{_format_labels(labels)} {_format_value(values[0])}"
+
+
+class Histogram(Counter):
+    """The number of observations in each bucket, their sum and their count
+    for each combination of label values."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _empty(self):
+        # a count for each bucket, then the sum
+        return [0.0] * (len(self.buckets) + 1)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            values = self._values.setdefault(key, self._empty())
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+                    break
+            values[-1] += value
+
+    def samples(self, key, values):
+        labels = list(zip(self.labelnames, key))
+        cumulative = 0
+        for bound, count in zip(self.buckets, values):
+            cumulative += count
+            bucket_labels = _format_labels(labels + [("le", _format_value(bound))])
+            yield f"{self.name}_bucket{bucket_labels} {_format_value(cumulative)}"
+        yield f"{self.name}_sum{_format_labels(labels)} {_format_value(values[-1])}"
+        yield f"{self.name}_count{_format_labels(labels)} {_format_value(cumulative)}"
+
+
+class Metrics:
+    """Counts page cache results, Uptime Kuma requests and their errors and
+    times template rendering, and exposes them in the Prometheus text format.
+
+    Every worker keeps its own counts. If METRICS_DIR is set, each worker
+    saves its counts to a file in that directory at most every
+    METRICS_FLUSH_SECONDS seconds after handling a request, and the counts of
+    every worker are added up when they are exposed. The directory should be
+    emptied when the app is deployed."""
+
+    def __init__(self, app=None):
+        self.page_cache = Counter(
+            "status_page_cache_requests_total",
+            "Requests for cached pages, by whether the cached page was fresh, "
+            "stale or had to be rendered",
+            ["route", "result"],
+        )
+        self.upstream_seconds = Histogram(
+            "uptime_kuma_request_seconds",
+            "How long requests to Uptime Kuma took",
+            ["client", "name"],
+        )
+        self.upstream_errors = Counter(
+            "uptime_kuma_errors_total",
+            "Requests to Uptime Kuma that failed",
+            ["client", "name"],
+        )
+        self.render_seconds = Histogram(
+            "template_render_seconds",
+            "How long rendering each template took",
+            ["template"],
+        )
+        self.metrics = [
+            self.page_cache,
+            self.upstream_seconds,
+            self.upstream_errors,
+            self.render_seconds,
+        ]
+        self.directory = ""
+        self.flush_seconds = 10
+        self._flushed_at = 0
+        self._flush_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get("METRICS_DIR", "")
+        self.flush_seconds = app.config.get("METRICS_FLUSH_SECONDS", 10)
+        app.extensions["metrics"] = self
+        for listeners, listener in [
+            (status_poller.timing_listeners, self._observe_rest),
+            (uptime_kuma_pool.timing_listeners, self._observe_socketio),
+            (uptime_kuma_pool.session_timing_listeners, self._observe_socketio),
+        ]:
+            if listener not in listeners:
+                listeners.append(listener)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            app.after_request(self._flush_after_request)
+
+    def _observe(self, client, name, seconds, error):
+        self.upstream_seconds.observe(seconds, client=client, name=name)
+        if error is not None:
+            self.upstream_errors.inc(client=client, name=name)
+
+    def _observe_rest(self, path, seconds, error=None):
+        self._observe("rest", path, seconds, error)
+
+    def _observe_socketio(self, name, seconds, error=None):
+        self._observe("socketio", name, seconds, error)
+
+    def _render_started(self, sender, template, context, **extra):
+        g.metrics_render_started = time.perf_counter()
+
+    def _render_finished(self, sender, template, context, **extra):
+        started = g.pop("metrics_render_started", None)
+        if started is not None:
+            self.render_seconds.observe(
+                time.perf_counter() - started, template=template.name
+            )
+
+    def count_page_cache(self, result):
+        """Count a request for a cached page as a "hit", "stale" or "miss"."""
+        self.page_cache.inc(route=request.endpoint, result=result)
+
+    def state(self):
+        return {metric.name: metric.state() for metric in self.metrics}
+
+    @property
+    def _path(self):
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def flush(self):
+        """Save this worker's counts so that other workers can expose them."""
+        if not self.directory:
+            return
+        with self._flush_lock:
+            temporary_path = f"{self._path}.tmp"
+            with open(temporary_path, "w") as f:
+                json.dump(self.state(), f, separators=(",", ":"))
+            os.replace(temporary_path, self._path)
+            self._flushed_at = time.monotonic()
+
+    def _flush_after_request(self, response):
+        if time.monotonic() - self._flushed_at >= self.flush_seconds:
+            try:
+                self.flush()
+            except OSError as e:
+                current_app.logger.warning(f"Failed to save metrics: {e}")
+        return response
+
+    def _worker_states(self):
+        states = [self.state()]
+        if not self.directory:
+            return states
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if not filename.endswith(".json") or path == self._path:
+                continue
+            try:
+                with open(path) as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return states
+
+    def collect(self):
+        """
+        Add up the counts of every worker.
+
+        :return: The values for each combination of label values of each metric.
+        :rtype: dict[str, dict[tuple, list]]
+        """
+        totals = {metric.name: {} for metric in self.metrics}
+        empty = {metric.name: len(metric._empty()) for metric in self.metrics}
+        for state in self._worker_states():
+            for name, entries in state.items():
+                if name not in totals:
+                    continue
+                for key, values in entries:
+                    # skip counts saved by a version with different buckets
+                    if len(values) != empty[name]:
+                        continue
+                    total = totals[name].setdefault(tuple(key), [0.0] * empty[name])
+                    for i, value in enumerate(values):
+                        total[i] += value
+        return totals
+
+    def render(self):
+        """Format every metric, and the age of this worker's status page
+        snapshot, in the Prometheus text format."""
+        totals = self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for key, values in sorted(totals[metric.name].items()):
+                lines.extend(metric.samples(key, values))
+        lines.append(
+            "# HELP status_page_snapshot_age_seconds "
+            "The age of this worker's status page snapshot"
+        )
+        lines.append("# TYPE status_page_snapshot_age_seconds gauge")
+        snapshot = status_poller._snapshot
+        if snapshot:
+            lines.append(f"status_page_snapshot_age_seconds {snapshot.age:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
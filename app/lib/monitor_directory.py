@@ -0,0 +1,55 @@
+from tna_utilities.string import slugify
+
+
+class MonitorDirectory:
+    """Indexes of the monitors on a status page, built once each time the
+    status page data is refreshed.
+
+    Status page monitors can be looked up by slug or ID. Parents and children
+    come from the full monitor list that an Uptime Kuma session receives, which
+    is indexed once for each new list rather than on every lookup."""
+
+    def __init__(self, status_page):
+        self.by_slug = {}
+        self.by_id = {}
+        self.slugs = {}
+        for group in (status_page or {}).get("publicGroupList", []):
+            for monitor in group.get("monitorList", []):
+                slug = slugify(monitor["name"])
+                self.by_slug[slug] = monitor
+                self.by_id[monitor["id"]] = monitor
+                self.slugs[monitor["id"]] = slug
+        self._monitor_list_index = ((), {}, {})
+
+    def get(self, slug):
+        """Get the status page details of a monitor from its slug."""
+        return self.by_slug.get(slug)
+
+    def _index_monitor_list(self, monitors):
+        indexed, by_id, children = self._monitor_list_index
+        # monitor lists are shared read-only snapshots so an unchanged list
+        # holds the same monitor objects
+        if len(indexed) == len(monitors) and all(
+            a is b for a, b in zip(indexed, monitors)
+        ):
+            return by_id, children
+        by_id = {monitor["id"]: monitor for monitor in monitors}
+        children = {
+            monitor["id"]: sorted(
+                (
+                    by_id[child_id]
+                    for child_id in monitor.get("childrenIDs", [])
+                    if child_id in by_id
+                ),
+                key=lambda x: x["name"],
+            )
+            for monitor in monitors
+        }
+        self._monitor_list_index = (tuple(monitors), by_id, children)
+        return by_id, children
+
+    def monitor_and_children(self, monitors, monitor_id):
+        """Find a monitor in the full monitor list along with its children,
+        sorted by name."""
+        by_id, children = self._index_monitor_list(monitors)
+        return by_id.get(monitor_id), children.get(monitor_id, [])
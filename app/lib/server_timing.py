@@ -0,0 +1,169 @@
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_request_context, request
+
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
+
+_NAME_INVALID = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+class RequestTimings:
+    """The time spent in each phase of one request, added up by name.
+
+    Phases can be timed from any thread, such as the threads that fetch
+    heartbeats for several monitors at once, so the total for a phase can be
+    more than the time the request took."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._timings = {}
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self._timings.get(name, (0.0, 0))
+            self._timings[name] = (total + seconds, count + 1)
+
+    def as_dict(self):
+        with self._lock:
+            timings = dict(self._timings)
+        return {
+            name: {"ms": round(total * 1000, 1), "count": count}
+            for name, (total, count) in timings.items()
+        }
+
+    def header(self, total):
+        """Format the timings as a Server-Timing header value."""
+        metrics = []
+        for name, timing in self.as_dict().items():
+            metric = f"{_NAME_INVALID.sub('_', name)};dur={timing['ms']}"
+            if timing["count"] > 1:
+                metric += f';desc="{timing["count"]} calls"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={round(total * 1000, 1)}")
+        return ", ".join(metrics)
+
+
+class ServerTiming:
+    """Times the phases of each request and reports them in a Server-Timing
+    header and a structured log line when SERVER_TIMING_ENABLED is set.
+
+    When it isn't set, spans cost no more than checking the setting."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("SERVER_TIMING_ENABLED", False)
+        # the log lines are info messages, which the app logger would drop at
+        # its default level, so they have their own logger which goes to the
+        # same handlers
+        self.logger = app.logger.getChild("server_timing")
+        self.logger.setLevel(logging.INFO if self.enabled else logging.NOTSET)
+        app.extensions["server_timing"] = self
+        if self._add_upstream not in uptime_kuma_pool.timing_listeners:
+            uptime_kuma_pool.timing_listeners.append(self._add_upstream)
+        if self.enabled:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+
+    def _start(self):
+        g.request_timings = RequestTimings()
+
+    def _finish(self, response):
+        timings = g.pop("request_timings", None)
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.started
+        response.headers["Server-Timing"] = timings.header(total)
+        self.logger.info(
+            "Server timing "
+            + json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "total_ms": round(total * 1000, 1),
+                    "timings": timings.as_dict(),
+                },
+                separators=(",", ":"),
+            )
+        )
+        return response
+
+    def current(self):
+        """The timings of the current request, or None if they aren't being
+        recorded."""
+        if not self.enabled or not has_request_context():
+            return None
+        return g.get("request_timings")
+
+    def add(self, name, seconds):
+        """Add time spent in a phase to the current request, if any."""
+        timings = self.current()
+        if timings is not None:
+            timings.add(name, seconds)
+
+    def _add_upstream(self, name, seconds, error=None):
+        self.add(f"uk-{name}", seconds)
+
+    @contextmanager
+    def span(self, name):
+        """Time the block as part of the phase `name` of the current request."""
+        timings = self.current()
+        if timings is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings.add(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Time every call to the decorated function as part of the phase
+        `name` of the current request."""
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                with self.span(name):
+                    return f(*args, **kwargs)
+
+            return decorated_function
+
+        return decorator
+
+    @contextmanager
+    def record(self, api):
+        """Add the time of every call `api` makes during the block to the
+        current request, including calls made from other threads.
+
+        :param api: An UptimeKumaApi.
+        """
+        timings = self.current()
+        if timings is None:
+            yield api
+            return
+
+        def listener(name, seconds, error=None):
+            # calls made from other threads can't see the request context
+            timings.add(f"uk-{name}", seconds)
+
+        api.timing_listeners.append(listener)
+        try:
+            yield api
+        finally:
+            api.timing_listeners.remove(listener)
+
+
+server_timing = ServerTiming()
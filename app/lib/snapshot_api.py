@@ -0,0 +1,142 @@
+import datetime
+import hashlib
+import json
+
+from app.lib.incidents import find_incidents
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _epoch_ms(time):
+    try:
+        return (datetime.datetime.fromisoformat(time) - _EPOCH) // datetime.timedelta(
+            milliseconds=1
+        )
+    except (TypeError, ValueError):
+        return 0
+
+
+def _incident(incident):
+    # ongoing incidents have no duration so that the document only changes
+    # when the data does
+    return {
+        "status": incident["status"].get("status_code"),
+        "start": incident["start"].get("time") if incident["has_start"] else None,
+        "end": incident["end"].get("time") if incident["has_end"] else None,
+        "duration_seconds": (
+            incident["duration_seconds"] if incident["has_end"] else None
+        ),
+    }
+
+
+class SnapshotDocument:
+    """The status page data in a snapshot as a compact JSON document for
+    machines to read.
+
+    Each monitor has a version, which is the time of its latest heartbeat in
+    milliseconds since the epoch, and the document's version is the newest of
+    these. Because versions come from the data rather than from when it was
+    fetched, every worker gives the same version and ETag for the same data."""
+
+    def __init__(self, snapshot):
+        data = snapshot.data or {}
+        heartbeat_list = (snapshot.heartbeats or {}).get("heartbeatList", {})
+        self.monitors = []
+        self.versions = {}
+        for group in data.get("publicGroupList", []):
+            for monitor in group.get("monitorList", []):
+                heartbeats = heartbeat_list.get(str(monitor["id"])) or []
+                latest = heartbeats[-1] if heartbeats else {}
+                self.monitors.append(
+                    {
+                        "id": monitor["id"],
+                        "name": monitor.get("name"),
+                        "slug": snapshot.directory.slugs.get(monitor["id"]),
+                        "group": group.get("name"),
+                        "version": _epoch_ms(latest.get("time")),
+                        "status": latest.get("status"),
+                        "time": latest.get("time"),
+                        "ping": latest.get("ping"),
+                        "msg": latest.get("msg"),
+                        "incidents": [
+                            _incident(incident)
+                            for incident in find_incidents(heartbeats)
+                        ],
+                    }
+                )
+        self.versions = {
+            monitor["slug"]: monitor["version"] for monitor in self.monitors
+        }
+        self.version = max((monitor["version"] for monitor in self.monitors), default=0)
+        self.incidents = [
+            {
+                key: incident.get(key)
+                for key in [
+                    "id",
+                    "title",
+                    "content",
+                    "style",
+                    "createdDate",
+                    "lastUpdatedDate",
+                ]
+            }
+            for incident in data.get("incidents") or []
+        ]
+        self.maintenance = [
+            {
+                key: item.get(key)
+                for key in [
+                    "id",
+                    "title",
+                    "description",
+                    "status",
+                    "timezone",
+                    "timezoneOffset",
+                    "timeslotList",
+                ]
+            }
+            for item in data.get("maintenanceList") or []
+        ]
+        self._full = None
+
+    def render(self, since=None):
+        """Serialise the document, or only the monitors that have changed
+        since a previous version, and get its ETag.
+
+        :return: The JSON and its ETag.
+        :rtype: tuple[str, str]
+        """
+        if since is None and self._full:
+            return self._full
+        body = json.dumps(
+            {
+                "version": self.version,
+                "since": since,
+                "monitors": [
+                    monitor
+                    for monitor in self.monitors
+                    if since is None or monitor["version"] > since
+                ],
+                "incidents": self.incidents,
+                "maintenance": self.maintenance,
+            },
+            separators=(",", ":"),
+        )
+        rendered = (body, hashlib.sha256(body.encode()).hexdigest()[:32])
+        if since is None:
+            self._full = rendered
+        return rendered
+
+
+_latest = (None, None)
+
+
+def snapshot_document(snapshot):
+    """Get the document for a snapshot, which is only built once for each new
+    snapshot."""
+    global _latest
+    latest_snapshot, document = _latest
+    if latest_snapshot is not snapshot:
+        document = SnapshotDocument(snapshot)
+        _latest = (snapshot, document)
+    return document
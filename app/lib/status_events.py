@@ -0,0 +1,185 @@
+import json
+import queue
+import threading
+import time
+
+from app.lib.incidents import pretty_uptime_kuma_status
+from app.lib.status_poller import status_poller
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+def monitor_states(snapshot):
+    """The latest heartbeat of each monitor on the status page, as sent to
+    status event subscribers."""
+    heartbeat_list = (snapshot.heartbeats or {}).get("heartbeatList", {})
+    states = {}
+    for monitor_id, slug in snapshot.directory.slugs.items():
+        heartbeats = heartbeat_list.get(str(monitor_id))
+        if not heartbeats:
+            continue
+        heartbeat = heartbeats[-1]
+        status = pretty_uptime_kuma_status(MonitorStatus(heartbeat.get("status")))
+        states[monitor_id] = {
+            "id": monitor_id,
+            "slug": slug,
+            "time": heartbeat.get("time"),
+            "status_code": status.get("status_code"),
+            "status_class": status.get("status_class"),
+            "title": status.get("title"),
+            "accent_colour": status.get("accent_colour"),
+            "fontawesome_icon": status.get("fontawesome_icon"),
+        }
+    return states
+
+
+def page_fingerprint(snapshot):
+    """A string that changes whenever anything on the status page other than
+    the status of its monitors does, such as incidents, planned maintenance,
+    the page title and description, or the groups and monitors shown."""
+    data = snapshot.data or {}
+    return json.dumps(
+        [
+            data.get("incidents", data.get("incident")),
+            data.get("maintenanceList"),
+            data.get("config"),
+            data.get("publicGroupList"),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def format_event(event, data, id_=None):
+    lines = [f"event: {event}"]
+    if id_ is not None:
+        lines.append(f"id: {id_}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class StatusEventSubscription:
+    """The events waiting to be sent to one client. A client that falls more
+    than `queue_size` events behind is dropped rather than holding events for
+    it indefinitely."""
+
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped = True
+            return False
+        return True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class StatusEvents:
+    """Sends changes to the status of each monitor to any number of
+    Server-Sent Events clients.
+
+    Changes are worked out once per process each time the status page poller
+    publishes a new snapshot, and then copied to every client's queue, so the
+    number of clients makes no difference to the calls made to Uptime Kuma.
+
+    Changes to anything else on the page send a `reload` event so that clients
+    load the whole page again."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._states = {}
+        self._page = None
+        self.version = 0
+        self.queue_size = 32
+        self.keepalive = 15
+        self.max_duration = 600
+        self.logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.queue_size = app.config.get("STATUS_EVENTS_QUEUE_SIZE")
+        self.keepalive = app.config.get("STATUS_EVENTS_KEEPALIVE_SECONDS")
+        self.max_duration = app.config.get("STATUS_EVENTS_MAX_SECONDS")
+        self.logger = app.logger
+        if self.publish not in status_poller.listeners:
+            status_poller.listeners.append(self.publish)
+        app.extensions["status_events"] = self
+
+    def subscribe(self, snapshot=None):
+        """Start sending events to a new client. The current status of every
+        monitor is queued first so the client starts from a known state."""
+        subscription = StatusEventSubscription(self.queue_size)
+        with self._lock:
+            if snapshot and not self._states:
+                self._states = monitor_states(snapshot)
+            if snapshot and self._page is None:
+                self._page = page_fingerprint(snapshot)
+            subscription.put(
+                format_event("snapshot", list(self._states.values()), self.version)
+            )
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+    def publish(self, snapshot):
+        """Queue an event for each monitor whose latest heartbeat has changed
+        since the previous snapshot, and a reload event if anything else on
+        the page has changed."""
+        states = monitor_states(snapshot)
+        page = page_fingerprint(snapshot)
+        with self._lock:
+            changed = [
+                state
+                for monitor_id, state in states.items()
+                if self._states.get(monitor_id) != state
+            ]
+            self._states = states
+            events = []
+            if changed:
+                self.version += 1
+                events.append(format_event("monitors", changed, self.version))
+            if self._page is not None and page != self._page:
+                events.append(format_event("reload", {}))
+            self._page = page
+            for subscription in list(self._subscriptions):
+                for event in events:
+                    if not subscription.put(event):
+                        self._subscriptions.discard(subscription)
+                        if self.logger:
+                            self.logger.info("Dropped a slow status events client")
+                        break
+        return len(changed)
+
+    def stream(self, subscription):
+        """Generate the response body for a client until it has been connected
+        for `max_duration` seconds or has been dropped, after which the browser
+        reconnects and starts again from a new snapshot event."""
+        started = time.monotonic()
+        try:
+            yield f"retry: {int(self.keepalive * 1000)}\n\n"
+            while time.monotonic() - started < self.max_duration:
+                event = subscription.get(timeout=self.keepalive)
+                if subscription.dropped:
+                    return
+                yield ": keepalive\n\n" if event is None else event
+        finally:
+            self.unsubscribe(subscription)
+
+
+status_events = StatusEvents()
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from app.lib.monitor_directory import MonitorDirectory
+from app.lib.uptime_kuma_http import UptimeKumaHttpClient
+
+
+class StatusPageSnapshot(NamedTuple):
+    """The status page data and heartbeats fetched from Uptime Kuma at a point
+    in time. Snapshots are never modified once they have been published."""
+
+    data: dict
+    heartbeats: dict
+    fetched_at: float
+    directory: MonitorDirectory
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class StatusPagePoller:
+    """Polls the Uptime Kuma status page endpoints in a background thread and
+    keeps the most recent successful response as a snapshot.
+
+    Routes read the latest snapshot rather than calling Uptime Kuma while
+    handling a request. Functions in `listeners` are called with each new
+    snapshot, and functions in `timing_listeners` with the path, duration and
+    any error of each request made to Uptime Kuma."""
+
+    def __init__(self, app=None):
+        self._snapshot = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.uptime_kuma_url = ""
+        self.status_page_slug = ""
+        self.logger = None
+        self.http = None
+        self.listeners = []
+        self.timing_listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.uptime_kuma_url = (app.config.get("UPTIME_KUMA_URL") or "").strip("/")
+        self.status_page_slug = app.config.get("UPTIME_KUMA_STATUS_PAGE_SLUG")
+        self.interval = app.config.get("STATUS_PAGE_POLL_SECONDS")
+        self.wait_timeout = app.config.get("STATUS_PAGE_POLL_TIMEOUT")
+        self.max_age = app.config.get("STATUS_PAGE_SNAPSHOT_MAX_AGE")
+        self.logger = app.logger
+        if self.http:
+            self.http.close()
+        self.http = UptimeKumaHttpClient(
+            self.uptime_kuma_url,
+            pool_size=app.config.get("UPTIME_KUMA_HTTP_POOL_SIZE"),
+            timeout=app.config.get("UPTIME_KUMA_HTTP_TIMEOUT"),
+            logger=app.logger,
+        )
+        self.http.timing_listeners = self.timing_listeners
+        app.extensions["status_poller"] = self
+
+    @property
+    def enabled(self):
+        return bool(self.uptime_kuma_url and self.status_page_slug)
+
+    def fetch(self):
+        data, heartbeats = self.http.get_status_page(self.status_page_slug)
+        return StatusPageSnapshot(
+            data=data,
+            heartbeats=heartbeats,
+            fetched_at=time.time(),
+            directory=MonitorDirectory(data),
+        )
+
+    def refresh(self):
+        """Fetch and publish a new snapshot, keeping the previous snapshot if
+        Uptime Kuma cannot be reached."""
+        try:
+            snapshot = self.fetch()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to refresh status page snapshot: {e}")
+            return None
+        self._snapshot = snapshot
+        self._ready.set()
+        for listener in self.listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Status page snapshot listener failed: {e}")
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.refresh()
+            self._stop.wait(max(0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        """Start polling in a daemon thread. Threads don't survive a fork so the
+        poller is restarted if it is used from a new process."""
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="status-page-poller", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.wait_timeout)
+        self._thread = None
+
+    def get_snapshot(self):
+        """Get the latest snapshot, waiting for the first one if the poller has
+        only just started. Returns None if there is no usable snapshot."""
+        if not self.enabled:
+            return None
+        self.start()
+        self._ready.wait(timeout=self.wait_timeout)
+        snapshot = self._snapshot
+        if snapshot and self.max_age and snapshot.age > self.max_age:
+            if self.logger:
+                self.logger.error(
+                    f"Status page snapshot is {int(snapshot.age)} seconds old"
+                )
+            return None
+        return snapshot
+
+
+status_poller = StatusPagePoller()
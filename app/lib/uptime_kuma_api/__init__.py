@@ -8,6 +8,8 @@ from .docker_type import DockerType  # noqa: F401
 from .dto import MonitorBuilder  # noqa: F401
 from .event import Event  # noqa: F401
 from .exceptions import Timeout, UptimeKumaException  # noqa: F401
+from .heartbeat import Heartbeat, heartbeat_records  # noqa: F401
+from .heartbeat_series import HeartbeatSeries, SeriesHeartbeat  # noqa: F401
 from .incident_style import IncidentStyle  # noqa: F401
 from .maintenance_strategy import MaintenanceStrategy  # noqa: F401
 from .monitor_status import MonitorStatus  # noqa: F401
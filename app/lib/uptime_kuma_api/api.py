@@ -4,9 +4,12 @@ import datetime
 import json
 import random
 import string
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from copy import deepcopy
+from types import MappingProxyType
 from typing import Any
 
 import requests
@@ -26,6 +29,8 @@ from .docstrings import (
 )
 from .event import Event
 from .exceptions import Timeout, UptimeKumaException
+from .heartbeat import Heartbeat, heartbeat_records
+from .heartbeat_series import HeartbeatSeries
 from .incident_style import IncidentStyle
 from .maintenance_strategy import MaintenanceStrategy
 from .monitor_status import MonitorStatus
@@ -122,6 +127,19 @@ def _convert_monitor_return(monitor) -> None:
         ]
 
 
+def _freeze_monitor(monitor) -> MappingProxyType:
+    monitor = dict(monitor)
+    _convert_monitor_return(monitor)
+    int_to_bool(monitor, ["active"])
+    parse_monitor_type(monitor)
+    parse_auth_method(monitor)
+    return MappingProxyType(monitor)
+
+
+def _freeze_heartbeat(heartbeat) -> Heartbeat:
+    return Heartbeat(heartbeat)
+
+
 def _convert_monitor_input(kwargs) -> None:
     if not kwargs["accepted_statuscodes"]:
         kwargs["accepted_statuscodes"] = ["200-299"]
@@ -478,7 +496,7 @@ class UptimeKumaApi(object):
                             Default is ``True``.
     :param float wait_events: How many seconds the client should wait for the next event of the same type.
                               There is no way to determine when the last message of a certain type has arrived.
-                              Therefore, a timeout is required. If no further message has arrived within this time,
+                              Therefore, a timeout is required. Once no further message has arrived for this long,
                               it is assumed that it was the last message. Defaults is ``0.2``.
     :param logger: To enable logging set to ``True`` or pass a logger object to
                    use. To disable logging set to ``False``. The default is
@@ -502,6 +520,11 @@ class UptimeKumaApi(object):
         self.wait_events = wait_events
         self.sio = socketio.Client(ssl_verify=ssl_verify, logger=logger)
         self.ssl_verify = ssl_verify
+        self.http = requests.Session()
+        self._emit_lock = threading.Lock()
+        # called with the name, duration in seconds and any error of every
+        # call and wait for event data
+        self.timing_listeners = []
 
         self._event_data: dict = {
             Event.MONITOR_LIST: None,
@@ -519,6 +542,19 @@ class UptimeKumaApi(object):
             Event.MAINTENANCE_LIST: None,
             Event.API_KEY_LIST: None,
         }
+        self._event_conditions: dict = {
+            event: threading.Condition() for event in self._event_data
+        }
+        self._event_arrived: dict = {event: 0.0 for event in self._event_data}
+        # the data for these events is replaced rather than changed when a new
+        # message arrives so it can be shared with callers without copying
+        self._snapshot_events = [
+            Event.MONITOR_LIST,
+            Event.HEARTBEAT_LIST,
+            Event.IMPORTANT_HEARTBEAT_LIST,
+            Event.AVG_PING,
+            Event.UPTIME,
+        ]
 
         self.sio.on(Event.CONNECT, self._event_connect)
         self.sio.on(Event.DISCONNECT, self._event_disconnect)
@@ -558,13 +594,40 @@ class UptimeKumaApi(object):
         except:  # noqa: E722
             raise
         else:
-            timestamp = time.time()
-            while self._event_data[event] is None:
-                if time.time() - timestamp > self.timeout:
+            with self._event_conditions[event]:
+                if not self._event_conditions[event].wait_for(
+                    lambda: self._event_data[event] is not None, timeout=self.timeout
+                ):
                     raise Timeout(f"Timed out while waiting for event {event}")
-                time.sleep(0.01)
+
+    @contextmanager
+    def _updating_event(self, event: Event):
+        # event handlers change the stored data while holding the lock for the
+        # event and then wake up anything waiting for it
+        condition = self._event_conditions[event]
+        with condition:
+            yield
+            if not self._event_arrived[event]:
+                self._event_arrived[event] = time.monotonic()
+            condition.notify_all()
+
+    def _report_timing(self, name, started, error=None):
+        seconds = time.perf_counter() - started
+        for listener in self.timing_listeners:
+            listener(name, seconds, error)
 
     def _get_event_data(self, event) -> Any:
+        name = f"{getattr(event, 'value', event)}-wait"
+        started = time.perf_counter()
+        try:
+            data = self._wait_for_event_data(event)
+        except Exception as e:
+            self._report_timing(name, started, e)
+            raise
+        self._report_timing(name, started)
+        return data
+
+    def _wait_for_event_data(self, event) -> Any:
         monitor_events = [
             Event.AVG_PING,
             Event.UPTIME,
@@ -573,19 +636,66 @@ class UptimeKumaApi(object):
             Event.CERT_INFO,
             Event.HEARTBEAT,
         ]
-        timestamp = time.time()
-        while self._event_data[event] is None:
-            if time.time() - timestamp > self.timeout:
-                raise Timeout(f"Timed out while waiting for event {event}")
-            # do not wait for events that are not sent
-            if self._event_data[Event.MONITOR_LIST] == {} and event in monitor_events:
-                return []
-            time.sleep(0.01)
-        time.sleep(self.wait_events)  # wait for multiple messages
-        return deepcopy(self._event_data[event].copy())
+        condition = self._event_conditions[event]
+        deadline = time.monotonic() + self.timeout
+        with condition:
+            while self._event_data[event] is None:
+                # do not wait for events that are not sent
+                if (
+                    self._event_data[Event.MONITOR_LIST] == {}
+                    and event in monitor_events
+                ):
+                    return []
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Timeout(f"Timed out while waiting for event {event}")
+                condition.wait(timeout=remaining)
+            # other events replace all of their data in a single message but
+            # monitor events arrive as one message per monitor, in a burst after
+            # login. There is no way to know which message is the last of the
+            # burst so wait until wait_events seconds after the first. After
+            # that later messages only keep the data up to date, and a busy
+            # Uptime Kuma never stops sending them, so return straight away
+            while event in monitor_events:
+                settled_at = self._event_arrived[event] + self.wait_events
+                remaining = min(settled_at, deadline) - time.monotonic()
+                if remaining <= 0:
+                    break
+                condition.wait(timeout=remaining)
+            if event in self._snapshot_events:
+                return self._event_data[event]
+            return deepcopy(self._event_data[event].copy())
 
     def _call(self, event, data=None) -> Any:
-        r = self.sio.call(event, data, timeout=self.timeout)
+        name = getattr(event, "value", event)
+        started = time.perf_counter()
+        try:
+            r = self._emit_and_wait(event, data)
+        except Exception as e:
+            self._report_timing(name, started, e)
+            raise
+        self._report_timing(name, started)
+        return r
+
+    def _emit_and_wait(self, event, data=None) -> Any:
+        # several threads can wait for their acknowledgements at the same time
+        # but packets have to be emitted one at a time
+        callback_event = threading.Event()
+        callback_args = []
+
+        def event_callback(*args):
+            callback_args.append(args)
+            callback_event.set()
+
+        with self._emit_lock:
+            self.sio.emit(event, data, callback=event_callback)
+        if not callback_event.wait(timeout=self.timeout):
+            raise socketio.exceptions.TimeoutError()
+        r = (
+            callback_args[0]
+            if len(callback_args[0]) > 1
+            else callback_args[0][0] if len(callback_args[0]) == 1 else None
+        )
         if isinstance(r, dict) and "ok" in r:
             if not r["ok"]:
                 raise UptimeKumaException(r.get("msg"))
@@ -601,103 +711,131 @@ class UptimeKumaApi(object):
         pass
 
     def _event_monitor_list(self, data) -> None:
-        self._event_data[Event.MONITOR_LIST] = data
+        monitors = MappingProxyType(
+            {key: _freeze_monitor(monitor) for key, monitor in data.items()}
+        )
+        with self._updating_event(Event.MONITOR_LIST):
+            self._event_data[Event.MONITOR_LIST] = monitors
+        if data == {}:
+            # wake up anything waiting for monitor events that won't be sent
+            for event in [
+                Event.AVG_PING,
+                Event.UPTIME,
+                Event.HEARTBEAT_LIST,
+                Event.IMPORTANT_HEARTBEAT_LIST,
+                Event.CERT_INFO,
+            ]:
+                with self._event_conditions[event]:
+                    self._event_conditions[event].notify_all()
 
     def _event_notification_list(self, data) -> None:
-        self._event_data[Event.NOTIFICATION_LIST] = data
+        with self._updating_event(Event.NOTIFICATION_LIST):
+            self._event_data[Event.NOTIFICATION_LIST] = data
 
     def _event_proxy_list(self, data) -> None:
-        self._event_data[Event.PROXY_LIST] = data
+        with self._updating_event(Event.PROXY_LIST):
+            self._event_data[Event.PROXY_LIST] = data
 
     def _event_status_page_list(self, data) -> None:
-        self._event_data[Event.STATUS_PAGE_LIST] = data
+        with self._updating_event(Event.STATUS_PAGE_LIST):
+            self._event_data[Event.STATUS_PAGE_LIST] = data
 
     def _event_heartbeat_list(self, monitor_id, data, overwrite) -> None:
         monitor_id = int(monitor_id)
-
-        if self._event_data[Event.HEARTBEAT_LIST] is None:
-            self._event_data[Event.HEARTBEAT_LIST] = {}
-        if monitor_id not in self._event_data[Event.HEARTBEAT_LIST] or overwrite:
-            self._event_data[Event.HEARTBEAT_LIST][monitor_id] = data
-        else:
-            self._event_data[Event.HEARTBEAT_LIST][monitor_id].append(data)
+        heartbeats = tuple(_freeze_heartbeat(heartbeat) for heartbeat in data)
+
+        with self._updating_event(Event.HEARTBEAT_LIST):
+            current = self._event_data[Event.HEARTBEAT_LIST] or {}
+            if monitor_id in current and not overwrite:
+                heartbeats = current[monitor_id] + heartbeats
+            self._event_data[Event.HEARTBEAT_LIST] = MappingProxyType(
+                {**current, monitor_id: heartbeats}
+            )
 
     def _event_important_heartbeat_list(self, monitor_id, data, overwrite) -> None:
         monitor_id = int(monitor_id)
-
-        if self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] is None:
-            self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] = {}
-        if (
-            monitor_id not in self._event_data[Event.IMPORTANT_HEARTBEAT_LIST]
-            or overwrite
-        ):
-            self._event_data[Event.IMPORTANT_HEARTBEAT_LIST][monitor_id] = data
-        else:
-            self._event_data[Event.IMPORTANT_HEARTBEAT_LIST][monitor_id].append(data)
+        heartbeats = tuple(_freeze_heartbeat(heartbeat) for heartbeat in data)
+
+        with self._updating_event(Event.IMPORTANT_HEARTBEAT_LIST):
+            current = self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] or {}
+            if monitor_id in current and not overwrite:
+                heartbeats = current[monitor_id] + heartbeats
+            self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] = MappingProxyType(
+                {**current, monitor_id: heartbeats}
+            )
 
     def _event_avg_ping(self, monitor_id, data) -> None:
         monitor_id = int(monitor_id)
 
-        if self._event_data[Event.AVG_PING] is None:
-            self._event_data[Event.AVG_PING] = {}
-        self._event_data[Event.AVG_PING][monitor_id] = data
+        with self._updating_event(Event.AVG_PING):
+            current = self._event_data[Event.AVG_PING] or {}
+            self._event_data[Event.AVG_PING] = MappingProxyType(
+                {**current, monitor_id: data}
+            )
 
     def _event_uptime(self, monitor_id, type_, data) -> None:
         monitor_id = int(monitor_id)
 
-        if self._event_data[Event.UPTIME] is None:
-            self._event_data[Event.UPTIME] = {}
-        if monitor_id not in self._event_data[Event.UPTIME]:
-            self._event_data[Event.UPTIME][monitor_id] = {}
-        self._event_data[Event.UPTIME][monitor_id][type_] = data
+        with self._updating_event(Event.UPTIME):
+            current = self._event_data[Event.UPTIME] or {}
+            uptime = MappingProxyType({**current.get(monitor_id, {}), type_: data})
+            self._event_data[Event.UPTIME] = MappingProxyType(
+                {**current, monitor_id: uptime}
+            )
 
     def _event_heartbeat(self, data) -> None:
-        if self._event_data[Event.HEARTBEAT_LIST] is None:
-            self._event_data[Event.HEARTBEAT_LIST] = {}
         monitor_id = data["monitorID"]
-        if monitor_id not in self._event_data[Event.HEARTBEAT_LIST]:
-            self._event_data[Event.HEARTBEAT_LIST][monitor_id] = []
-        self._event_data[Event.HEARTBEAT_LIST][monitor_id].append(data)
-        if len(self._event_data[Event.HEARTBEAT_LIST][monitor_id]) >= 150:
-            self._event_data[Event.HEARTBEAT_LIST][monitor_id].pop(0)
+        heartbeat = _freeze_heartbeat(data)
+        with self._updating_event(Event.HEARTBEAT_LIST):
+            current = self._event_data[Event.HEARTBEAT_LIST] or {}
+            heartbeats = current.get(monitor_id, ()) + (heartbeat,)
+            if len(heartbeats) >= 150:
+                heartbeats = heartbeats[1:]
+            self._event_data[Event.HEARTBEAT_LIST] = MappingProxyType(
+                {**current, monitor_id: heartbeats}
+            )
 
         # add heartbeat to important heartbeat list
         if data["important"]:
-            if self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] is None:
-                self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] = {}
-            if monitor_id not in self._event_data[Event.IMPORTANT_HEARTBEAT_LIST]:
-                self._event_data[Event.IMPORTANT_HEARTBEAT_LIST][monitor_id] = []
-            self._event_data[Event.IMPORTANT_HEARTBEAT_LIST][monitor_id] = [
-                data
-            ] + self._event_data[Event.IMPORTANT_HEARTBEAT_LIST][monitor_id]
+            with self._updating_event(Event.IMPORTANT_HEARTBEAT_LIST):
+                current = self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] or {}
+                self._event_data[Event.IMPORTANT_HEARTBEAT_LIST] = MappingProxyType(
+                    {**current, monitor_id: (heartbeat,) + current.get(monitor_id, ())}
+                )
 
     def _event_info(self, data) -> None:
         if "version" not in data:
             # wait for the info event that is sent after login and contains the version
             return
-        self._event_data[Event.INFO] = data
+        with self._updating_event(Event.INFO):
+            self._event_data[Event.INFO] = data
 
     def _event_cert_info(self, monitor_id, data) -> None:
         monitor_id = int(monitor_id)
 
-        if self._event_data[Event.CERT_INFO] is None:
-            self._event_data[Event.CERT_INFO] = {}
-        self._event_data[Event.CERT_INFO][monitor_id] = json.loads(data)
+        with self._updating_event(Event.CERT_INFO):
+            if self._event_data[Event.CERT_INFO] is None:
+                self._event_data[Event.CERT_INFO] = {}
+            self._event_data[Event.CERT_INFO][monitor_id] = json.loads(data)
 
     def _event_docker_host_list(self, data) -> None:
-        self._event_data[Event.DOCKER_HOST_LIST] = data
+        with self._updating_event(Event.DOCKER_HOST_LIST):
+            self._event_data[Event.DOCKER_HOST_LIST] = data
 
     def _event_auto_login(self) -> None:
-        self._event_data[Event.AUTO_LOGIN] = True
+        with self._updating_event(Event.AUTO_LOGIN):
+            self._event_data[Event.AUTO_LOGIN] = True
 
     def _event_init_server_timezone(self) -> None:
         pass
 
     def _event_maintenance_list(self, data) -> None:
-        self._event_data[Event.MAINTENANCE_LIST] = data
+        with self._updating_event(Event.MAINTENANCE_LIST):
+            self._event_data[Event.MAINTENANCE_LIST] = data
 
     def _event_api_key_list(self, data) -> None:
-        self._event_data[Event.API_KEY_LIST] = data
+        with self._updating_event(Event.API_KEY_LIST):
+            self._event_data[Event.API_KEY_LIST] = data
 
     # connection
 
@@ -725,6 +863,7 @@ class UptimeKumaApi(object):
         Needs to be called to prevent blocking the program.
         """
         self.sio.disconnect()
+        self.http.close()
 
     # builder
 
@@ -1207,6 +1346,8 @@ class UptimeKumaApi(object):
         """
         Get all monitors.
 
+        The monitors are shared read-only views that must not be modified.
+
         :return: A list of monitors.
         :rtype: list
 
@@ -1288,13 +1429,7 @@ class UptimeKumaApi(object):
 
         self._call("getMonitorList")
         with self.wait_for_event(Event.MONITOR_LIST):
-            r = list(self._get_event_data(Event.MONITOR_LIST).values())
-            for monitor in r:
-                _convert_monitor_return(monitor)
-            int_to_bool(r, ["active"])
-            parse_monitor_type(r)
-            parse_auth_method(r)
-            return r
+            return list(self._get_event_data(Event.MONITOR_LIST).values())
 
     def get_monitor(self, id_: int) -> dict:
         """
@@ -1460,14 +1595,17 @@ class UptimeKumaApi(object):
                 raise UptimeKumaException("monitor does not exist")
             return self._call("deleteMonitor", id_)
 
-    def get_monitor_beats(self, id_: int, hours: int) -> list[dict]:
+    def get_monitor_beats(
+        self, id_: int, hours: int, series: bool = False
+    ) -> list[Heartbeat] | HeartbeatSeries:
         """
         Get monitor beats for a specific monitor in a time range.
 
         :param int id_: The monitor id.
         :param int hours: Period time in hours from now.
-        :return: The server response.
-        :rtype: list
+        :param bool, optional series: ``True`` to return the beats as a compact :class:`HeartbeatSeries`, defaults to False
+        :return: The beats as read-only :class:`Heartbeat` records, or as a series.
+        :rtype: list or HeartbeatSeries
         :raises UptimeKumaException: If the server returns an error.
 
         Example::
@@ -1500,9 +1638,70 @@ class UptimeKumaApi(object):
             ]
         """
         r = self._call("getMonitorBeats", (id_, hours))["data"]
-        int_to_bool(r, ["important"])
-        parse_monitor_status(r)
-        return r
+        if series:
+            return HeartbeatSeries.from_heartbeats(id_, r)
+        return heartbeat_records(r)
+
+    def get_monitors_beats(
+        self,
+        ids: list[int],
+        hours: int,
+        max_workers: int = 4,
+        timeout: float = None,
+        series: bool = False,
+    ) -> dict[int, list[dict] | HeartbeatSeries]:
+        """
+        Get monitor beats for several monitors in a time range.
+
+        The requests are made concurrently over the same connection.
+
+        :param list ids: The monitor ids.
+        :param int hours: Period time in hours from now.
+        :param int, optional max_workers: The maximum number of requests to make at once, defaults to 4
+        :param float, optional timeout: How many seconds to wait for all of the requests in total, defaults to None
+        :param bool, optional series: ``True`` to return the beats as compact :class:`HeartbeatSeries`, defaults to False
+        :return: The beats for each monitor id.
+        :rtype: dict
+        :raises Timeout: If the requests do not all complete in time.
+        :raises UptimeKumaException: If the server returns an error.
+
+        Example::
+
+            >>> api.get_monitors_beats([1, 2], 6)
+            {
+                1: [
+                    {
+                        'down_count': 0,
+                        'duration': 0,
+                        'id': 25,
+                        'important': True,
+                        'monitor_id': 1,
+                        'msg': '200 - OK',
+                        'ping': 201,
+                        'status': <MonitorStatus.UP: 1>,
+                        'time': '2022-12-15 12:38:42.661'
+                    },
+                    ...
+                ],
+                2: [
+                    ...
+                ]
+            }
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        try:
+            futures = {
+                id_: executor.submit(self.get_monitor_beats, id_, hours, series)
+                for id_ in ids
+            }
+            _, not_done = wait(futures.values(), timeout=timeout)
+            if not_done:
+                raise Timeout(
+                    f"Timed out while waiting for beats of {len(not_done)} monitors"
+                )
+            return {id_: future.result() for id_, future in futures.items()}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def get_game_list(self) -> list[dict]:
         """
@@ -1615,6 +1814,16 @@ class UptimeKumaApi(object):
 
     # monitor tags
 
+    def _refresh_monitor(self, monitor_id: int) -> None:
+        # the monitor list event does not send the updated tags, so fetch the
+        # monitor again and publish a new monitor list with it
+        monitor = _freeze_monitor(self._call("getMonitor", monitor_id)["monitor"])
+        with self._updating_event(Event.MONITOR_LIST):
+            current = self._event_data[Event.MONITOR_LIST] or {}
+            self._event_data[Event.MONITOR_LIST] = MappingProxyType(
+                {**current, str(monitor_id): monitor}
+            )
+
     def add_monitor_tag(self, tag_id: int, monitor_id: int, value: str = "") -> dict:
         """
         Add a tag to a monitor.
@@ -1638,10 +1847,7 @@ class UptimeKumaApi(object):
             }
         """
         r = self._call("addMonitorTag", (tag_id, monitor_id, value))
-        # the monitor list event does not send the updated tags
-        self._event_data[Event.MONITOR_LIST][str(monitor_id)] = self.get_monitor(
-            monitor_id
-        )
+        self._refresh_monitor(monitor_id)
         return r
 
     # editMonitorTag is unused in uptime-kuma
@@ -1683,10 +1889,7 @@ class UptimeKumaApi(object):
             if {"monitor_id": monitor_id, "tag_id": tag_id, "value": value} not in tags:
                 raise UptimeKumaException("monitor tag does not exist")
             r = self._call("deleteMonitorTag", (tag_id, monitor_id, value))
-            # the monitor list event does not send the updated tags
-            self._event_data[Event.MONITOR_LIST][str(monitor_id)] = self.get_monitor(
-                monitor_id
-            )
+            self._refresh_monitor(monitor_id)
             return r
 
     # notification
@@ -2120,15 +2323,20 @@ class UptimeKumaApi(object):
                 'title': 'status page 1'
             }
         """
-        r1 = self._call("getStatusPage", slug)
-        try:
-            r2 = requests.get(
+        # the REST API and the socket.io call are independent so make them
+        # at the same time
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            rest_response = executor.submit(
+                self.http.get,
                 f"{self.url}/api/status-page/{slug}",
                 timeout=self.timeout,
                 verify=self.ssl_verify,
-            ).json()
-        except requests.exceptions.Timeout as e:
-            raise Timeout(e) from e
+            )
+            r1 = self._call("getStatusPage", slug)
+            try:
+                r2 = rest_response.result().json()
+            except requests.exceptions.Timeout as e:
+                raise Timeout(e) from e
 
         config = r1["config"]
         config.update(r2["config"])
@@ -2333,8 +2541,10 @@ class UptimeKumaApi(object):
         """
         Get heartbeats.
 
+        The heartbeats are shared read-only views that must not be modified.
+
         :return: The heartbeats for each monitor id.
-        :rtype: dict
+        :rtype: Mapping
 
         Example::
 
@@ -2366,18 +2576,16 @@ class UptimeKumaApi(object):
                 ]
             }
         """
-        r = self._get_event_data(Event.HEARTBEAT_LIST)
-        for i in r:
-            int_to_bool(r[i], ["important"])
-            parse_monitor_status(r[i])
-        return r
+        return self._get_event_data(Event.HEARTBEAT_LIST)
 
     def get_important_heartbeats(self) -> dict:
         """
         Get important heartbeats.
 
+        The heartbeats are shared read-only views that must not be modified.
+
         :return: The important heartbeats for each monitor id.
-        :rtype: dict
+        :rtype: Mapping
 
         Example::
 
@@ -2396,11 +2604,7 @@ class UptimeKumaApi(object):
                 ]
             }
         """
-        r = self._get_event_data(Event.IMPORTANT_HEARTBEAT_LIST)
-        for i in r:
-            int_to_bool(r[i], ["important"])
-            parse_monitor_status(r[i])
-        return r
+        return self._get_event_data(Event.IMPORTANT_HEARTBEAT_LIST)
 
     # avg ping
 
@@ -2409,7 +2613,7 @@ class UptimeKumaApi(object):
         Get average ping.
 
         :return: The average ping for each monitor id.
-        :rtype: dict
+        :rtype: Mapping
 
         Example::
 
@@ -2589,7 +2793,7 @@ class UptimeKumaApi(object):
         Get monitor uptime.
 
         :return: Monitor uptime.
-        :rtype: dict
+        :rtype: Mapping
 
         Example::
 
@@ -0,0 +1,132 @@
+import datetime
+from collections.abc import Mapping
+
+from tna_utilities.datetime import pretty_datetime
+
+from .monitor_status import MonitorStatus
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_FIELDS = frozenset(
+    [
+        "id",
+        "monitor_id",
+        "status",
+        "time",
+        "msg",
+        "ping",
+        "important",
+        "duration",
+        "down_count",
+    ]
+)
+# heartbeats from the same source have the same keys, so share one tuple
+_KEY_TUPLES = {}
+
+
+def _parse_time(time):
+    try:
+        parsed = datetime.datetime.fromisoformat(time)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class Heartbeat(Mapping):
+    """A read-only heartbeat with its time parsed once when it is received.
+
+    As well as the values Uptime Kuma sends, which can be read as attributes
+    or as keys like a heartbeat dict, it has the time as a naive UTC
+    `datetime`, the time in milliseconds since the epoch as `time_ms` and the
+    time formatted for display as `pretty_time`."""
+
+    __slots__ = (
+        "id",
+        "monitor_id",
+        "status",
+        "time",
+        "time_ms",
+        "datetime",
+        "msg",
+        "ping",
+        "important",
+        "duration",
+        "down_count",
+        "_keys",
+        "_extra",
+        "_pretty_time",
+    )
+
+    def __init__(self, heartbeat):
+        keys = tuple(heartbeat)
+        self._keys = _KEY_TUPLES.setdefault(keys, keys)
+        self.id = heartbeat.get("id")
+        self.monitor_id = heartbeat.get("monitor_id", heartbeat.get("monitorID"))
+        status = heartbeat.get("status")
+        self.status = None if status is None else MonitorStatus(status)
+        self.time = heartbeat.get("time")
+        self.datetime = _parse_time(self.time)
+        self.time_ms = (
+            (self.datetime - _EPOCH) // datetime.timedelta(milliseconds=1)
+            if self.datetime
+            else None
+        )
+        self.msg = heartbeat.get("msg")
+        self.ping = heartbeat.get("ping")
+        important = heartbeat.get("important")
+        self.important = None if important is None else important == 1
+        self.duration = heartbeat.get("duration")
+        self.down_count = heartbeat.get("down_count")
+        self._extra = {
+            key: value for key, value in heartbeat.items() if key not in _FIELDS
+        }
+        self._pretty_time = None
+
+    @property
+    def pretty_time(self) -> str:
+        """The time of the heartbeat formatted for display."""
+        if self._pretty_time is None and self.datetime:
+            self._pretty_time = pretty_datetime(self.datetime)
+        return self._pretty_time or ""
+
+    def __getitem__(self, key):
+        if key in _FIELDS and key in self._keys:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def heartbeat_datetime(heartbeat) -> datetime.datetime:
+    """
+    Get the time of a heartbeat, using the time already parsed for records and
+    series heartbeats and only parsing it for heartbeat dicts.
+
+    :param heartbeat: The heartbeat.
+    :return: The time of the heartbeat.
+    :rtype: datetime.datetime
+    """
+    parsed = getattr(heartbeat, "datetime", None)
+    if parsed is None:
+        parsed = datetime.datetime.fromisoformat(heartbeat.get("time"))
+    return parsed
+
+
+def heartbeat_records(heartbeats) -> list[Heartbeat]:
+    """
+    Turn heartbeat dicts as Uptime Kuma sends them into :class:`Heartbeat`
+    records.
+
+    :param list heartbeats: The heartbeats.
+    :return: The heartbeat records, in the same order.
+    :rtype: list
+    """
+    return [Heartbeat(heartbeat) for heartbeat in heartbeats or []]
@@ -0,0 +1,240 @@
+import datetime
+from array import array
+from collections.abc import Mapping, Sequence
+
+from tna_utilities.datetime import pretty_datetime
+
+from .monitor_status import MonitorStatus
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_STATUSES = tuple(MonitorStatus(status) for status in range(len(MonitorStatus)))
+_NO_PING = -1
+
+
+def _epoch_ms(time) -> int:
+    time = datetime.datetime.fromisoformat(time)
+    if time.tzinfo:
+        time = time.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (time - _EPOCH) // datetime.timedelta(milliseconds=1)
+
+
+class SeriesHeartbeat(Mapping):
+    """A read-only view of one heartbeat in a :class:`HeartbeatSeries`. It can
+    be used in the same way as a heartbeat dict."""
+
+    __slots__ = ("_series", "_index")
+
+    _keys = (
+        "id",
+        "monitor_id",
+        "status",
+        "time",
+        "msg",
+        "ping",
+        "important",
+        "duration",
+        "down_count",
+    )
+
+    def __init__(self, series, index):
+        self._series = series
+        self._index = index
+
+    def __getitem__(self, key):
+        series = self._series
+        index = self._index
+        if key == "status":
+            return _STATUSES[series.statuses[index]]
+        if key == "time":
+            return series.time(index)
+        if key == "msg":
+            return series.messages[series.message_ids[index]]
+        if key == "ping":
+            ping = series.pings[index]
+            return None if ping == _NO_PING else ping
+        if key == "id":
+            return series.ids[index]
+        if key == "monitor_id":
+            return series.monitor_id
+        if key == "important":
+            return bool(series.important[index])
+        if key == "duration":
+            return series.durations[index]
+        if key == "down_count":
+            return series.down_counts[index]
+        raise KeyError(key)
+
+    @property
+    def time_ms(self) -> int:
+        """The time of the heartbeat in milliseconds since the epoch."""
+        return self._series.times[self._index]
+
+    @property
+    def datetime(self) -> datetime.datetime:
+        """The time of the heartbeat as a naive UTC datetime."""
+        return _EPOCH + datetime.timedelta(milliseconds=self.time_ms)
+
+    @property
+    def pretty_time(self) -> str:
+        """The time of the heartbeat formatted for display."""
+        return pretty_datetime(self.datetime)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class HeartbeatSeries(Sequence):
+    """The heartbeats of one monitor, stored in columns of packed arrays rather
+    than as a list of dicts.
+
+    Times are milliseconds since the epoch in UTC, statuses are single bytes
+    and messages are stored once each and referenced by number. Indexing the
+    series gives :class:`SeriesHeartbeat` views that behave like the heartbeat
+    dicts returned by :meth:`UptimeKumaApi.get_monitor_beats`.
+
+    :param int monitor_id: The ID of the monitor the heartbeats belong to.
+    :param str, optional time_separator: The separator between the date and time in heartbeat times, defaults to ``" "``
+    :param str, optional time_spec: The precision of heartbeat times, defaults to ``"seconds"``
+    """
+
+    def __init__(self, monitor_id=None, time_separator=" ", time_spec="seconds"):
+        self.monitor_id = monitor_id
+        self.ids = array("q")
+        self.times = array("q")
+        self.statuses = array("B")
+        self.pings = array("i")
+        self.important = array("B")
+        self.durations = array("i")
+        self.down_counts = array("i")
+        self.message_ids = array("I")
+        self.messages = []
+        self._message_ids = {}
+        self._time_separator = time_separator
+        self._time_spec = time_spec
+
+    @classmethod
+    def from_heartbeats(cls, monitor_id, heartbeats) -> "HeartbeatSeries":
+        """
+        Build a series from heartbeat dicts as Uptime Kuma sends them.
+
+        :param int monitor_id: The ID of the monitor the heartbeats belong to.
+        :param list heartbeats: The heartbeats, oldest first.
+        :return: The heartbeat series.
+        :rtype: HeartbeatSeries
+        """
+        series = cls(monitor_id)
+        if heartbeats:
+            first_time = heartbeats[0].get("time", "")
+            if "T" in first_time:
+                series._time_separator = "T"
+            if "." in first_time:
+                series._time_spec = "milliseconds"
+        for heartbeat in heartbeats:
+            series.append(heartbeat)
+        return series
+
+    def append(self, heartbeat) -> None:
+        """
+        Add a heartbeat to the end of the series.
+
+        :param dict heartbeat: The heartbeat to add.
+        """
+        self.append_values(
+            heartbeat.get("id") or 0,
+            _epoch_ms(heartbeat["time"]),
+            int(heartbeat.get("status") or 0),
+            heartbeat.get("ping"),
+            heartbeat.get("important"),
+            heartbeat.get("duration") or 0,
+            heartbeat.get("down_count") or 0,
+            heartbeat.get("msg") or "",
+        )
+
+    def append_values(
+        self, id_, time_ms, status, ping, important, duration, down_count, msg
+    ) -> None:
+        """
+        Add a heartbeat to the end of the series from the values of its
+        columns.
+
+        :param int id_: The heartbeat ID.
+        :param int time_ms: The time of the heartbeat in milliseconds since the epoch.
+        :param int status: The monitor status.
+        :param int ping: The response time in milliseconds, or ``None``.
+        :param bool important: Whether the heartbeat is important.
+        :param int duration: The number of seconds since the previous heartbeat.
+        :param int down_count: The number of down heartbeats in a row.
+        :param str msg: The heartbeat message.
+        """
+        message_id = self._message_ids.get(msg)
+        if message_id is None:
+            message_id = self._message_ids[msg] = len(self.messages)
+            self.messages.append(msg)
+        self.ids.append(id_)
+        self.times.append(time_ms)
+        self.statuses.append(status)
+        self.pings.append(_NO_PING if ping is None else int(ping))
+        self.important.append(1 if important else 0)
+        self.durations.append(duration)
+        self.down_counts.append(down_count)
+        self.message_ids.append(message_id)
+
+    def time(self, index) -> str:
+        """
+        Get the time of a heartbeat in the format Uptime Kuma uses.
+
+        :param int index: The position of the heartbeat in the series.
+        :return: The time of the heartbeat.
+        :rtype: str
+        """
+        return (_EPOCH + datetime.timedelta(milliseconds=self.times[index])).isoformat(
+            sep=self._time_separator, timespec=self._time_spec
+        )
+
+    def in_time_order(self) -> bool:
+        """
+        Check whether every heartbeat is newer than the one before it.
+
+        :return: ``True`` if the heartbeats are strictly in time order.
+        :rtype: bool
+        """
+        times = self.times
+        return all(times[i] < times[i + 1] for i in range(len(times) - 1))
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by the columns, not counting messages."""
+        return sum(
+            column.itemsize * len(column)
+            for column in [
+                self.ids,
+                self.times,
+                self.statuses,
+                self.pings,
+                self.important,
+                self.durations,
+                self.down_counts,
+                self.message_ids,
+            ]
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("heartbeat index out of range")
+        return SeriesHeartbeat(self, index)
+
+    def __repr__(self):
+        return f"<HeartbeatSeries monitor_id={self.monitor_id} len={len(self)}>"
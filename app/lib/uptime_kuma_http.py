@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from tna_utilities.api import SimpleJsonApiClient
+
+from app.lib.uptime_kuma_api.heartbeat import heartbeat_records
+
+
+class UptimeKumaHttpClient(SimpleJsonApiClient):
+    """A client for the Uptime Kuma REST API that keeps a pool of keep-alive
+    connections in each worker and makes independent requests concurrently.
+
+    The time each request took is logged and passed to any functions in
+    `timing_listeners` as `(path, seconds, error)`, where error is the
+    exception the request raised, if any."""
+
+    def __init__(self, uptime_kuma_url, pool_size=4, timeout=10, logger=None):
+        super().__init__(f"{uptime_kuma_url.strip('/')}/api")
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.logger = logger
+        self.timing_listeners = []
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._executor = None
+
+    def _resources(self):
+        # connections and threads belong to the process that opened them so a
+        # forked worker opens its own
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                self._session = requests.Session()
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size, thread_name_prefix="uptime-kuma-http"
+                )
+            return self._session, self._executor
+
+    def _report_timing(self, path, seconds, error=None):
+        if self.logger:
+            self.logger.debug(f"Uptime Kuma GET {path} took {seconds * 1000:.1f} ms")
+        for listener in self.timing_listeners:
+            listener(path, seconds, error)
+
+    def get(self, path="/", params=None, headers=None, timeout=None) -> dict:
+        session, _ = self._resources()
+        started = time.perf_counter()
+        try:
+            response = session.get(
+                self._normalise_url(path),
+                params=self.params if params is None else {**self.params, **params},
+                headers=(
+                    self.headers if headers is None else {**self.headers, **headers}
+                ),
+                timeout=timeout or self.timeout,
+            )
+            data = self._handle_response(response, path)
+        except Exception as e:
+            self._report_timing(path, time.perf_counter() - started, e)
+            raise
+        self._report_timing(path, time.perf_counter() - started)
+        return data
+
+    def get_many(self, paths, timeout=None) -> list:
+        """Make GET requests to several paths at once and return the responses
+        in the same order, raising the first error if any request fails."""
+        _, executor = self._resources()
+        futures = [executor.submit(self.get, path, timeout=timeout) for path in paths]
+        return [future.result() for future in futures]
+
+    def get_status_page(self, slug, timeout=None) -> tuple[dict, dict]:
+        """Get a status page and its heartbeats at once, with each heartbeat
+        turned into a :class:`Heartbeat` record."""
+        data, heartbeats = self.get_many(
+            [f"status-page/{slug}", f"status-page/heartbeat/{slug}"], timeout=timeout
+        )
+        heartbeat_list = heartbeats.get("heartbeatList")
+        if heartbeat_list:
+            heartbeats = {
+                **heartbeats,
+                "heartbeatList": {
+                    monitor_id: heartbeat_records(monitor_heartbeats)
+                    for monitor_id, monitor_heartbeats in heartbeat_list.items()
+                },
+            }
+        return data, heartbeats
+
+    def close(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._session.close()
+                self._executor.shutdown(wait=False)
+            self._pid = None
+            self._session = None
+            self._executor = None
@@ -0,0 +1,179 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from app.lib.uptime_kuma_api import Timeout, UptimeKumaApi
+
+
+class PooledSession:
+    """An UptimeKumaApi connection and the socket.io session ID it was
+    authenticated on."""
+
+    def __init__(self, api):
+        self.api = api
+        self.sid = None
+
+    @property
+    def connected(self):
+        return self.api.sio.connected
+
+    @property
+    def authenticated(self):
+        return self.sid is not None and self.sid == self.api.sio.sid
+
+    def login(self, jwt):
+        self.api.login_by_token(jwt)
+        self.sid = self.api.sio.sid
+
+    def close(self):
+        try:
+            self.api.disconnect()
+        except Exception:
+            pass
+
+
+class UptimeKumaSessionPool:
+    """A bounded pool of long-lived UptimeKumaApi sessions that have already
+    logged in with the configured JWT.
+
+    Sessions are checked when they are borrowed. Disconnected sessions are
+    replaced and sessions that socket.io has reconnected are logged in again.
+
+    The time spent waiting for a session, connecting and logging in is passed
+    to any functions in `timing_listeners` as `(name, seconds, error)`, and
+    functions in `session_timing_listeners` are added to the
+    `timing_listeners` of every UptimeKumaApi the pool opens."""
+
+    def __init__(self, app=None):
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = None
+        self._pid = None
+        self.uptime_kuma_url = ""
+        self.jwt = ""
+        self.size = 1
+        self.timeout = 10
+        self.timing_listeners = []
+        self.session_timing_listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.uptime_kuma_url = (app.config.get("UPTIME_KUMA_URL") or "").strip("/")
+        self.jwt = app.config.get("UPTIME_KUMA_JWT")
+        self.size = max(1, app.config.get("UPTIME_KUMA_POOL_SIZE"))
+        self.timeout = app.config.get("UPTIME_KUMA_POOL_TIMEOUT")
+        app.extensions["uptime_kuma_pool"] = self
+        self.drain()
+
+    def _reset_for_process(self):
+        # sessions belong to the process that opened them so a forked worker
+        # starts with an empty pool rather than sharing its parent's sockets
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = deque()
+            self._slots = threading.BoundedSemaphore(self.size)
+
+    def _report_timing(self, name, started, error=None):
+        seconds = time.perf_counter() - started
+        for listener in self.timing_listeners:
+            listener(name, seconds, error)
+
+    def _login(self, session):
+        started = time.perf_counter()
+        try:
+            session.login(self.jwt)
+        except Exception as e:
+            self._report_timing("login", started, e)
+            raise
+        self._report_timing("login", started)
+
+    def _open(self):
+        started = time.perf_counter()
+        try:
+            api = UptimeKumaApi(self.uptime_kuma_url)
+        except Exception as e:
+            self._report_timing("connect", started, e)
+            raise
+        self._report_timing("connect", started)
+        api.timing_listeners.extend(self.session_timing_listeners)
+        session = PooledSession(api)
+        try:
+            self._login(session)
+        except Exception:
+            session.close()
+            raise
+        return session
+
+    def _acquire(self):
+        with self._lock:
+            self._reset_for_process()
+            slots = self._slots
+        started = time.perf_counter()
+        if not slots.acquire(timeout=self.timeout):
+            error = Timeout("Timed out while waiting for an Uptime Kuma session")
+            self._report_timing("pool-wait", started, error)
+            raise error
+        self._report_timing("pool-wait", started)
+        session = None
+        try:
+            while True:
+                with self._lock:
+                    session = self._idle.pop() if self._idle else None
+                if session is None:
+                    return self._open(), slots
+                if not session.connected:
+                    session.close()
+                    continue
+                if not session.authenticated:
+                    self._login(session)
+                return session, slots
+        except Exception:
+            if session:
+                session.close()
+            slots.release()
+            raise
+
+    @contextmanager
+    def session(self):
+        """Borrow a logged in UptimeKumaApi for the duration of the block.
+
+        Sessions that raise an error while borrowed are closed rather than
+        being returned to the pool.
+
+        :raises Timeout: If no session becomes available in time.
+        :raises UptimeKumaException: If a new session cannot connect or log in.
+        """
+        session, slots = self._acquire()
+        try:
+            yield session.api
+        except BaseException:
+            session.close()
+            raise
+        else:
+            with self._lock:
+                if slots is self._slots:
+                    self._idle.append(session)
+                    session = None
+            if session:
+                session.close()
+        finally:
+            slots.release()
+
+    def drain(self):
+        """Disconnect every idle session."""
+        with self._lock:
+            idle = self._idle if self._pid == os.getpid() else deque()
+            self._idle = deque()
+            self._slots = threading.BoundedSemaphore(self.size)
+            self._pid = os.getpid()
+        while idle:
+            idle.pop().close()
+
+
+uptime_kuma_pool = UptimeKumaSessionPool()
+
+atexit.register(uptime_kuma_pool.drain)
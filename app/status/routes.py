@@ -1,15 +1,33 @@
-import os
+import json
 
-from flask import current_app, make_response, redirect, render_template, url_for
+from flask import (
+    Response,
+    current_app,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_caching import CachedResponse
-from tna_utilities.api import SimpleJsonApiClient
-from tna_utilities.string import slugify
 
-from app.lib.cache import cache, cache_key_prefix
-from app.lib.uptime_kuma_api.api import UptimeKumaApi
+from app.lib.cache import stale_while_revalidate
+from app.lib.conditional import (
+    conditional_get,
+    epoch_ms_to_datetime,
+    save_validators,
+    saved_validators,
+    with_validators,
+)
+from app.lib.heartbeat_rollups import DAY_MS
+from app.lib.heartbeat_store import heartbeat_store
+from app.lib.server_timing import server_timing
+from app.lib.snapshot_api import snapshot_document
+from app.lib.status_events import status_events
+from app.lib.status_poller import status_poller
 from app.lib.uptime_kuma_api.monitor_type import MonitorType
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
 from app.status import bp
-from config import DEFAULT_STATUS_PAGE_CACHE_DURATION
 
 
 def get_settings():
@@ -28,22 +46,66 @@ def get_settings():
     return uptime_kuma_url, uptime_kuma_status_page_slug
 
 
+def with_rollup_uptimes(uptime, summaries):
+    """Replace the 24 hour and 30 day uptimes from Uptime Kuma with those added
+    up from the stored rollups, where the rollups cover the window."""
+    uptime = dict(uptime or {})
+    for window, summary in summaries.items():
+        if window in (24, 720) and summary.uptime is not None:
+            uptime[window] = summary.uptime
+    return uptime
+
+
+def index_validators():
+    snapshot = status_poller.get_snapshot()
+    if not snapshot:
+        return None
+    document = snapshot_document(snapshot)
+    _, etag = document.render()
+    config = (snapshot.data or {}).get("config")
+    urls = {
+        monitor_id: monitor.get("url")
+        for monitor_id, monitor in snapshot.directory.by_id.items()
+    }
+    return (
+        f"{etag}/{json.dumps(config, sort_keys=True)}/{json.dumps(urls, sort_keys=True)}",
+        epoch_ms_to_datetime(document.version),
+    )
+
+
+def details_validators(monitor_slug, hours=None, link_to_90d=True):
+    # the page also shows the monitor's children, which needn't be on the status
+    # page, so the version of its data is only known once it has been rendered
+    if not current_app.config.get("UPTIME_KUMA_JWT"):
+        return None
+    return saved_validators()
+
+
+def details_version(snapshot, monitor_slug, beats):
+    """Work out the version of the data on a details page from the newest
+    heartbeat of the monitor and its children."""
+    versions = [snapshot_document(snapshot).versions.get(monitor_slug) or 0]
+    if heartbeat_store.enabled:
+        # the beats read from the store are only those around incidents
+        versions.append(heartbeat_store.get_version(list(beats)) or 0)
+    else:
+        versions.extend(series.times[-1] for series in beats.values() if len(series))
+    return max(versions)
+
+
 @bp.route("/")
-@cache.cached(
-    key_prefix=cache_key_prefix,
-    timeout=int(
-        os.environ.get("STATUS_PAGE_CACHE_DURATION", DEFAULT_STATUS_PAGE_CACHE_DURATION)
-    ),
+@conditional_get(index_validators)
+@stale_while_revalidate(
+    soft_timeout="STATUS_PAGE_CACHE_DURATION",
+    hard_timeout="STATUS_PAGE_CACHE_STALE_DURATION",
 )
 def index():
-    uptime_kuma_url, uptime_kuma_status_page_slug = get_settings()
-
-    client = SimpleJsonApiClient(f"{uptime_kuma_url}/api")
-    try:
-        data = client.get(f"status-page/{uptime_kuma_status_page_slug}")
-        heartbeats = client.get(f"status-page/heartbeat/{uptime_kuma_status_page_slug}")
-    except Exception as e:
-        current_app.logger.error(f"Failed to render status page: {e}")
+    get_settings()
+
+    with server_timing.span("snapshot"):
+        snapshot = status_poller.get_snapshot()
+    if not snapshot:
+        current_app.logger.error("Failed to render status page: no status data")
         return CachedResponse(
             response=make_response(render_template("errors/api.html"), 502),
             timeout=1,
@@ -51,81 +113,167 @@ def index():
 
     jwt_set_up = current_app.config.get("UPTIME_KUMA_JWT", "") != ""
 
-    return render_template(
-        "status/index.html", data=data, heartbeats=heartbeats, jwt_set_up=jwt_set_up
+    with server_timing.span("render"):
+        html = render_template(
+            "status/index.html",
+            data=snapshot.data,
+            heartbeats=snapshot.heartbeats,
+            monitor_directory=snapshot.directory,
+            jwt_set_up=jwt_set_up,
+        )
+    return with_validators(html)
+
+
+@bp.route("/events")
+def events():
+    snapshot = status_poller.get_snapshot()
+    if not snapshot:
+        return Response(status=503, headers={"Retry-After": "30"})
+    return Response(
+        status_events.stream(status_events.subscribe(snapshot)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
     )
 
 
+@bp.route("/api/snapshot")
+def snapshot_api():
+    snapshot = status_poller.get_snapshot()
+    if not snapshot:
+        return {"error": "No status data"}, 502
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return {"error": "since must be a version number"}, 400
+    body, etag = snapshot_document(snapshot).render(since)
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
 @bp.route("/<string:monitor_slug>/")
-@cache.cached(key_prefix=cache_key_prefix)
-def details(monitor_slug, hours=None, link_to_90d=True):  # noqa: C901
-    uptime_kuma_url, uptime_kuma_status_page_slug = get_settings()
+@conditional_get(details_validators)
+@stale_while_revalidate(
+    soft_timeout="DETAILED_SERVICE_REPORT_CACHE_DURATION",
+    hard_timeout="DETAILED_SERVICE_REPORT_CACHE_STALE_DURATION",
+)
+def details(monitor_slug, hours=None, link_to_90d=True):
+    get_settings()
+
+    if current_app.config.get("UPTIME_KUMA_JWT"):
+        with server_timing.span("snapshot"):
+            snapshot = status_poller.get_snapshot()
+        if not snapshot:
+            current_app.logger.error(
+                f"Failed to render detailed status page for '{monitor_slug}': no status data"
+            )
+            return CachedResponse(
+                response=make_response(render_template("errors/api.html"), 502),
+                timeout=1,
+            )
+        status_page_monitor_details = snapshot.directory.get(monitor_slug)
+        if not status_page_monitor_details:
+            return render_template("errors/page_not_found.html"), 404
+        monitor_id = status_page_monitor_details["id"]
 
-    if jwt := current_app.config.get("UPTIME_KUMA_JWT"):
         try:
-            with UptimeKumaApi(uptime_kuma_url) as api:
-                api.login_by_token(jwt)
-
-                status_page = api.get_status_page(uptime_kuma_status_page_slug)
-                if not status_page:
-                    return render_template("errors/page_not_found.html"), 404
-                status_page_monitor_details = None
-                monitor_id = None
-                groups = status_page.get("publicGroupList", [])
-                for list in groups:
-                    monitorList = list.get("monitorList", [])
-                    for monitor in monitorList:
-                        if slugify(monitor["name"]) == monitor_slug:
-                            status_page_monitor_details = monitor
-                            monitor_id = monitor["id"]
-                            break
-                if not monitor_id:
-                    return render_template("errors/page_not_found.html"), 404
-
-                monitors = api.get_monitors()
-                pings = api.avg_ping()
-                uptimes = api.uptime()
-                monitor = next((m for m in monitors if m["id"] == monitor_id), None)
-                monitor_children = []
-                if monitor:
-                    for child in monitor.get("childrenIDs", []):
-                        child = next((m for m in monitors if m["id"] == child), None)
-                        if child:
-                            monitor_children.append(child)
-                monitor_children.sort(key=lambda x: x["name"])
-                for child in monitor_children:
-                    child["heartbeats"] = api.get_monitor_beats(
-                        child["id"],
-                        hours
-                        or current_app.config.get("DETAILED_SERVICE_REPORT_HOURS"),
-                    )
-                    child["average_ping"] = pings.get(child["id"], None)
-                    child["uptime"] = uptimes.get(child["id"], None)
+            with uptime_kuma_pool.session() as api, server_timing.record(api):
+                with server_timing.span("monitors"):
+                    monitors = api.get_monitors()
+                    pings = api.avg_ping()
+                    uptimes = api.uptime()
+                monitor, monitor_children = snapshot.directory.monitor_and_children(
+                    monitors, monitor_id
+                )
+                hours = hours or current_app.config.get("DETAILED_SERVICE_REPORT_HOURS")
+                monitor_ids = [child["id"] for child in monitor_children] + [monitor_id]
+                max_workers = current_app.config.get("UPTIME_KUMA_MAX_CONCURRENT_CALLS")
+                timeout = current_app.config.get("DETAILED_SERVICE_REPORT_DEADLINE")
+                daily_rollups = {}
+                summaries = {}
+                with server_timing.span("beats"):
+                    if heartbeat_store.enabled:
+                        beats = heartbeat_store.get_monitors_beats(
+                            api,
+                            monitor_ids,
+                            hours,
+                            max_workers=max_workers,
+                            timeout=timeout,
+                            incidents_only=True,
+                        )
+                        daily_rollups = {
+                            id_: heartbeat_store.get_rollups(id_, DAY_MS, hours)
+                            for id_ in monitor_ids
+                        }
+                        # the store only holds the last `hours` hours in full
+                        summaries = {
+                            id_: {
+                                window: heartbeat_store.get_summary(id_, window)
+                                for window in {24, 720, hours}
+                                if window <= hours
+                            }
+                            for id_ in monitor_ids
+                        }
+                    else:
+                        beats = api.get_monitors_beats(
+                            monitor_ids,
+                            hours,
+                            max_workers=max_workers,
+                            timeout=timeout,
+                            series=True,
+                        )
+                monitor_children = [
+                    {
+                        **child,
+                        "heartbeats": beats[child["id"]],
+                        "daily_rollups": daily_rollups.get(child["id"]),
+                        "rollup_summary": summaries.get(child["id"], {}).get(hours),
+                        "average_ping": pings.get(child["id"], None),
+                        "uptime": with_rollup_uptimes(
+                            uptimes.get(child["id"]), summaries.get(child["id"], {})
+                        ),
+                    }
+                    for child in monitor_children
+                ]
 
-                uptime = uptimes.get(monitor_id, {})
-                heartbeats = api.get_monitor_beats(
-                    monitor_id,
-                    hours or current_app.config.get("DETAILED_SERVICE_REPORT_HOURS"),
+                uptime = with_rollup_uptimes(
+                    uptimes.get(monitor_id), summaries.get(monitor_id, {})
                 )
+                heartbeats = beats[monitor_id]
                 average_ping = pings.get(monitor_id, None)
+                version = details_version(snapshot, monitor_slug, beats)
+                if version:
+                    save_validators(
+                        f"{version}/{monitor_ids}/{hours}/{link_to_90d}",
+                        epoch_ms_to_datetime(version),
+                        timeout=current_app.config.get(
+                            "DETAILED_SERVICE_REPORT_CACHE_DURATION"
+                        ),
+                    )
 
-                return render_template(
-                    "status/details.html",
-                    status_page_monitor_details=status_page_monitor_details,
-                    monitor=monitor,
-                    monitor_children=monitor_children,
-                    MonitorType=MonitorType,
-                    uptime=uptime,
-                    heartbeats=heartbeats,
-                    heartbeat_hours_to_show=hours
-                    or current_app.config.get("DETAILED_SERVICE_REPORT_HOURS"),
-                    average_ping=average_ping,
-                    link_to_90d=(
-                        url_for("status.details_90d", monitor_slug=monitor_slug)
-                        if link_to_90d
-                        else None
-                    ),
-                )
+                with server_timing.span("render"):
+                    html = render_template(
+                        "status/details.html",
+                        status_page_monitor_details=status_page_monitor_details,
+                        monitor=monitor,
+                        monitor_children=monitor_children,
+                        MonitorType=MonitorType,
+                        uptime=uptime,
+                        heartbeats=heartbeats,
+                        daily_rollups=daily_rollups.get(monitor_id),
+                        rollup_summary=summaries.get(monitor_id, {}).get(hours),
+                        heartbeat_hours_to_show=hours,
+                        average_ping=average_ping,
+                        link_to_90d=(
+                            url_for("status.details_90d", monitor_slug=monitor_slug)
+                            if link_to_90d
+                            else None
+                        ),
+                    )
+                return with_validators(html)
         except Exception as e:
             current_app.logger.error(
                 f"Failed to render detailed status page for '{monitor_slug}': {e}"
@@ -139,6 +287,5 @@ def details(monitor_slug, hours=None, link_to_90d=True):  # noqa: C901
 
 
 @bp.route("/<string:monitor_slug>/90d/")
-@cache.cached(key_prefix=cache_key_prefix)
 def details_90d(monitor_slug):
     return details(monitor_slug, hours=90 * 24, link_to_90d=False)
@@ -0,0 +1,118 @@
+"""Measure the CPU time and memory allocated by get_monitors() and
+get_heartbeats() with 500 monitors, comparing the shared snapshots the API
+returns with the deepcopy and parse it used to do on every read.
+
+Run with::
+
+    python -m benchmarks.event_snapshots
+"""
+
+import time
+import tracemalloc
+from copy import deepcopy
+from unittest import mock
+
+from app.lib.uptime_kuma_api import UptimeKumaApi
+from app.lib.uptime_kuma_api.api import (
+    _convert_monitor_return,
+    int_to_bool,
+    parse_auth_method,
+    parse_monitor_status,
+    parse_monitor_type,
+)
+
+MONITORS = 500
+HEARTBEATS = 100
+ROUNDS = 20
+
+
+def monitor_list():
+    return {
+        str(i): {
+            "id": i,
+            "name": f"Monitor {i}",
+            "type": "http",
+            "url": f"https://example.com/{i}",
+            "active": 1,
+            "authMethod": None,
+            "notificationIDList": {"1": True},
+            "childrenIDs": [],
+            "tags": [],
+            "accepted_statuscodes": ["200-299"],
+        }
+        for i in range(1, MONITORS + 1)
+    }
+
+
+def heartbeat_list(monitor_id):
+    return [
+        {
+            "id": i,
+            "monitor_id": monitor_id,
+            "status": 1,
+            "msg": "200 - OK",
+            "ping": 100,
+            "important": 0,
+            "duration": 60,
+            "time": "2003-02-01 00:00:00.000",
+        }
+        for i in range(HEARTBEATS)
+    ]
+
+
+def copying_get_monitors(raw):
+    r = list(deepcopy(raw.copy()).values())
+    for monitor in r:
+        _convert_monitor_return(monitor)
+    int_to_bool(r, ["active"])
+    parse_monitor_type(r)
+    parse_auth_method(r)
+    return r
+
+
+def copying_get_heartbeats(raw):
+    r = deepcopy(raw.copy())
+    for i in r:
+        int_to_bool(r[i], ["important"])
+        parse_monitor_status(r[i])
+    return r
+
+
+def measure(call):
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        call()
+    elapsed = time.process_time() - start
+    # tracing allocations slows everything down so measure memory separately
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / ROUNDS * 1000, peak / 1024 / 1024
+
+
+def main():
+    raw_monitors = monitor_list()
+    raw_heartbeats = {i: heartbeat_list(i) for i in range(1, MONITORS + 1)}
+
+    with mock.patch.object(UptimeKumaApi, "connect", lambda self: None):
+        api = UptimeKumaApi("http://127.0.0.1", wait_events=0)
+    # only measure reading the data, not asking the server to send it again
+    api._call = lambda event, data=None: {}
+    api._event_monitor_list(raw_monitors)
+    for monitor_id, heartbeats in raw_heartbeats.items():
+        api._event_heartbeat_list(monitor_id, heartbeats, True)
+
+    print(f"{MONITORS} monitors, {HEARTBEATS} heartbeats each, {ROUNDS} rounds")
+    for name, call in [
+        ("get_monitors   deepcopy", lambda: copying_get_monitors(raw_monitors)),
+        ("get_monitors   snapshot", api.get_monitors),
+        ("get_heartbeats deepcopy", lambda: copying_get_heartbeats(raw_heartbeats)),
+        ("get_heartbeats snapshot", api.get_heartbeats),
+    ]:
+        cpu, peak = measure(call)
+        print(f"  {name}  {cpu:9.3f} ms CPU per call  {peak:8.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare how long UptimeKumaApi calls that read pushed event data take with
+the previous sleep polling and with the current event-driven waiting.
+
+Run with::
+
+    python -m benchmarks.event_waiting
+"""
+
+import statistics
+import time
+
+from app.lib.uptime_kuma_api import Event, Timeout, UptimeKumaApi
+from benchmarks.uptime_kuma_stand_in import UptimeKumaStandIn
+
+ROUNDS = 10
+
+
+class PollingUptimeKumaApi(UptimeKumaApi):
+    """UptimeKumaApi with the 10 ms polling and fixed wait_events sleep it
+    used before waiting was event-driven."""
+
+    def _get_event_data(self, event):
+        monitor_events = [
+            Event.AVG_PING,
+            Event.UPTIME,
+            Event.HEARTBEAT_LIST,
+            Event.IMPORTANT_HEARTBEAT_LIST,
+            Event.CERT_INFO,
+            Event.HEARTBEAT,
+        ]
+        timestamp = time.time()
+        while self._event_data[event] is None:
+            if time.time() - timestamp > self.timeout:
+                raise Timeout(f"Timed out while waiting for event {event}")
+            if self._event_data[Event.MONITOR_LIST] == {} and event in monitor_events:
+                return []
+            time.sleep(0.01)
+        time.sleep(self.wait_events)
+        # copying is measured by benchmarks.event_snapshots
+        return self._event_data[event]
+
+
+def time_calls(api):
+    timings = {}
+    for name, call in [
+        ("get_monitors", api.get_monitors),
+        ("avg_ping", api.avg_ping),
+        ("uptime", api.uptime),
+    ]:
+        start = time.perf_counter()
+        call()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def run(api_class, url):
+    fresh = []
+    settled = []
+    for _ in range(ROUNDS):
+        with api_class(url) as api:
+            api.login_by_token("token")
+            # straight after logging in, while the server is still pushing
+            fresh.append(time_calls(api))
+            # a long-lived session where the pushed data has already settled
+            settled.append(time_calls(api))
+    return fresh, settled
+
+
+def report(label, results):
+    for name in results[0]:
+        values = [result[name] * 1000 for result in results]
+        print(
+            f"  {label:<9} {name:<13} "
+            f"mean {statistics.mean(values):7.1f} ms  "
+            f"max {max(values):7.1f} ms"
+        )
+
+
+def main():
+    with UptimeKumaStandIn(monitors=20) as url:
+        for api_class in [PollingUptimeKumaApi, UptimeKumaApi]:
+            fresh, settled = run(api_class, url)
+            print(api_class.__name__)
+            report("fresh", fresh)
+            report("settled", settled)
+
+
+if __name__ == "__main__":
+    main()
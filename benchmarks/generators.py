@@ -0,0 +1,181 @@
+"""Synthetic Uptime Kuma data for benchmarks, in the shapes Uptime Kuma sends
+it. Everything is generated from a seed so that runs are comparable."""
+
+import datetime
+import random
+
+from app.lib.uptime_kuma_api import HeartbeatSeries, MonitorType
+
+
+def generate_heartbeats(
+    hours,
+    monitor_id=1,
+    interval_seconds=60,
+    incident_density=0.001,
+    incident_minutes=15,
+    maintenance_share=0.1,
+    seed=1,
+    now=None,
+):
+    """
+    Generate the heartbeats of one monitor as `getMonitorBeats` returns them,
+    oldest first.
+
+    :param int hours: How many hours of heartbeats to generate, up to now.
+    :param int, optional monitor_id: The ID of the monitor, defaults to 1
+    :param int, optional interval_seconds: The time between heartbeats, defaults to 60
+    :param float, optional incident_density: The chance of an incident starting at each heartbeat, defaults to 0.001
+    :param int, optional incident_minutes: The average length of an incident, defaults to 15
+    :param float, optional maintenance_share: The share of incidents that are planned maintenance, defaults to 0.1
+    :param int, optional seed: The random seed, defaults to 1
+    :param datetime.datetime, optional now: The time of the newest heartbeat, defaults to now
+    :return: The heartbeats.
+    :rtype: list[dict]
+    """
+    rng = random.Random(f"{seed}/{monitor_id}")
+    now = (now or datetime.datetime.now()).replace(microsecond=0)
+    count = hours * 3600 // interval_seconds
+    first = now - datetime.timedelta(seconds=interval_seconds * (count - 1))
+    incident_beats = max(1, incident_minutes * 60 // interval_seconds)
+    beats = []
+    status = 1
+    remaining = 0
+    down_count = 0
+    for i in range(count):
+        previous_status = status
+        if remaining:
+            remaining -= 1
+        elif rng.random() < incident_density:
+            status = 3 if rng.random() < maintenance_share else 0
+            remaining = max(1, int(rng.expovariate(1 / incident_beats)))
+        else:
+            status = 1
+        down_count = down_count + 1 if status == 0 else 0
+        beats.append(
+            {
+                "id": i + 1,
+                "monitor_id": monitor_id,
+                "status": status,
+                "msg": (
+                    "timeout of 48000ms exceeded"
+                    if status == 0
+                    else "Maintenance" if status == 3 else "200 - OK"
+                ),
+                "ping": rng.randint(20, 400) if status == 1 else None,
+                "important": 1 if status != previous_status or i == 0 else 0,
+                "duration": 0 if i == 0 else interval_seconds,
+                "down_count": down_count,
+                "time": (
+                    first + datetime.timedelta(seconds=interval_seconds * i)
+                ).isoformat(sep=" ", timespec="milliseconds"),
+            }
+        )
+    return beats
+
+
+def generate_monitors(count, seed=1):
+    """
+    Generate a monitor list as `getMonitorList` sends it, with a group monitor
+    whose children are the other monitors.
+
+    :param int count: The number of monitors in the group.
+    :param int, optional seed: The random seed, defaults to 1
+    :return: The monitors by ID, with the group first.
+    :rtype: dict
+    """
+    rng = random.Random(seed)
+    monitors = {
+        "1": {
+            "id": 1,
+            "name": "Services",
+            "description": "All of our public services",
+            "type": "group",
+            "active": 1,
+            "parent": None,
+            "authMethod": None,
+            "childrenIDs": list(range(2, count + 2)),
+            "notificationIDList": {},
+        }
+    }
+    for i in range(2, count + 2):
+        monitors[str(i)] = {
+            "id": i,
+            "name": f"Service {i}",
+            "description": f"Service {i} *description*",
+            "url": f"https://example.com/{i}",
+            "type": rng.choice(["http", "keyword", "ping"]),
+            "active": rng.choice([0, 1]),
+            "parent": 1,
+            "authMethod": rng.choice([None, "basic"]),
+            "childrenIDs": [],
+            "notificationIDList": {"1": True},
+        }
+    return monitors
+
+
+def details_context(
+    children=5, hours=30 * 24, incident_density=0.001, seed=1, now=None
+):
+    """
+    Build the template context the details route renders for a group monitor
+    with `children` monitors, using heartbeat series as the route does.
+
+    :param int, optional children: The number of monitors in the group, defaults to 5
+    :param int, optional hours: The number of hours of heartbeats, defaults to 30 days
+    :param float, optional incident_density: The chance of an incident starting at each heartbeat, defaults to 0.001
+    :param int, optional seed: The random seed, defaults to 1
+    :param datetime.datetime, optional now: The time of the newest heartbeats, defaults to now
+    :return: The keyword arguments for ``render_template``.
+    :rtype: dict
+    """
+    rng = random.Random(seed)
+
+    def beats(monitor_id):
+        return HeartbeatSeries.from_heartbeats(
+            monitor_id,
+            generate_heartbeats(
+                hours,
+                monitor_id=monitor_id,
+                incident_density=incident_density,
+                seed=seed,
+                now=now,
+            ),
+        )
+
+    def uptime():
+        return {24: rng.uniform(0.9, 1), 720: rng.uniform(0.9, 1), "1y": 0.99}
+
+    monitor_children = [
+        {
+            **monitor,
+            "type": MonitorType(monitor["type"]),
+            "heartbeats": beats(monitor["id"]),
+            "daily_rollups": None,
+            "rollup_summary": None,
+            "average_ping": rng.uniform(20, 400),
+            "uptime": uptime(),
+        }
+        for monitor in list(generate_monitors(children, seed).values())[1:]
+    ]
+    return {
+        "status_page_monitor_details": {
+            "id": 1,
+            "name": "Services",
+            "url": "https://example.com",
+        },
+        "monitor": {
+            "id": 1,
+            "name": "Services",
+            "description": "All of our public services",
+            "type": MonitorType.GROUP,
+        },
+        "monitor_children": monitor_children,
+        "MonitorType": MonitorType,
+        "uptime": uptime(),
+        "heartbeats": beats(1),
+        "daily_rollups": None,
+        "rollup_summary": None,
+        "heartbeat_hours_to_show": hours,
+        "average_ping": rng.uniform(20, 400),
+        "link_to_90d": None,
+    }
@@ -0,0 +1,96 @@
+"""Measure the memory held by 90 days of heartbeats for one monitor as a list
+of dicts and as a HeartbeatSeries, and how long finding incidents in each
+takes.
+
+Run with::
+
+    python -m benchmarks.heartbeat_series
+"""
+
+import datetime
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from app.lib.incidents import find_incidents
+from app.lib.uptime_kuma_api.api import int_to_bool, parse_monitor_status
+from app.lib.uptime_kuma_api.heartbeat_series import HeartbeatSeries
+
+HEARTBEATS = 90 * 24 * 60
+ROUNDS = 5
+
+
+def get_monitor_beats_response():
+    rng = random.Random(1)
+    start = datetime.datetime(2003, 2, 1)
+    beats = []
+    for i in range(HEARTBEATS):
+        down = rng.random() < 0.01
+        beats.append(
+            {
+                "id": i + 1,
+                "monitor_id": 1,
+                "status": 0 if down else 1,
+                "msg": "timeout of 48000ms exceeded" if down else "200 - OK",
+                "ping": None if down else rng.randint(20, 400),
+                "important": 0,
+                "duration": 60,
+                "down_count": 0,
+                "time": (start + datetime.timedelta(minutes=i)).isoformat(
+                    sep=" ", timespec="milliseconds"
+                ),
+            }
+        )
+    # decode the response like socket.io does, so that every string is a
+    # separate object
+    return json.dumps({"data": beats})
+
+
+def list_of_dicts(response):
+    beats = json.loads(response)["data"]
+    int_to_bool(beats, ["important"])
+    parse_monitor_status(beats)
+    return beats
+
+
+def series(response):
+    return HeartbeatSeries.from_heartbeats(1, json.loads(response)["data"])
+
+
+def retained_memory(build, response):
+    gc.collect()
+    tracemalloc.start()
+    result = build(response)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 1024 / 1024, peak / 1024 / 1024
+
+
+def incidents_time(heartbeats):
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        find_incidents(heartbeats, True)
+    return (time.process_time() - start) / ROUNDS * 1000
+
+
+def main():
+    response = get_monitor_beats_response()
+    print(f"{HEARTBEATS} heartbeats for one monitor")
+    for name, build in [
+        ("list of dicts", list_of_dicts),
+        ("HeartbeatSeries", series),
+    ]:
+        heartbeats, current, peak = retained_memory(build, response)
+        cpu = incidents_time(heartbeats)
+        print(
+            f"  {name:15}  {current:8.2f} MiB held  {peak:8.2f} MiB peak while building"
+            f"  {cpu:8.1f} ms CPU to find incidents"
+        )
+        del heartbeats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Measure how long rendering the status index takes with 20 planned
+maintenance items, comparing the shared, memoized Markdown renderer with
+creating a new parser for every piece of text as the markdown filter used to.
+
+Run with::
+
+    python -m benchmarks.markdown_rendering
+"""
+
+import time
+
+from flask import render_template
+from markdown_it import MarkdownIt
+
+from app import create_app
+from app.lib.markdown_renderer import markdown_renderer
+from app.lib.monitor_directory import MonitorDirectory
+
+MAINTENANCE = 20
+MONITORS = 10
+ROUNDS = 50
+
+DESCRIPTION = """We are upgrading the **{title}** service.
+
+During this time:
+
+- searches may be slower than usual
+- some records may not be available
+- [downloads](https://example.com/downloads) will be paused
+
+Contact us if you need help.
+"""
+
+
+def status_page():
+    return {
+        "config": {
+            "title": "Test services",
+            "description": "The status of our *public* services.",
+        },
+        "incidents": [
+            {
+                "title": "Slow searches",
+                "content": "Searches are **slower** than usual.",
+                "createdDate": "2003-02-01 00:00:00",
+                "lastUpdatedDate": None,
+            }
+        ],
+        "maintenanceList": [
+            {
+                "id": i,
+                "title": f"Maintenance {i}",
+                "description": DESCRIPTION.format(title=f"Maintenance {i}"),
+                "status": "scheduled",
+                "timezone": "UTC",
+                "timezoneOffset": "+00:00",
+                "timeslotList": [
+                    {
+                        "startDate": "2003-02-02 00:00:00",
+                        "endDate": "2003-02-02 02:00:00",
+                    }
+                ],
+            }
+            for i in range(1, MAINTENANCE + 1)
+        ],
+        "publicGroupList": [
+            {
+                "name": "Services",
+                "monitorList": [
+                    {"id": i, "name": f"Monitor {i}"} for i in range(1, MONITORS + 1)
+                ],
+            }
+        ],
+    }
+
+
+def heartbeats():
+    return {
+        "heartbeatList": {
+            str(i): [
+                {"status": 1, "time": f"2003-02-01 00:{minute:02}:00"}
+                for minute in range(60)
+            ]
+            for i in range(1, MONITORS + 1)
+        }
+    }
+
+
+def uncached_markdown(s):
+    if not s:
+        return ""
+    md = MarkdownIt()
+    return md.render(s)
+
+
+def render_time(app, data, beats):
+    context = {
+        "data": data,
+        "heartbeats": beats,
+        "monitor_directory": MonitorDirectory(data),
+        "jwt_set_up": False,
+    }
+    with app.test_request_context("/status/"):
+        render_template("status/index.html", **context)
+        start = time.process_time()
+        for _ in range(ROUNDS):
+            render_template("status/index.html", **context)
+    return (time.process_time() - start) / ROUNDS * 1000
+
+
+def main():
+    app = create_app("config.Test")
+    data = status_page()
+    beats = heartbeats()
+    shared_markdown = app.jinja_env.filters["markdown"]
+    print(f"Status index with {MAINTENANCE} maintenance items, {ROUNDS} rounds")
+    for name, markdown in [
+        ("new parser per call", uncached_markdown),
+        ("shared and memoized", shared_markdown),
+    ]:
+        app.jinja_env.filters["markdown"] = markdown
+        markdown_renderer.clear()
+        cpu = render_time(app, data, beats)
+        print(f"  {name}  {cpu:8.2f} ms CPU per render")
+    print(
+        f"  renderer cache: {markdown_renderer.hits} hits,"
+        f" {markdown_renderer.misses} misses"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Time the hot paths of rendering the status pages on synthetic data, save
+the results as JSON and compare them with a saved baseline.
+
+Run with::
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare baseline.json
+
+Comparing exits with status 1 if any benchmark's median time is more than
+--threshold slower than in the baseline.
+"""
+
+import argparse
+import copy
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+
+from flask import render_template
+
+from app import create_app
+from app.lib.cache import cache
+from app.lib.context_processor import incident_analytics
+from app.lib.template_filters import previous_incidents
+from app.lib.uptime_kuma_api import HeartbeatSeries, heartbeat_records
+from app.lib.uptime_kuma_api.api import (
+    int_to_bool,
+    parse_auth_method,
+    parse_monitor_type,
+)
+from benchmarks.generators import (
+    details_context,
+    generate_heartbeats,
+    generate_monitors,
+)
+
+# the shortest time a round of a fast benchmark is repeated for
+MIN_ROUND_SECONDS = 0.05
+
+
+class Benchmark:
+    """A function to time, with an optional `prepare` function that is called
+    before each call, outside the timing, to make its argument."""
+
+    def __init__(self, name, run, prepare=None, params=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+        self.params = params or {}
+
+    def _time(self, number):
+        if self.prepare:
+            arguments = [self.prepare() for _ in range(number)]
+            start = time.perf_counter()
+            for argument in arguments:
+                self.run(argument)
+        else:
+            start = time.perf_counter()
+            for _ in range(number):
+                self.run(None)
+        return time.perf_counter() - start
+
+    def measure(self, rounds):
+        """
+        Time the benchmark, calling it as many times in each round as it takes
+        for the round to last at least MIN_ROUND_SECONDS.
+
+        :param int rounds: The number of rounds to time.
+        :return: The result, with times per call in milliseconds.
+        :rtype: dict
+        """
+        number = 1
+        while True:
+            elapsed = self._time(number)
+            if elapsed >= MIN_ROUND_SECONDS or number >= 1024:
+                break
+            number *= 2
+        times = [self._time(number) / number * 1000 for _ in range(rounds)]
+        return {
+            "params": self.params,
+            "rounds": rounds,
+            "number": number,
+            "min_ms": min(times),
+            "median_ms": statistics.median(times),
+            "mean_ms": statistics.fmean(times),
+            "stdev_ms": statistics.stdev(times) if rounds > 1 else 0.0,
+        }
+
+
+def build_benchmarks(monitors, monitor_list_size, days, densities, now):
+    benchmarks = []
+
+    # the status index finds incidents in the last 100 heartbeats of each
+    # monitor from the status page, and the details page in a whole window
+    index_records = heartbeat_records(
+        generate_heartbeats(2, incident_density=0.05, now=now)[-100:]
+    )
+    benchmarks.append(
+        Benchmark(
+            "previous_incidents/index",
+            lambda _: previous_incidents(index_records),
+            params={"heartbeats": len(index_records)},
+        )
+    )
+    for window in days:
+        for density in densities:
+            series = HeartbeatSeries.from_heartbeats(
+                1,
+                generate_heartbeats(window * 24, incident_density=density, now=now),
+            )
+            params = {"days": window, "incident_density": density}
+            benchmarks.append(
+                Benchmark(
+                    f"previous_incidents/{window}d/density={density}",
+                    lambda _, series=series: previous_incidents(series, True),
+                    params={**params, "heartbeats": len(series)},
+                )
+            )
+            incidents = previous_incidents(series, True)
+            benchmarks.append(
+                Benchmark(
+                    f"incident_analytics/{window}d/density={density}",
+                    lambda _, i=incidents, d=window: incident_analytics(i, d),
+                    params={**params, "incidents": len(incidents)},
+                )
+            )
+
+    # get_monitors parses every monitor in the list it is sent
+    monitor_list = list(generate_monitors(monitor_list_size).values())
+
+    def parse_monitors(monitor_list):
+        int_to_bool(monitor_list, ["active"])
+        parse_monitor_type(monitor_list)
+        parse_auth_method(monitor_list)
+
+    benchmarks.append(
+        Benchmark(
+            "parse_value/monitors",
+            parse_monitors,
+            prepare=lambda: copy.deepcopy(monitor_list),
+            params={"monitors": len(monitor_list)},
+        )
+    )
+
+    app = create_app("config.Test")
+    for window in days:
+        context = details_context(monitors, window * 24, densities[0], now=now)
+
+        def render(_, context=context, window=window):
+            # render every fragment rather than reusing the ones from the
+            # previous call
+            cache.clear()
+            with app.test_request_context(f"/status/services/{window}d/"):
+                render_template("status/details.html", **context)
+
+        benchmarks.append(
+            Benchmark(
+                f"render_details/{window}d",
+                render,
+                params={
+                    "days": window,
+                    "monitors": monitors + 1,
+                    "incident_density": densities[0],
+                },
+            )
+        )
+    return benchmarks
+
+
+def run(benchmarks, rounds, only=None, log=print):
+    results = {}
+    for benchmark in benchmarks:
+        if only and not any(name in benchmark.name for name in only):
+            continue
+        results[benchmark.name] = benchmark.measure(rounds)
+        log(f"  {benchmark.name:50}  {results[benchmark.name]['median_ms']:10.3f} ms")
+    return results
+
+
+def compare(baseline, current, threshold):
+    """
+    Compare the median times of two sets of results.
+
+    :param dict baseline: The saved results.
+    :param dict current: The new results.
+    :param float threshold: How much slower, as a fraction, counts as a regression.
+    :return: The name, baseline and current median times and change of each
+        benchmark that was run with the same parameters in both, and the names
+        of the regressions.
+    :rtype: tuple[list, list]
+    """
+    rows = []
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        saved = baseline["benchmarks"].get(name)
+        if not saved or saved.get("params") != result["params"]:
+            continue
+        change = result["median_ms"] / saved["median_ms"] - 1
+        rows.append((name, saved["median_ms"], result["median_ms"], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with results saved in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="how much slower counts as a regression, default 0.1 (10%%)",
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--monitors", type=int, default=5, help="monitors in the group, default 5"
+    )
+    parser.add_argument(
+        "--monitor-list",
+        type=int,
+        default=500,
+        help="monitors in the monitor list that is parsed, default 500",
+    )
+    parser.add_argument(
+        "--days", type=int, nargs="+", default=[30, 90], help="default 30 90"
+    )
+    parser.add_argument(
+        "--density",
+        type=float,
+        nargs="+",
+        default=[0.001, 0.01],
+        help="chance of an incident starting at each heartbeat, default 0.001 0.01",
+    )
+    parser.add_argument(
+        "--only", nargs="+", help="only run benchmarks with one of these in the name"
+    )
+    args = parser.parse_args(argv)
+
+    # heartbeats end at midday so that runs on the same day use the same data
+    now = datetime.datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    print("Generating data")
+    benchmarks = build_benchmarks(
+        args.monitors, args.monitor_list, args.days, args.density, now
+    )
+    print(f"Running {args.rounds} rounds")
+    results = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {
+            "rounds": args.rounds,
+            "monitors": args.monitors,
+            "monitor_list": args.monitor_list,
+            "days": args.days,
+            "density": args.density,
+        },
+        "benchmarks": run(benchmarks, args.rounds, args.only),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(baseline, results, args.threshold)
+        print(f"Compared with {args.compare}")
+        skipped = len(results["benchmarks"]) - len(rows)
+        if skipped:
+            print(f"  {skipped} benchmarks are new or were run with other parameters")
+        for name, saved, current, change in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(
+                f"  {name:50}  {saved:10.3f} ms  {current:10.3f} ms"
+                f"  {change * 100:+7.1f}%{flag}"
+            )
+        if regressions:
+            print(
+                f"{len(regressions)} benchmarks are more than {args.threshold:.0%} slower"
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""A stand-in for Uptime Kuma that tests and benchmarks start on localhost.
+
+Run one on its own to load test the app against it, with::
+
+    python -m benchmarks.uptime_kuma_stand_in --port 3001 --latency 0.05
+
+and set UPTIME_KUMA_URL to http://127.0.0.1:3001, UPTIME_KUMA_STATUS_PAGE_SLUG
+to test and UPTIME_KUMA_JWT to anything.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+
+import socketio
+from werkzeug.serving import WSGIRequestHandler, make_server
+from werkzeug.wrappers import Request, Response
+
+from benchmarks.generators import generate_heartbeats, generate_monitors
+
+# Uptime Kuma pushes and serves this many of each monitor's latest heartbeats
+LATEST_HEARTBEATS = 100
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log(self, type, message, *args):
+        pass
+
+
+class UptimeKumaStandIn:
+    """A local server that answers the socket.io events and REST endpoints
+    that UptimeKumaApi, the status page poller and the details page use.
+
+    The monitors are a group with `monitors - 1` children, and their
+    heartbeats are made by :func:`benchmarks.generators.generate_heartbeats`,
+    so the same arguments always give the same data.
+
+    After logging in, the data for each monitor is pushed as a burst of
+    separate messages like Uptime Kuma does, with push_interval seconds
+    between them.
+
+    Every answer is delayed by `latency` seconds plus up to `jitter` seconds.
+    `heartbeat_interval` and `message_size` control how large heartbeat
+    payloads are. Each event or request fails with the chance `failure_rate`,
+    and the socket.io events and REST paths in `fail` always fail. These can
+    all be changed while the server is running.
+
+    Example::
+
+        with UptimeKumaStandIn(monitors=10, latency=0.05) as url:
+            with UptimeKumaApi(url) as api:
+                api.login_by_token("token")
+                api.get_monitors()
+    """
+
+    def __init__(
+        self,
+        monitors=10,
+        push_interval=0.005,
+        status_page_slug="test",
+        latency=0,
+        jitter=0,
+        heartbeat_interval=60,
+        message_size=0,
+        incident_density=0.001,
+        failure_rate=0,
+        fail=(),
+        seed=1,
+    ):
+        self.monitors = generate_monitors(max(0, monitors - 1), seed)
+        self.push_interval = push_interval
+        self.status_page_slug = status_page_slug
+        self.latency = latency
+        self.jitter = jitter
+        self.heartbeat_interval = heartbeat_interval
+        self.message_size = message_size
+        self.incident_density = incident_density
+        self.failure_rate = failure_rate
+        self.fail = set(fail)
+        self.seed = seed
+        self.now = datetime.datetime.now()
+        self.calls = []
+        self._rng = random.Random(seed)
+        self._heartbeats = {}
+        self._lock = threading.Lock()
+        self.sio = socketio.Server(async_mode="threading")
+        self.sio.on("loginByToken", self._login_by_token)
+        self.sio.on("getMonitorList", self._get_monitor_list)
+        self.sio.on("getMonitorBeats", self._get_monitor_beats)
+        self.sio.on("getStatusPage", self._get_status_page)
+        self.server = None
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    def heartbeats(self, monitor_id, hours):
+        """The heartbeats of a monitor in the last `hours` hours, oldest first."""
+        key = (int(monitor_id), hours)
+        with self._lock:
+            if key not in self._heartbeats:
+                beats = generate_heartbeats(
+                    hours,
+                    monitor_id=int(monitor_id),
+                    interval_seconds=self.heartbeat_interval,
+                    incident_density=self.incident_density,
+                    seed=self.seed,
+                    now=self.now,
+                )
+                if self.message_size:
+                    for beat in beats:
+                        beat["msg"] = beat["msg"].ljust(self.message_size, ".")
+                self._heartbeats[key] = beats
+            return self._heartbeats[key]
+
+    def latest_heartbeats(self, monitor_id):
+        hours = math.ceil(LATEST_HEARTBEATS * self.heartbeat_interval / 3600)
+        return self.heartbeats(monitor_id, hours)[-LATEST_HEARTBEATS:]
+
+    def status_page(self):
+        group = self.monitors["1"]
+        return {
+            "config": {
+                "slug": self.status_page_slug,
+                "title": "Stand-in services",
+                "description": "Services on the Uptime Kuma stand-in",
+                "icon": "/icon.svg",
+                "theme": "light",
+                "published": True,
+                "showTags": False,
+                "customCSS": "",
+                "footerText": None,
+                "showPoweredBy": False,
+                "googleAnalyticsId": None,
+                "showCertificateExpiry": False,
+            },
+            "incident": None,
+            "publicGroupList": [
+                {
+                    "id": 1,
+                    "name": "Services",
+                    "weight": 1,
+                    "monitorList": [
+                        {
+                            "id": group["id"],
+                            "name": group["name"],
+                            "sendUrl": 0,
+                            "type": group["type"],
+                        }
+                    ],
+                }
+            ],
+            "maintenanceList": [],
+        }
+
+    def status_page_heartbeats(self):
+        return {
+            "heartbeatList": {
+                id_: self.latest_heartbeats(id_) for id_ in self.monitors
+            },
+            "uptimeList": {f"{id_}_24": 1 for id_ in self.monitors},
+        }
+
+    def _answer(self, name):
+        """Wait for the latency and decide whether to fail the answer."""
+        self.calls.append(name)
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        return name in self.fail or (
+            self.failure_rate and self._rng.random() < self.failure_rate
+        )
+
+    def _login_by_token(self, sid, token):
+        if self._answer("loginByToken"):
+            return {"ok": False, "msg": "Injected failure"}
+        self.sio.start_background_task(self._push_monitor_data, sid)
+        return {"ok": True}
+
+    def _get_monitor_list(self, sid):
+        if self._answer("getMonitorList"):
+            return {"ok": False, "msg": "Injected failure"}
+        self.sio.emit("monitorList", self.monitors, to=sid)
+        return {"ok": True}
+
+    def _get_monitor_beats(self, sid, monitor_id, hours):
+        if self._answer("getMonitorBeats"):
+            return {"ok": False, "msg": "Injected failure"}
+        return {"ok": True, "data": self.heartbeats(monitor_id, hours)}
+
+    def _get_status_page(self, sid, slug):
+        if self._answer("getStatusPage"):
+            return {"ok": False, "msg": "Injected failure"}
+        if slug != self.status_page_slug:
+            return {"ok": False, "msg": "Status page not found"}
+        return {"ok": True, "config": self.status_page()["config"]}
+
+    def _push_monitor_data(self, sid):
+        self.sio.emit("monitorList", self.monitors, to=sid)
+        for id_ in self.monitors:
+            time.sleep(self.push_interval)
+            self.sio.emit(
+                "heartbeatList", (id_, self.latest_heartbeats(id_), True), to=sid
+            )
+            self.sio.emit("avgPing", (id_, 100), to=sid)
+            self.sio.emit("uptime", (id_, 24, 1), to=sid)
+            self.sio.emit("uptime", (id_, 720, 1), to=sid)
+            self.sio.emit("uptime", (id_, "1y", 1), to=sid)
+
+    def _rest(self, environ, start_response):
+        request = Request(environ)
+        match = re.fullmatch(r"/api/status-page/(heartbeat/)?([^/]+)", request.path)
+        if not match:
+            return Response("Not found", status=404)(environ, start_response)
+        if self._answer(request.path):
+            return Response("Injected failure", status=500)(environ, start_response)
+        if match.group(2) != self.status_page_slug:
+            return Response("Not found", status=404)(environ, start_response)
+        data = self.status_page_heartbeats() if match.group(1) else self.status_page()
+        return Response(json.dumps(data), status=200, mimetype="application/json")(
+            environ, start_response
+        )
+
+    def start(self, port=0):
+        self.server = make_server(
+            "127.0.0.1",
+            port,
+            socketio.WSGIApp(self.sio, self._rest),
+            threaded=True,
+            request_handler=QuietRequestHandler,
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.uptime_kuma_stand_in",
+        description="Run a stand-in Uptime Kuma server until interrupted.",
+    )
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--monitors", type=int, default=10)
+    parser.add_argument("--slug", default="test", help="the status page slug")
+    parser.add_argument("--latency", type=float, default=0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0, help="seconds")
+    parser.add_argument(
+        "--heartbeat-interval", type=int, default=60, help="seconds, default 60"
+    )
+    parser.add_argument(
+        "--message-size", type=int, default=0, help="pad heartbeat messages"
+    )
+    parser.add_argument("--incident-density", type=float, default=0.001)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    parser.add_argument(
+        "--fail",
+        nargs="+",
+        default=[],
+        help="socket.io events or REST paths that always fail",
+    )
+    args = parser.parse_args(argv)
+    stand_in = UptimeKumaStandIn(
+        monitors=args.monitors,
+        status_page_slug=args.slug,
+        latency=args.latency,
+        jitter=args.jitter,
+        heartbeat_interval=args.heartbeat_interval,
+        message_size=args.message_size,
+        incident_density=args.incident_density,
+        failure_rate=args.failure_rate,
+        fail=args.fail,
+    )
+    print(f"Uptime Kuma stand-in running at {stand_in.start(args.port)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
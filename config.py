@@ -35,6 +35,9 @@ class Production(Features):
     DEBUG: bool = False
     SENTRY_DSN: str = os.getenv("SENTRY_DSN", "")
     SENTRY_SAMPLE_RATE: float = float(os.getenv("SENTRY_SAMPLE_RATE", "0.1"))
+    SERVER_TIMING_ENABLED: bool = strtobool(os.getenv("SERVER_TIMING_ENABLED", "False"))
+    METRICS_DIR: str = os.environ.get("METRICS_DIR", "")
+    METRICS_FLUSH_SECONDS: int = int(os.environ.get("METRICS_FLUSH_SECONDS", "10"))
 
     COOKIE_DOMAIN: str = os.environ.get("COOKIE_DOMAIN", ".nationalarchives.gov.uk")
     COOKIE_PREFERENCES_URL: str = os.environ.get("COOKIE_PREFERENCES_URL", "/cookies/")
@@ -65,19 +68,81 @@ class Production(Features):
     STATUS_PAGE_CACHE_DURATION: int = int(
         os.environ.get("STATUS_PAGE_CACHE_DURATION", DEFAULT_STATUS_PAGE_CACHE_DURATION)
     )
+    STATUS_PAGE_CACHE_STALE_DURATION: int = int(
+        os.environ.get("STATUS_PAGE_CACHE_STALE_DURATION", "300")
+    )
+    STATUS_PAGE_POLL_SECONDS: int = int(
+        os.environ.get("STATUS_PAGE_POLL_SECONDS", DEFAULT_STATUS_PAGE_CACHE_DURATION)
+    )
+    STATUS_PAGE_POLL_TIMEOUT: int = int(
+        os.environ.get("STATUS_PAGE_POLL_TIMEOUT", "10")
+    )
+    STATUS_PAGE_SNAPSHOT_MAX_AGE: int = int(
+        os.environ.get("STATUS_PAGE_SNAPSHOT_MAX_AGE", "300")
+    )
+    STATUS_EVENTS_QUEUE_SIZE: int = int(
+        os.environ.get("STATUS_EVENTS_QUEUE_SIZE", "32")
+    )
+    STATUS_EVENTS_KEEPALIVE_SECONDS: int = int(
+        os.environ.get("STATUS_EVENTS_KEEPALIVE_SECONDS", "15")
+    )
+    STATUS_EVENTS_MAX_SECONDS: int = int(
+        os.environ.get("STATUS_EVENTS_MAX_SECONDS", "600")
+    )
     CACHE_IGNORE_ERRORS: bool = True
     CACHE_DIR: str = os.environ.get("CACHE_DIR", "/tmp")
     CACHE_REDIS_URL: str = os.environ.get("CACHE_REDIS_URL", "")
+    FRAGMENT_CACHE_DURATION: int = int(os.environ.get("FRAGMENT_CACHE_DURATION", "300"))
+    CACHE_COMPRESS_MIN_SIZE: int = int(
+        os.environ.get("CACHE_COMPRESS_MIN_SIZE", "1024")
+    )
+    CACHE_GZIP_LEVEL: int = int(os.environ.get("CACHE_GZIP_LEVEL", "9"))
+    CACHE_BROTLI_QUALITY: int = int(os.environ.get("CACHE_BROTLI_QUALITY", "11"))
+    CACHE_REGENERATION_LEASE_DURATION: int = int(
+        os.environ.get("CACHE_REGENERATION_LEASE_DURATION", "60")
+    )
 
     UPTIME_KUMA_URL: str = os.environ.get("UPTIME_KUMA_URL", "").rstrip("/")
     UPTIME_KUMA_JWT: str = os.environ.get("UPTIME_KUMA_JWT", "")
     UPTIME_KUMA_STATUS_PAGE_SLUG: str = os.environ.get(
         "UPTIME_KUMA_STATUS_PAGE_SLUG", ""
     )
+    UPTIME_KUMA_POOL_SIZE: int = int(os.environ.get("UPTIME_KUMA_POOL_SIZE", "2"))
+    UPTIME_KUMA_POOL_TIMEOUT: int = int(
+        os.environ.get("UPTIME_KUMA_POOL_TIMEOUT", "10")
+    )
+    UPTIME_KUMA_HTTP_POOL_SIZE: int = int(
+        os.environ.get("UPTIME_KUMA_HTTP_POOL_SIZE", "4")
+    )
+    UPTIME_KUMA_HTTP_TIMEOUT: int = int(
+        os.environ.get("UPTIME_KUMA_HTTP_TIMEOUT", "10")
+    )
+    UPTIME_KUMA_MAX_CONCURRENT_CALLS: int = int(
+        os.environ.get("UPTIME_KUMA_MAX_CONCURRENT_CALLS", "4")
+    )
 
     DETAILED_SERVICE_REPORT_HOURS: int = int(
         os.environ.get("DETAILED_SERVICE_REPORT_HOURS", "720")
     )  # 30 days
+    DETAILED_SERVICE_REPORT_CACHE_DURATION: int = int(
+        os.environ.get("DETAILED_SERVICE_REPORT_CACHE_DURATION", CACHE_DEFAULT_TIMEOUT)
+    )
+    DETAILED_SERVICE_REPORT_CACHE_STALE_DURATION: int = int(
+        os.environ.get("DETAILED_SERVICE_REPORT_CACHE_STALE_DURATION", "3600")
+    )
+    DETAILED_SERVICE_REPORT_DEADLINE: int = int(
+        os.environ.get("DETAILED_SERVICE_REPORT_DEADLINE", "30")
+    )
+
+    HEARTBEAT_STORE_PATH: str = os.environ.get(
+        "HEARTBEAT_STORE_PATH", os.path.join(CACHE_DIR, "heartbeats.sqlite3")
+    )
+    HEARTBEAT_STORE_RETENTION_DAYS: int = int(
+        os.environ.get("HEARTBEAT_STORE_RETENTION_DAYS", "91")
+    )
+    HEARTBEAT_STORE_COMPACT_SECONDS: int = int(
+        os.environ.get("HEARTBEAT_STORE_COMPACT_SECONDS", "3600")
+    )
 
 
 class Staging(Production):
@@ -86,6 +151,9 @@ class Staging(Production):
     SENTRY_SAMPLE_RATE = float(os.getenv("SENTRY_SAMPLE_RATE", "1"))
 
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", "120"))
+    DETAILED_SERVICE_REPORT_CACHE_DURATION = int(
+        os.environ.get("DETAILED_SERVICE_REPORT_CACHE_DURATION", CACHE_DEFAULT_TIMEOUT)
+    )
 
 
 class Develop(Production):
@@ -94,6 +162,9 @@ class Develop(Production):
     SENTRY_SAMPLE_RATE = float(os.getenv("SENTRY_SAMPLE_RATE", "0"))
 
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", "1"))
+    DETAILED_SERVICE_REPORT_CACHE_DURATION = int(
+        os.environ.get("DETAILED_SERVICE_REPORT_CACHE_DURATION", CACHE_DEFAULT_TIMEOUT)
+    )
 
 
 class Test(Production):
@@ -109,6 +180,9 @@ class Test(Production):
 
     CACHE_TYPE: str = "SimpleCache"
     CACHE_DEFAULT_TIMEOUT: int = 1
+    DETAILED_SERVICE_REPORT_CACHE_DURATION: int = CACHE_DEFAULT_TIMEOUT
+
+    HEARTBEAT_STORE_PATH: str = ""
 
     FORCE_HTTPS: bool = False
     PREFERRED_URL_SCHEME: str = "http"
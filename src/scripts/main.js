@@ -34,7 +34,7 @@ const rtf1 = new Intl.RelativeTimeFormat("en", {
 //   }
 // };
 
-document.querySelectorAll("time[datetime]").forEach(($el) => {
+const formatTimeElement = ($el) => {
   $el.setAttribute("title", $el.textContent);
   const date = new Date($el.getAttribute("datetime"));
   if (date) {
@@ -51,7 +51,9 @@ document.querySelectorAll("time[datetime]").forEach(($el) => {
   // setInterval(() => {
   //   updateTimeElements($el);
   // }, 1000);
-});
+};
+
+document.querySelectorAll("time[datetime]").forEach(formatTimeElement);
 
 const $refreshTimer = document.getElementById("refresh-countdown");
 const $refreshTime = document.querySelector(
@@ -85,34 +87,142 @@ const updateRefreshTimer = (refreshTime) => {
   }
 };
 
-if ($refreshTimer && $refreshTime) {
-  const url = new URL(window.location.href);
-  if (url.searchParams.has("refresh")) {
-    const $generatedTimeEl = document.querySelector(
-      "meta[name='tna.response.generated'",
-    );
-    if ($generatedTimeEl) {
-      const generatedTime = new Date($generatedTimeEl.getAttribute("content"));
-      if (generatedTime) {
-        const refreshTime = new Date(
-          generatedTime.getTime() +
-            parseInt($refreshTime.getAttribute("content"), 10) * 1000,
-        );
-        /* eslint-disable-next-line max-depth */
-        if (refreshTime) {
-          const $ariaLiveEl = document.createElement("p");
-          $ariaLiveEl.id = "aria-live-refresh";
-          $ariaLiveEl.setAttribute("aria-live", "assertive");
-          $ariaLiveEl.setAttribute("role", "status");
-          $ariaLiveEl.setAttribute("class", "tna-!--visually-hidden");
-          document.body.appendChild($ariaLiveEl);
+const startRefreshCountdown = () => {
+  const $generatedTimeEl = document.querySelector(
+    "meta[name='tna.response.generated'",
+  );
+  if ($generatedTimeEl) {
+    const generatedTime = new Date($generatedTimeEl.getAttribute("content"));
+    if (generatedTime) {
+      const refreshTime = new Date(
+        Math.max(generatedTime.getTime(), new Date().getTime()) +
+          parseInt($refreshTime.getAttribute("content"), 10) * 1000,
+      );
+      if (refreshTime) {
+        const $ariaLiveEl = document.createElement("p");
+        $ariaLiveEl.id = "aria-live-refresh";
+        $ariaLiveEl.setAttribute("aria-live", "assertive");
+        $ariaLiveEl.setAttribute("role", "status");
+        $ariaLiveEl.setAttribute("class", "tna-!--visually-hidden");
+        document.body.appendChild($ariaLiveEl);
 
+        updateRefreshTimer(refreshTime);
+        setInterval(() => {
           updateRefreshTimer(refreshTime);
-          setInterval(() => {
-            updateRefreshTimer(refreshTime);
-          }, 1000);
+        }, 1000);
+      }
+    }
+  }
+};
+
+const createHeartbeatItem = (monitor) => {
+  const $item = document.createElement("li");
+  $item.className = `tna-heartbeats__item tna-heartbeats__item--status-${monitor.status_class}`;
+  const $time = document.createElement("time");
+  $time.setAttribute("datetime", `${monitor.time}Z`);
+  $time.textContent = `${monitor.time} (UTC)`;
+  formatTimeElement($time);
+  $item.setAttribute("title", `${$time.textContent}: ${monitor.title}`);
+  $item.append($time, `: ${monitor.title}`);
+  return $item;
+};
+
+const addHeartbeat = ($graph, monitor) => {
+  const $items = $graph.querySelectorAll(".tna-heartbeats__item");
+  const $newest = $items[$items.length - 1];
+  const $newestTime = $newest && $newest.querySelector("time");
+  if (
+    $newestTime &&
+    $newestTime.getAttribute("datetime") === `${monitor.time}Z`
+  ) {
+    return;
+  }
+  const hiddenOnMobile = $graph.querySelectorAll(
+    ".tna-heartbeats__item--hide-on-mobile",
+  ).length;
+  $graph.appendChild(createHeartbeatItem(monitor));
+  if ($items.length) {
+    $items[0].remove();
+  }
+  $graph.querySelectorAll(".tna-heartbeats__item").forEach(($item, index) => {
+    $item.classList.toggle(
+      "tna-heartbeats__item--hide-on-mobile",
+      index < hiddenOnMobile,
+    );
+  });
+};
+
+const updateMonitor = (monitor) => {
+  document
+    .querySelectorAll(`[data-monitor-id="${monitor.id}"]`)
+    .forEach(($monitor) => {
+      if ($monitor.classList.contains("tna-monitor-summary")) {
+        $monitor.classList.forEach((className) => {
+          if (className.startsWith("tna-accent-")) {
+            $monitor.classList.remove(className);
+          }
+        });
+        if (monitor.accent_colour) {
+          $monitor.classList.add(monitor.accent_colour);
         }
       }
+      $monitor.querySelectorAll("[data-monitor-icon]").forEach(($icon) => {
+        $icon.setAttribute(
+          "class",
+          `fa-solid fa-fw ${monitor.fontawesome_icon}`,
+        );
+      });
+      $monitor.querySelectorAll("[data-monitor-title]").forEach(($title) => {
+        $title.textContent = monitor.title;
+      });
+      $monitor.querySelectorAll(".tna-heartbeats").forEach(($graph) => {
+        addHeartbeat($graph, monitor);
+      });
+    });
+};
+
+const updatePageTime = () => {
+  document.querySelectorAll("time[data-page-updated]").forEach(($el) => {
+    $el.setAttribute("datetime", new Date().toISOString());
+    formatTimeElement($el);
+  });
+};
+
+const startLiveUpdates = (eventsUrl) => {
+  const source = new EventSource(eventsUrl);
+  const onMonitors = (event) => {
+    JSON.parse(event.data).forEach(updateMonitor);
+    updatePageTime();
+  };
+  source.addEventListener("open", () => {
+    $refreshTimer.textContent = "Showing live updates.";
+  });
+  source.addEventListener("snapshot", onMonitors);
+  source.addEventListener("monitors", onMonitors);
+  source.addEventListener("reload", () => {
+    // incidents, maintenance or the monitors shown have changed so reload the
+    // whole page once the cached copy of it has been replaced
+    source.close();
+    startRefreshCountdown();
+  });
+  source.addEventListener("error", () => {
+    if (source.readyState === EventSource.CLOSED) {
+      // live updates aren't available so reload the page instead
+      startRefreshCountdown();
+    }
+  });
+};
+
+if ($refreshTimer && $refreshTime) {
+  const url = new URL(window.location.href);
+  if (url.searchParams.has("refresh")) {
+    const $eventsUrl = document.querySelector(
+      "meta[name='tna.status.events_url']",
+    );
+    if ($eventsUrl && "EventSource" in window) {
+      startLiveUpdates($eventsUrl.getAttribute("content"));
+    } else {
+      startRefreshCountdown();
     }
   }
 }
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from app.lib.incidents import find_incidents
+from benchmarks.generators import generate_heartbeats
+from benchmarks.suite import compare, main
+
+
+class BenchmarkSuiteTestCase(unittest.TestCase):
+    def test_generated_heartbeats(self):
+        beats = generate_heartbeats(24, incident_density=0.05)
+        self.assertEqual(len(beats), 24 * 60)
+        self.assertEqual(beats, generate_heartbeats(24, incident_density=0.05))
+        self.assertTrue(find_incidents(beats))
+        self.assertFalse(find_incidents(generate_heartbeats(24, incident_density=0)))
+
+    def test_compare_flags_regressions(self):
+        baseline = {
+            "benchmarks": {
+                "a": {"params": {}, "median_ms": 1.0},
+                "b": {"params": {}, "median_ms": 1.0},
+                "c": {"params": {"days": 30}, "median_ms": 1.0},
+            }
+        }
+        current = {
+            "benchmarks": {
+                "a": {"params": {}, "median_ms": 1.05},
+                "b": {"params": {}, "median_ms": 1.5},
+                "c": {"params": {"days": 90}, "median_ms": 3.0},
+                "d": {"params": {}, "median_ms": 3.0},
+            }
+        }
+        rows, regressions = compare(baseline, current, 0.1)
+        self.assertEqual([row[0] for row in rows], ["a", "b"])
+        self.assertEqual(regressions, ["b"])
+
+    def test_run_and_compare(self):
+        arguments = ["--rounds", "1", "--days", "1", "--only", "index", "parse"]
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(arguments + ["--output", output]), 0)
+            with open(output) as f:
+                results = json.load(f)
+            self.assertEqual(
+                sorted(results["benchmarks"]),
+                ["parse_value/monitors", "previous_incidents/index"],
+            )
+            for result in results["benchmarks"].values():
+                result["median_ms"] /= 100
+            with open(output, "w") as f:
+                json.dump(results, f)
+            with redirect_stdout(StringIO()) as stdout:
+                self.assertEqual(main(arguments + ["--compare", output]), 1)
+            self.assertIn("REGRESSION", stdout.getvalue())
@@ -0,0 +1,94 @@
+import time
+import unittest
+
+from app import create_app
+from app.lib.heartbeat_store import heartbeat_store
+from app.lib.status_poller import status_poller
+from app.lib.uptime_kuma_api import MonitorStatus, UptimeKumaApi, UptimeKumaException
+from app.lib.uptime_kuma_http import UptimeKumaHttpClient
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
+from benchmarks.uptime_kuma_stand_in import UptimeKumaStandIn
+
+
+class UptimeKumaStandInTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stand_in = UptimeKumaStandIn(monitors=3, push_interval=0)
+        self.url = self.stand_in.start()
+
+    def tearDown(self):
+        self.stand_in.stop()
+
+    def test_socket_events(self):
+        with UptimeKumaApi(self.url, wait_events=0.05) as api:
+            api.login_by_token("token")
+            monitors = api.get_monitors()
+            self.assertEqual([monitor["id"] for monitor in monitors], [1, 2, 3])
+            self.assertEqual(monitors[0]["childrenIDs"], [2, 3])
+            self.assertEqual(sorted(api.avg_ping()), [1, 2, 3])
+            self.assertEqual(len(api.get_heartbeats()[2]), 100)
+            beats = api.get_monitors_beats([2, 3], 2, series=True)
+            self.assertEqual(len(beats[2]), 120)
+            self.assertIsInstance(beats[3][0]["status"], MonitorStatus)
+
+    def test_rest_endpoints(self):
+        http = UptimeKumaHttpClient(self.url)
+        try:
+            data, heartbeats = http.get_status_page("test")
+        finally:
+            http.close()
+        self.assertEqual(data["publicGroupList"][0]["monitorList"][0]["id"], 1)
+        self.assertEqual(len(heartbeats["heartbeatList"]["2"]), 100)
+
+    def test_latency_and_payload_size(self):
+        self.stand_in.latency = 0.1
+        self.stand_in.message_size = 500
+        with UptimeKumaApi(self.url, wait_events=0.05) as api:
+            started = time.perf_counter()
+            api.login_by_token("token")
+            self.assertGreaterEqual(time.perf_counter() - started, 0.1)
+            beats = api.get_monitor_beats(2, 1)
+        self.assertEqual(len(beats[0]["msg"]), 500)
+
+    def test_failure_injection(self):
+        self.stand_in.fail = {"getMonitorBeats", "/api/status-page/heartbeat/test"}
+        with UptimeKumaApi(self.url, wait_events=0.05) as api:
+            api.login_by_token("token")
+            with self.assertRaises(UptimeKumaException):
+                api.get_monitor_beats(2, 1)
+        http = UptimeKumaHttpClient(self.url)
+        try:
+            with self.assertRaises(Exception):
+                http.get_status_page("test")
+        finally:
+            http.close()
+        self.stand_in.fail = set()
+        self.stand_in.failure_rate = 1
+        with UptimeKumaApi(self.url, wait_events=0.05) as api:
+            with self.assertRaises(UptimeKumaException):
+                api.login_by_token("token")
+
+    def test_details_page(self):
+        # one heartbeat an hour keeps 30 days of heartbeats small
+        self.stand_in.heartbeat_interval = 3600
+        app = create_app("config.Test")
+        app.config["UPTIME_KUMA_URL"] = self.url
+        app.config["UPTIME_KUMA_STATUS_PAGE_SLUG"] = "test"
+        app.config["UPTIME_KUMA_JWT"] = "token"
+        app.config["UPTIME_KUMA_POOL_TIMEOUT"] = 5
+        status_poller.init_app(app)
+        status_poller.start = lambda: None
+        uptime_kuma_pool.init_app(app)
+        heartbeat_store.init_app(app)
+        try:
+            # publish without notifying listeners, which are shared by tests
+            status_poller._snapshot = status_poller.fetch()
+            status_poller._ready.set()
+            rv = app.test_client().get("/status/services/")
+        finally:
+            del status_poller.start
+            uptime_kuma_pool.drain()
+            status_poller._snapshot = None
+            status_poller._ready.clear()
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn("Service 2", rv.text)
+        self.assertIn("getMonitorBeats", self.stand_in.calls)
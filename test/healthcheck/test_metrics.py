@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from app import create_app
+from app.lib.metrics import Counter, Histogram, Metrics, metrics
+from app.lib.monitor_directory import MonitorDirectory
+from app.lib.status_poller import StatusPageSnapshot, status_poller
+
+
+class MetricTypesTestCase(unittest.TestCase):
+    def test_counter(self):
+        counter = Counter("requests_total", "Requests", ["route"])
+        counter.inc(route="status.index")
+        counter.inc(2, route="status.index")
+        [(key, values)] = counter.state()
+        self.assertEqual(
+            list(counter.samples(tuple(key), values)),
+            ['requests_total{route="status.index"} 3'],
+        )
+
+    def test_histogram(self):
+        histogram = Histogram("render_seconds", "Render", ["template"], [0.1, 1])
+        histogram.observe(0.05, template='a"b')
+        histogram.observe(0.5, template='a"b')
+        histogram.observe(5, template='a"b')
+        [(key, values)] = histogram.state()
+        self.assertEqual(
+            list(histogram.samples(tuple(key), values)),
+            [
+                'render_seconds_bucket{template="a\\"b",le="0.1"} 1',
+                'render_seconds_bucket{template="a\\"b",le="1"} 2',
+                'render_seconds_bucket{template="a\\"b",le="+Inf"} 3',
+                'render_seconds_sum{template="a\\"b"} 5.55',
+                'render_seconds_count{template="a\\"b"} 3',
+            ],
+        )
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("config.Test")
+        self.app.config["UPTIME_KUMA_URL"] = "http://uptime-kuma.test"
+        self.app.config["UPTIME_KUMA_STATUS_PAGE_SLUG"] = "test"
+        status_poller.init_app(self.app)
+        status_poller.start = lambda: None
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        del status_poller.start
+        status_poller._snapshot = None
+        status_poller._ready.clear()
+
+    def publish(self):
+        data = {
+            "config": {"title": "Test services"},
+            "publicGroupList": [
+                {"name": "Services", "monitorList": [{"id": 1, "name": "Web"}]}
+            ],
+        }
+        status_poller._snapshot = StatusPageSnapshot(
+            data=data,
+            heartbeats={
+                "heartbeatList": {"1": [{"status": 1, "time": "2003-02-01 00:00:00"}]}
+            },
+            fetched_at=time.time() - 5,
+            directory=MonitorDirectory(data),
+        )
+        status_poller._ready.set()
+
+    def count(self, metric, *key):
+        values = metrics.collect()[metric].get(key)
+        return values[-1 if metric.endswith("_seconds") else 0] if values else 0
+
+    def test_page_cache_and_render_metrics(self):
+        self.publish()
+        misses = self.count("status_page_cache_requests_total", "status.index", "miss")
+        hits = self.count("status_page_cache_requests_total", "status.index", "hit")
+        self.client.get("/status/")
+        self.client.get("/status/")
+        self.assertEqual(
+            self.count("status_page_cache_requests_total", "status.index", "miss"),
+            misses + 1,
+        )
+        self.assertEqual(
+            self.count("status_page_cache_requests_total", "status.index", "hit"),
+            hits + 1,
+        )
+        self.assertGreater(
+            self.count("template_render_seconds", "status/index.html"), 0
+        )
+
+        rv = self.client.get("/healthcheck/metrics")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(
+            rv.headers["Content-Type"], "text/plain; version=0.0.4; charset=utf-8"
+        )
+        self.assertIn("# TYPE status_page_cache_requests_total counter", rv.text)
+        self.assertIn(
+            'template_render_seconds_bucket{template="status/index.html",le="+Inf"}',
+            rv.text,
+        )
+        self.assertRegex(rv.text, r"\nstatus_page_snapshot_age_seconds 5\.\d+\n")
+
+    def test_upstream_metrics(self):
+        errors = self.count("uptime_kuma_errors_total", "rest", "status-page/test")
+        status_poller.http._report_timing("status-page/test", 0.2)
+        status_poller.http._report_timing("status-page/test", 0.3, Exception())
+        self.assertEqual(
+            self.count("uptime_kuma_errors_total", "rest", "status-page/test"),
+            errors + 1,
+        )
+        rv = self.client.get("/healthcheck/metrics")
+        self.assertIn(
+            'uptime_kuma_request_seconds_count{client="rest",name="status-page/test"}',
+            rv.text,
+        )
+
+    def test_workers_are_added_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            worker = Metrics()
+            other = Metrics()
+            worker.directory = directory
+            worker.page_cache.inc(route="status.index", result="hit")
+            other.page_cache.inc(3, route="status.index", result="hit")
+            with open(os.path.join(directory, "1.json"), "w") as f:
+                json.dump(other.state(), f)
+            worker.flush()
+            with open(worker._path) as f:
+                self.assertEqual(json.load(f), worker.state())
+            self.assertEqual(
+                worker.collect()["status_page_cache_requests_total"][
+                    ("status.index", "hit")
+                ],
+                [4.0],
+            )
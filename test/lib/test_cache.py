@@ -0,0 +1,140 @@
+import gzip
+import threading
+import time
+import unittest
+from unittest import mock
+
+import brotli
+from flask import Flask, make_response
+from flask_caching import CachedResponse
+
+from app.lib.cache import cache, stale_while_revalidate
+
+
+class StaleWhileRevalidateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["CACHE_TYPE"] = "SimpleCache"
+        self.app.config["SOFT_TIMEOUT"] = 10
+        self.app.config["HARD_TIMEOUT"] = 60
+        self.app.config["CACHE_REGENERATION_LEASE_DURATION"] = 60
+        self.app.config["CACHE_COMPRESS_MIN_SIZE"] = 100
+        self.app.config["CACHE_GZIP_LEVEL"] = 6
+        self.app.config["CACHE_BROTLI_QUALITY"] = 5
+        cache.init_app(self.app)
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.status = 200
+
+        @self.app.route("/page/")
+        @stale_while_revalidate(
+            soft_timeout="SOFT_TIMEOUT", hard_timeout="HARD_TIMEOUT"
+        )
+        def page():
+            self.calls += 1
+            self.release.wait(timeout=5)
+            if self.status >= 500:
+                return CachedResponse(
+                    response=make_response("error", self.status), timeout=1
+                )
+            return f"render {self.calls}"
+
+        @self.app.route("/big/")
+        @stale_while_revalidate(
+            soft_timeout="SOFT_TIMEOUT", hard_timeout="HARD_TIMEOUT"
+        )
+        def big():
+            self.calls += 1
+            response = make_response("<li>Up</li>" * 100)
+            response.set_etag("abc")
+            return response
+
+        self.client = self.app.test_client()
+
+    def get_in_threads(self, count):
+        results = []
+
+        def get():
+            results.append(self.client.get("/page/").text)
+
+        threads = [threading.Thread(target=get) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_fresh_response_is_cached(self):
+        self.assertEqual(self.client.get("/page/").text, "render 1")
+        self.assertEqual(self.client.get("/page/").text, "render 1")
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_misses_regenerate_once(self):
+        self.release.clear()
+        threads, results = self.get_in_threads(8)
+        time.sleep(0.1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["render 1"] * 8)
+
+    def test_stale_response_served_while_regenerating(self):
+        now = time.time()
+        self.client.get("/page/")
+        self.release.clear()
+        with mock.patch("app.lib.cache.time.time", return_value=now + 30):
+            threads, results = self.get_in_threads(4)
+            time.sleep(0.1)
+            self.assertEqual(sorted(results), ["render 1"] * 3)
+            self.release.set()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(sorted(results), ["render 1"] * 3 + ["render 2"])
+            self.assertEqual(self.client.get("/page/").text, "render 2")
+        self.assertEqual(self.calls, 2)
+
+    def test_stale_response_kept_on_server_error(self):
+        now = time.time()
+        self.client.get("/page/")
+        self.status = 502
+        with mock.patch("app.lib.cache.time.time", return_value=now + 30):
+            rv = self.client.get("/page/")
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(rv.text, "render 1")
+            self.client.get("/page/")
+        self.assertEqual(self.calls, 2)
+
+    def test_server_error_without_stale_response(self):
+        self.status = 502
+        self.assertEqual(self.client.get("/page/").status_code, 502)
+
+    def test_compressed_once_when_cached(self):
+        with mock.patch("gzip.compress", wraps=gzip.compress) as compress:
+            for _ in range(3):
+                rv = self.client.get("/big/", headers={"Accept-Encoding": "gzip"})
+                self.assertEqual(rv.headers["Content-Encoding"], "gzip")
+                self.assertIn("Accept-Encoding", rv.headers["Vary"])
+                self.assertEqual(rv.headers["ETag"], '"abc-gzip"')
+                self.assertEqual(gzip.decompress(rv.data).decode(), "<li>Up</li>" * 100)
+                self.assertEqual(int(rv.headers["Content-Length"]), len(rv.data))
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_brotli_preferred(self):
+        rv = self.client.get("/big/", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(rv.headers["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", rv.headers["Vary"])
+        self.assertEqual(rv.headers["ETag"], '"abc-br"')
+        self.assertEqual(brotli.decompress(rv.data).decode(), "<li>Up</li>" * 100)
+        rv = self.client.get("/big/", headers={"Accept-Encoding": "br"})
+        self.assertEqual(rv.headers["Content-Encoding"], "br")
+        self.assertEqual(rv.headers["ETag"], '"abc-br"')
+
+    def test_uncompressed_without_accept_encoding(self):
+        rv = self.client.get("/big/")
+        self.assertNotIn("Content-Encoding", rv.headers)
+        self.assertIn("Accept-Encoding", rv.headers["Vary"])
+        self.assertEqual(rv.headers["ETag"], '"abc"')
+        self.assertEqual(rv.text, "<li>Up</li>" * 100)
+        rv = self.client.get("/big/", headers={"Accept-Encoding": "gzip;q=0"})
+        self.assertNotIn("Content-Encoding", rv.headers)
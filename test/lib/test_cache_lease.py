@@ -0,0 +1,183 @@
+import socketserver
+import threading
+import time
+import unittest
+
+from flask import Flask
+
+from app.lib.cache import RegenerationLease, cache, stale_while_revalidate
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        command = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            command.append(self.rfile.read(length + 2)[:-2])
+        return command
+
+    def handle(self):
+        while (command := self.read_command()) is not None:
+            name = command[0].decode().upper()
+            handler = getattr(self.server, f"command_{name.lower()}", None)
+            if handler is None:
+                reply = f"-ERR unknown command '{name}'\r\n".encode()
+            else:
+                with self.server.lock:
+                    reply = self.encode(handler(*command[1:]))
+            self.wfile.write(reply)
+
+    def encode(self, value):
+        if value is True:
+            return b"+OK\r\n"
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        return b"$" + str(len(value)).encode() + b"\r\n" + value + b"\r\n"
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol for the cache and the regeneration
+    lease, with keys expiring like they do in Redis."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+        self.lock = threading.Lock()
+        self.data = {}
+
+    def lookup(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def command_ping(self, *args):
+        return True
+
+    def command_client(self, *args):
+        return True
+
+    def command_get(self, key):
+        return self.lookup(key)
+
+    def command_set(self, key, value, *options):
+        options = [option.decode().upper() for option in options]
+        if "NX" in options and self.lookup(key) is not None:
+            return None
+        expires = None
+        for unit, seconds in [("EX", 1), ("PX", 0.001)]:
+            if unit in options:
+                ttl = int(options[options.index(unit) + 1]) * seconds
+                expires = time.monotonic() + ttl
+        self.data[key] = (value, expires)
+        return True
+
+    def command_del(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def command_eval(self, script, count, key, token):
+        # the only script used is the lease release, which deletes the key if
+        # it still holds the token
+        if self.lookup(key) == token:
+            return self.command_del(key)
+        return 0
+
+
+@unittest.skipIf(redis is None, "redis is not installed")
+class RegenerationLeaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.redis = RedisStandIn()
+        threading.Thread(target=self.redis.serve_forever, daemon=True).start()
+        self.url = f"redis://127.0.0.1:{self.redis.server_address[1]}/0?protocol=2"
+        self.calls = 0
+        self.workers = [self.create_worker(), self.create_worker()]
+
+    def tearDown(self):
+        self.redis.shutdown()
+        self.redis.server_close()
+
+    def create_worker(self):
+        app = Flask(__name__)
+        app.config["CACHE_TYPE"] = "RedisCache"
+        app.config["CACHE_REDIS_URL"] = self.url
+        app.config["CACHE_REGENERATION_LEASE_DURATION"] = 5
+        cache.init_app(app)
+
+        @app.route("/page/")
+        @stale_while_revalidate(soft_timeout=10, hard_timeout=60)
+        def page():
+            self.calls += 1
+            return f"render {self.calls}"
+
+        return app
+
+    def lease(self, worker, key="swr//page/"):
+        with worker.app_context():
+            return RegenerationLease(key)
+
+    def cache_page(self, worker, rv, age=0):
+        with worker.app_context():
+            now = time.time() - age
+            cache.set("swr//page/", (now + 10, now + 60, rv), timeout=60)
+
+    def test_one_worker_holds_the_lease(self):
+        first, second = self.lease(self.workers[0]), self.lease(self.workers[1])
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+
+    def test_expired_lease_is_not_released_by_its_old_holder(self):
+        first, second = self.lease(self.workers[0]), self.lease(self.workers[1])
+        first.duration = 0.05
+        self.assertTrue(first.acquire())
+        time.sleep(0.1)
+        self.assertTrue(second.acquire())
+        first.release()
+        self.assertFalse(self.lease(self.workers[0]).acquire())
+        second.release()
+
+    def test_regenerating_releases_the_lease(self):
+        rv = self.workers[0].test_client().get("/page/")
+        self.assertEqual(rv.text, "render 1")
+        self.assertTrue(self.lease(self.workers[1]).acquire())
+
+    def test_stale_response_served_while_another_worker_regenerates(self):
+        self.cache_page(self.workers[1], "render by another worker", age=30)
+        self.assertTrue(self.lease(self.workers[1]).acquire())
+        rv = self.workers[0].test_client().get("/page/")
+        self.assertEqual(rv.text, "render by another worker")
+        self.assertEqual(self.calls, 0)
+
+    def test_miss_waits_for_another_worker(self):
+        lease = self.lease(self.workers[1])
+        self.assertTrue(lease.acquire())
+
+        def regenerate():
+            time.sleep(0.3)
+            self.cache_page(self.workers[1], "render by another worker")
+            with self.workers[1].app_context():
+                lease.release()
+
+        thread = threading.Thread(target=regenerate)
+        thread.start()
+        rv = self.workers[0].test_client().get("/page/")
+        thread.join()
+        self.assertEqual(rv.text, "render by another worker")
+        self.assertEqual(self.calls, 0)
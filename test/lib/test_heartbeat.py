@@ -0,0 +1,84 @@
+import datetime
+import random
+import unittest
+
+from app.lib.incidents import find_incidents
+from app.lib.uptime_kuma_api.api import int_to_bool, parse_monitor_status
+from app.lib.uptime_kuma_api.heartbeat import (
+    Heartbeat,
+    heartbeat_datetime,
+    heartbeat_records,
+)
+from app.lib.uptime_kuma_api.heartbeat_series import HeartbeatSeries
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+def generate_beats(rng, count, start=datetime.datetime(2003, 2, 1)):
+    return [
+        {
+            "id": i + 1,
+            "monitor_id": 7,
+            "status": rng.choice([0, 1, 1, 1, 2, 3]),
+            "msg": rng.choice(["200 - OK", "timeout of 48000ms exceeded", ""]),
+            "ping": rng.choice([None, rng.randint(1, 900)]),
+            "important": rng.choice([0, 1]),
+            "duration": 60,
+            "down_count": 0,
+            "time": (start + datetime.timedelta(minutes=i)).isoformat(
+                sep=" ", timespec="milliseconds"
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+def parse_beats(beats):
+    beats = [dict(beat) for beat in beats]
+    int_to_bool(beats, ["important"])
+    parse_monitor_status(beats)
+    return beats
+
+
+class HeartbeatTestCase(unittest.TestCase):
+    def test_records_match_parsed_beats(self):
+        beats = generate_beats(random.Random(1), 50)
+        records = heartbeat_records(beats)
+        self.assertEqual(records, parse_beats(beats))
+        self.assertIs(records[0].status, MonitorStatus(beats[0]["status"]))
+        self.assertIs(records[0]._keys, records[1]._keys)
+        self.assertFalse(hasattr(records[0], "__dict__"))
+        with self.assertRaises(TypeError):
+            records[0]["status"] = 0
+
+    def test_time_is_parsed_once(self):
+        heartbeat = Heartbeat({"status": 0, "time": "2003-02-01 10:30:00.250"})
+        self.assertEqual(
+            heartbeat.datetime, datetime.datetime(2003, 2, 1, 10, 30, 0, 250000)
+        )
+        self.assertEqual(heartbeat.time_ms, 1044095400250)
+        self.assertEqual(heartbeat.pretty_time, "1 February 2003, 10:30")
+        self.assertEqual(heartbeat["time"], "2003-02-01 10:30:00.250")
+        self.assertIs(heartbeat_datetime(heartbeat), heartbeat.datetime)
+
+    def test_pushed_heartbeats_keep_their_keys(self):
+        heartbeat = Heartbeat({"monitorID": 3, "status": 1, "important": 1})
+        self.assertEqual(heartbeat.monitor_id, 3)
+        self.assertEqual(heartbeat["monitorID"], 3)
+        self.assertNotIn("monitor_id", heartbeat)
+        self.assertIsNone(heartbeat.datetime)
+        self.assertEqual(heartbeat.pretty_time, "")
+
+    def test_series_heartbeats_have_the_same_times(self):
+        beats = generate_beats(random.Random(2), 20)
+        series = HeartbeatSeries.from_heartbeats(7, beats)
+        for record, series_heartbeat in zip(heartbeat_records(beats), series):
+            self.assertEqual(record.time_ms, series_heartbeat.time_ms)
+            self.assertEqual(record.datetime, series_heartbeat.datetime)
+            self.assertEqual(record.pretty_time, series_heartbeat.pretty_time)
+
+    def test_incidents_match_list_of_dicts(self):
+        beats = generate_beats(random.Random(3), 500)
+        self.assertEqual(
+            find_incidents(heartbeat_records(beats), True),
+            find_incidents(parse_beats(beats), True),
+        )
@@ -0,0 +1,162 @@
+import datetime
+import random
+import unittest
+
+from app.lib.heartbeat_rollups import (
+    DAY_MS,
+    HOUR_MS,
+    PingSketch,
+    RollupSummary,
+    rollup_calendar,
+    rollup_series,
+)
+from app.lib.uptime_kuma_api.heartbeat_series import HeartbeatSeries
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+def make_series(statuses, start_ms=0, step_ms=20 * 60_000, pings=None):
+    series = HeartbeatSeries(1, time_spec="milliseconds")
+    for index, status in enumerate(statuses):
+        series.append_values(
+            index + 1,
+            start_ms + index * step_ms,
+            status,
+            pings[index] if pings else None,
+            False,
+            60,
+            0,
+            "",
+        )
+    return series
+
+
+class HeartbeatRollupsTestCase(unittest.TestCase):
+    def test_counts_statuses_and_transitions(self):
+        rollups = rollup_series(make_series([1, 1, 0, 0, 3, 2]), HOUR_MS)
+        self.assertEqual([rollup.start_ms for rollup in rollups], [0, HOUR_MS])
+        self.assertEqual(
+            [(r.up, r.down, r.pending, r.maintenance) for r in rollups],
+            [(2, 1, 0, 0), (0, 1, 1, 1)],
+        )
+        self.assertEqual([rollup.transitions for rollup in rollups], [1, 2])
+        self.assertEqual(
+            [rollup.status for rollup in rollups],
+            [MonitorStatus.DOWN, MonitorStatus.DOWN],
+        )
+
+    def test_downtime_is_split_between_periods(self):
+        # down for two hours and twenty minutes from 00:40
+        series = make_series([1, 1, 0, 1], step_ms=40 * 60_000)
+        series.times[3] = 3 * HOUR_MS
+        rollups = rollup_series(series, HOUR_MS)
+        self.assertEqual(
+            [
+                (rollup.start_ms // HOUR_MS, rollup.downtime_seconds)
+                for rollup in rollups
+            ],
+            [(0, 0), (1, 40 * 60), (2, 60 * 60), (3, 0)],
+        )
+        self.assertIs(rollups[2].status, MonitorStatus.DOWN)
+        self.assertEqual(rollups[2].heartbeats, 0)
+
+    def test_ongoing_downtime_runs_until_now(self):
+        rollups = rollup_series(make_series([1, 0]), HOUR_MS, until_ms=HOUR_MS + 5000)
+        self.assertEqual(
+            [rollup.downtime_ms for rollup in rollups], [40 * 60_000, 5000]
+        )
+
+    def test_only_returns_periods_from(self):
+        series = make_series([0, 0, 0, 1, 1, 1], step_ms=30 * 60_000)
+        rollups = rollup_series(series, HOUR_MS, from_ms=HOUR_MS)
+        everything = rollup_series(series, HOUR_MS)
+        self.assertEqual(
+            [(r.start_ms, r.up, r.down, r.downtime_ms, r.transitions) for r in rollups],
+            [
+                (r.start_ms, r.up, r.down, r.downtime_ms, r.transitions)
+                for r in everything[1:]
+            ],
+        )
+
+    def test_days_match_hours(self):
+        rng = random.Random(4)
+        series = make_series(
+            [rng.choice([0, 1, 1, 1, 1, 2, 3]) for _ in range(3 * 24 * 3)],
+            pings=[rng.choice([None, rng.randint(1, 2000)]) for _ in range(3 * 24 * 3)],
+        )
+        hours = rollup_series(series, HOUR_MS, until_ms=3 * DAY_MS)
+        days = rollup_series(series, DAY_MS, until_ms=3 * DAY_MS)
+        for day in days:
+            day_hours = [
+                hour
+                for hour in hours
+                if day.start_ms <= hour.start_ms < day.start_ms + DAY_MS
+            ]
+            for field in ["up", "down", "downtime_ms", "transitions", "ping_count"]:
+                self.assertEqual(
+                    getattr(day, field),
+                    sum(getattr(hour, field) for hour in day_hours),
+                )
+            self.assertEqual(
+                day.ping_max,
+                max(hour.ping_max for hour in day_hours if hour.ping_max is not None),
+            )
+
+    def test_ping_percentiles(self):
+        rng = random.Random(9)
+        pings = [rng.randint(1, 5000) for _ in range(2000)]
+        sketch = PingSketch()
+        for ping in pings:
+            sketch.add(ping)
+        sketch = PingSketch.from_json(sketch.to_json())
+        pings.sort()
+        for q in [50, 90, 99]:
+            exact = pings[int(q / 100 * (len(pings) - 1))]
+            self.assertAlmostEqual(sketch.percentile(q) / exact, 1, delta=0.05)
+        self.assertIsNone(PingSketch().percentile(50))
+
+    def test_calendar(self):
+        now = datetime.datetime(2024, 3, 10, 12)
+        day_ms = (datetime.datetime(2024, 3, 8) - datetime.datetime(1970, 1, 1)) // (
+            datetime.timedelta(milliseconds=1)
+        )
+        rollups = rollup_series(make_series([1, 3, 1], start_ms=day_ms), DAY_MS)
+        calendar = rollup_calendar(rollups, 3, now)
+        self.assertEqual(
+            [day["status"] for day in calendar],
+            [
+                MonitorStatus.UP,
+                MonitorStatus.MAINTENANCE,
+                MonitorStatus.UP,
+                MonitorStatus.UP,
+            ],
+        )
+        self.assertEqual(calendar[1]["time"], "2024-03-08T00:00:00")
+
+    def test_calendar_shows_pending_days_as_up(self):
+        now = datetime.datetime(2024, 3, 10, 12)
+        day_ms = (datetime.datetime(2024, 3, 8) - datetime.datetime(1970, 1, 1)) // (
+            datetime.timedelta(milliseconds=1)
+        )
+        rollups = rollup_series(
+            make_series([2, 1, 0], start_ms=day_ms, step_ms=DAY_MS), DAY_MS
+        )
+        self.assertEqual(rollups[0].status, MonitorStatus.PENDING)
+        calendar = rollup_calendar(rollups, 3, now)
+        self.assertEqual(
+            [day["status"] for day in calendar],
+            [
+                MonitorStatus.UP,
+                MonitorStatus.UP,
+                MonitorStatus.UP,
+                MonitorStatus.DOWN,
+            ],
+        )
+
+    def test_summary(self):
+        series = make_series([1, 1, 0, 1, 1, 1], step_ms=30 * 60_000)
+        rollups = rollup_series(series, HOUR_MS, until_ms=3 * HOUR_MS)
+        summary = RollupSummary(rollups, 0, 3 * HOUR_MS)
+        self.assertEqual(summary.heartbeats, 6)
+        self.assertEqual(summary.downtime_seconds, 30 * 60)
+        self.assertAlmostEqual(summary.uptime, 1 - 0.5 / 3)
+        self.assertIsNone(RollupSummary([], 0, HOUR_MS).uptime)
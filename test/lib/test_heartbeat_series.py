@@ -0,0 +1,85 @@
+import datetime
+import random
+import unittest
+
+from app.lib.incidents import IncidentAnalytics, find_incidents
+from app.lib.uptime_kuma_api.api import int_to_bool, parse_monitor_status
+from app.lib.uptime_kuma_api.heartbeat_series import HeartbeatSeries
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+def generate_beats(rng, count, start=datetime.datetime(2003, 2, 1)):
+    return [
+        {
+            "id": i + 1,
+            "monitor_id": 7,
+            "status": rng.choice([0, 1, 1, 1, 2, 3]),
+            "msg": rng.choice(["200 - OK", "timeout of 48000ms exceeded", ""]),
+            "ping": rng.choice([None, rng.randint(1, 900)]),
+            "important": rng.choice([0, 1]),
+            "duration": 60,
+            "down_count": 0,
+            "time": (start + datetime.timedelta(minutes=i)).isoformat(
+                sep=" ", timespec="milliseconds"
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+def parse_beats(beats):
+    beats = [dict(beat) for beat in beats]
+    int_to_bool(beats, ["important"])
+    parse_monitor_status(beats)
+    return beats
+
+
+class HeartbeatSeriesTestCase(unittest.TestCase):
+    def test_heartbeats_match_parsed_beats(self):
+        beats = generate_beats(random.Random(1), 200)
+        series = HeartbeatSeries.from_heartbeats(7, beats)
+        self.assertEqual(len(series), 200)
+        self.assertEqual(list(series), parse_beats(beats))
+        self.assertIs(series[0]["status"], MonitorStatus(beats[0]["status"]))
+        self.assertEqual(series[-1]["time"], beats[-1]["time"])
+        self.assertEqual(len(series.messages), 3)
+
+    def test_time_formats(self):
+        for time in ["2003-02-01 00:00:00", "2003-02-01T00:00:00.250"]:
+            series = HeartbeatSeries.from_heartbeats(1, [{"status": 1, "time": time}])
+            self.assertEqual(series[0]["time"], time)
+
+    def test_in_time_order(self):
+        beats = generate_beats(random.Random(2), 10)
+        self.assertTrue(HeartbeatSeries.from_heartbeats(7, beats).in_time_order())
+        beats[3], beats[4] = beats[4], beats[3]
+        self.assertFalse(HeartbeatSeries.from_heartbeats(7, beats).in_time_order())
+
+    def test_incidents_match_list_of_dicts(self):
+        rng = random.Random(3)
+        for count in [0, 1, 2, 5, 50, 500]:
+            beats = generate_beats(rng, count)
+            if count > 10:
+                beats[5]["time"] = beats[4]["time"]
+            series = HeartbeatSeries.from_heartbeats(7, beats)
+            for valid_earliest_heartbeat_start in [False, True]:
+                expected = find_incidents(
+                    parse_beats(beats), valid_earliest_heartbeat_start
+                )
+                actual = find_incidents(series, valid_earliest_heartbeat_start)
+                self.assertEqual(
+                    [(i["start"], i["end"], i["status"]) for i in actual],
+                    [(i["start"], i["end"], i["status"]) for i in expected],
+                )
+
+    def test_analytics_from_series(self):
+        now = datetime.datetime.now().replace(microsecond=0)
+        beats = generate_beats(
+            random.Random(4), 3000, start=now - datetime.timedelta(days=2)
+        )
+        series = HeartbeatSeries.from_heartbeats(7, beats)
+        expected = IncidentAnalytics(find_incidents(parse_beats(beats), True), 3, now)
+        actual = IncidentAnalytics(find_incidents(series, True), 3, now)
+        self.assertEqual(actual.calendar_heartbeats, expected.calendar_heartbeats)
+        self.assertEqual(actual.calendar_count, expected.calendar_count)
+        self.assertEqual(actual.incident_count, expected.incident_count)
@@ -0,0 +1,195 @@
+import datetime
+import os
+import random
+import tempfile
+import unittest
+
+from app.lib.heartbeat_rollups import DAY_MS, HOUR_MS, rollup_series
+from app.lib.heartbeat_store import HeartbeatStore
+from app.lib.incidents import find_incidents
+from app.lib.uptime_kuma_api.heartbeat_series import HeartbeatSeries
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+def make_beat(id_, time, status=1, msg="200 - OK", ping=120):
+    return {
+        "id": id_,
+        "status": status,
+        "msg": msg,
+        "ping": ping,
+        "important": status == 0,
+        "duration": 600,
+        "down_count": 0,
+        "time": time.isoformat(sep=" ", timespec="milliseconds"),
+    }
+
+
+class FakeUptimeKumaApi:
+    def __init__(self):
+        self.beats = {}
+        self.calls = []
+
+    def add_beats(self, monitor_id, start, count, first_id):
+        self.beats.setdefault(monitor_id, []).extend(
+            make_beat(
+                first_id + i,
+                start + datetime.timedelta(minutes=10 * i),
+                status=0 if i % 7 == 3 else 1,
+                msg="timeout" if i % 7 == 3 else "200 - OK",
+                ping=None if i % 7 == 3 else 100 + i,
+            )
+            for i in range(count)
+        )
+
+    def get_monitors_beats(self, ids, hours, max_workers=4, timeout=None, series=False):
+        self.calls.append((sorted(ids), hours))
+        since = datetime.datetime.utcnow() - datetime.timedelta(hours=hours)
+        return {
+            id_: HeartbeatSeries.from_heartbeats(
+                id_,
+                [
+                    beat
+                    for beat in self.beats.get(id_, [])
+                    if datetime.datetime.fromisoformat(beat["time"]) >= since
+                ],
+            )
+            for id_ in ids
+        }
+
+
+class HeartbeatStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = HeartbeatStore()
+        self.store.path = os.path.join(self.directory.name, "heartbeats.sqlite3")
+        self.api = FakeUptimeKumaApi()
+        self.start = datetime.datetime.utcnow().replace(
+            microsecond=0
+        ) - datetime.timedelta(hours=47)
+        self.api.add_beats(1, self.start, 48 * 6 - 6, 1)
+        self.api.add_beats(2, self.start, 48 * 6 - 6, 10_000)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_matches_uptime_kuma(self):
+        beats = self.store.get_monitors_beats(self.api, [1, 2], 24)
+        expected = self.api.get_monitors_beats([1, 2], 24)
+        for id_ in [1, 2]:
+            self.assertEqual(list(beats[id_].ids), list(expected[id_].ids))
+            self.assertEqual(list(beats[id_].times), list(expected[id_].times))
+            self.assertEqual(
+                [dict(beat) for beat in beats[id_]],
+                [dict(beat) for beat in expected[id_]],
+            )
+        down = [beat for beat in beats[1] if beat["status"] == MonitorStatus.DOWN]
+        self.assertTrue(down)
+        self.assertTrue(all(beat["ping"] is None for beat in down))
+        self.assertTrue(all(beat["msg"] == "timeout" for beat in down))
+
+    def test_only_fetches_new_heartbeats(self):
+        self.store.get_monitors_beats(self.api, [1, 2], 24)
+        self.api.add_beats(1, self.start + datetime.timedelta(hours=47), 3, 1_000)
+        beats = self.store.get_monitors_beats(self.api, [1, 2], 24)
+        self.assertEqual(self.api.calls, [([1, 2], 24), ([1, 2], 2)])
+        self.assertEqual(list(beats[1].ids)[-3:], [1_000, 1_001, 1_002])
+        self.assertEqual(len(set(beats[1].ids)), len(beats[1]))
+
+    def test_fetches_whole_window_when_it_grows(self):
+        self.store.get_monitors_beats(self.api, [1], 24)
+        beats = self.store.get_monitors_beats(self.api, [1, 2], 36)
+        self.assertEqual(self.api.calls, [([1], 24), ([1, 2], 36)])
+        self.assertEqual(len(beats[1]), len(beats[2]))
+
+    def test_version_is_newest_heartbeat(self):
+        self.assertIsNone(self.store.get_version([1, 2]))
+        self.store.get_monitors_beats(self.api, [1, 2], 24)
+        self.api.add_beats(2, self.start + datetime.timedelta(hours=47), 1, 20_000)
+        beats = self.store.get_monitors_beats(self.api, [1, 2], 24)
+        self.assertEqual(self.store.get_version([1]), beats[1].times[-1])
+        self.assertEqual(self.store.get_version([1, 2]), beats[2].times[-1])
+        self.assertGreater(beats[2].times[-1], beats[1].times[-1])
+
+    def test_compact_removes_old_heartbeats(self):
+        self.store.get_monitors_beats(self.api, [1], 48)
+        self.store.retention_days = 1
+        self.store.compact()
+        beats = self.store.get_series(1, 48)
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=1)
+        self.assertTrue(beats)
+        self.assertTrue(
+            all(
+                datetime.datetime.fromisoformat(beat["time"]) >= cutoff
+                for beat in beats
+            )
+        )
+        self.api.calls.clear()
+        self.store.get_monitors_beats(self.api, [1], 48)
+        self.assertEqual(self.api.calls, [([1], 48)])
+
+    def test_rollups_are_kept_up_to_date(self):
+        self.store.get_monitors_beats(self.api, [1], 48)
+        self.api.add_beats(1, self.start + datetime.timedelta(hours=47), 3, 1_000)
+        self.store.get_monitors_beats(self.api, [1], 48)
+        series = self.store.get_series(1, 72)
+        for period_ms in [HOUR_MS, DAY_MS]:
+            stored = self.store.get_rollups(1, period_ms, 72)
+            expected = rollup_series(series, period_ms, until_ms=stored[-1].start_ms)
+            self.assertEqual(
+                [
+                    (r.start_ms, r.up, r.down, r.transitions, r.ping_count, r.ping_max)
+                    for r in stored
+                ],
+                [
+                    (r.start_ms, r.up, r.down, r.transitions, r.ping_count, r.ping_max)
+                    for r in expected
+                ],
+            )
+            self.assertEqual(
+                [r.ping_sketch.counts for r in stored],
+                [r.ping_sketch.counts for r in expected],
+            )
+
+    def test_summary_adds_up_rollups(self):
+        self.store.get_monitors_beats(self.api, [1], 48)
+        now_ms = int(datetime.datetime.utcnow().timestamp() * 1000)
+        for hours in [5, 24, 48]:
+            summary = self.store.get_summary(1, hours, now_ms)
+            hourly = self.store.get_rollups(1, HOUR_MS, hours, now_ms)
+            self.assertEqual(summary.heartbeats, sum(r.heartbeats for r in hourly))
+            self.assertEqual(summary.downtime_ms, sum(r.downtime_ms for r in hourly))
+            self.assertGreater(summary.downtime_ms, 0)
+            self.assertTrue(0 < summary.uptime < 1)
+
+    def test_incident_series_finds_the_same_incidents(self):
+        rng = random.Random(3)
+        # mostly up, with a few runs of down, maintenance and pending heartbeats
+        statuses = []
+        while len(statuses) < 48 * 6 - 6:
+            if rng.random() < 0.15:
+                statuses.extend([rng.choice([0, 2, 3])] * rng.randint(1, 12))
+            else:
+                statuses.extend([1] * rng.randint(1, 30))
+        self.api.beats[3] = [
+            make_beat(20_000 + i, self.start + datetime.timedelta(minutes=10 * i), s)
+            for i, s in enumerate(statuses[: 48 * 6 - 6])
+        ]
+        self.store.get_monitors_beats(self.api, [3], 48)
+        for hours in [24, 48]:
+            full = self.store.get_series(3, hours)
+            sparse = self.store.get_monitors_beats(
+                self.api, [3], hours, incidents_only=True
+            )[3]
+            self.assertLess(len(sparse), len(full))
+            self.assertEqual(len(set(sparse.ids)), len(sparse))
+            self.assertEqual(
+                [
+                    (i["start"]["id"], i["end"] and i["end"]["id"], i["has_start"])
+                    for i in find_incidents(sparse, True)
+                ],
+                [
+                    (i["start"]["id"], i["end"] and i["end"]["id"], i["has_start"])
+                    for i in find_incidents(full, True)
+                ],
+            )
@@ -0,0 +1,261 @@
+import datetime
+import random
+import unittest
+
+from tna_utilities.datetime import pretty_date, pretty_datetime
+
+from app.lib.incidents import IncidentAnalytics, find_incidents
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+# The implementations of the incident calendars and summary statistics that
+# IncidentAnalytics replaced, kept to check that both give the same results
+def legacy_incident_calendar_count(days, incidents):
+    calendar = []
+    for i in range(days + 1):
+        day = datetime.datetime.now() + datetime.timedelta(days=-i)
+        calendar.append(
+            {
+                "date": day.date().isoformat(),
+                "short_date": day.date().strftime("%-d %b"),
+                "pretty_date": pretty_date(day),
+                "count": len(
+                    [
+                        incident
+                        for incident in incidents
+                        if incident.get("start")
+                        and incident["start"].get("status", None) != MonitorStatus(3)
+                        and incident["start"].get("time")
+                        and datetime.datetime.fromisoformat(
+                            incident["start"]["time"]
+                        ).date()
+                        == day.date()
+                    ]
+                ),
+            }
+        )
+    calendar.sort(key=lambda x: x["date"], reverse=False)
+    start_day_offset = (
+        datetime.datetime.now() + datetime.timedelta(days=-days)
+    ).weekday()
+    max_indicents = max(item["count"] for item in calendar) if calendar else 0
+    return {
+        "calendar": calendar,
+        "max_incidents": max_indicents,
+        "start_day_offset": start_day_offset,
+    }
+
+
+def legacy_incident_calendar_heartbeats(incidents, days):
+    calendar = []
+    for i in range(days + 1):
+        day = datetime.datetime.now() + datetime.timedelta(days=-i)
+        day_incidents = [
+            incident
+            for incident in incidents
+            if (
+                incident.get("start")
+                and incident["start"].get("time")
+                and datetime.datetime.fromisoformat(incident["start"]["time"])
+                .replace(hour=0, minute=0, second=0, microsecond=0)
+                .date()
+                == day.date()
+            )
+            or (
+                incident.get("end")
+                and incident["end"].get("time")
+                and datetime.datetime.fromisoformat(incident["end"]["time"])
+                .replace(hour=23, minute=59, second=59, microsecond=999999)
+                .date()
+                == day.date()
+            )
+            or (
+                incident.get("start")
+                and incident.get("end")
+                and incident["start"].get("time")
+                and incident["end"].get("time")
+                and datetime.datetime.fromisoformat(incident["start"]["time"])
+                .replace(hour=0, minute=0, second=0, microsecond=0)
+                .date()
+                < day.date()
+                and datetime.datetime.fromisoformat(incident["end"]["time"])
+                .replace(hour=23, minute=59, second=59, microsecond=999999)
+                .date()
+                > day.date()
+            )
+        ]
+        calendar.append(
+            {
+                "time": day.replace(
+                    hour=0, minute=0, second=0, microsecond=0
+                ).isoformat(),
+                "title": pretty_date(day),
+                "status": (
+                    MonitorStatus(0)
+                    if any(
+                        [
+                            incident
+                            for incident in day_incidents
+                            if incident["start"].get("status", None) == MonitorStatus(0)
+                        ]
+                    )
+                    else (
+                        MonitorStatus(3)
+                        if any(
+                            [
+                                incident
+                                for incident in day_incidents
+                                if incident["start"].get("status", None)
+                                == MonitorStatus(3)
+                            ]
+                        )
+                        else (
+                            MonitorStatus(2) if len(day_incidents) else MonitorStatus(1)
+                        )
+                    )
+                ),
+            }
+        )
+    calendar.sort(key=lambda x: x["time"], reverse=False)
+    return calendar
+
+
+def legacy_incident_calendar_duration(days, incidents):
+    calendar = []
+    for i in range(days + 1):
+        day = datetime.datetime.now() + datetime.timedelta(days=-i)
+        calendar.append(
+            {
+                "date": day.date().isoformat(),
+                "short_date": day.date().strftime("%-d %b"),
+                "pretty_date": pretty_date(day),
+                "duration": sum(
+                    [
+                        incident.get("duration_seconds", 0)
+                        for incident in incidents
+                        if incident.get("start")
+                        and incident["start"].get("status", None) != MonitorStatus(3)
+                        and incident["start"].get("time")
+                        and datetime.datetime.fromisoformat(
+                            incident["start"]["time"]
+                        ).date()
+                        == day.date()
+                    ]
+                ),
+            }
+        )
+    calendar.sort(key=lambda x: x["date"], reverse=False)
+    start_day_offset = (
+        datetime.datetime.now() + datetime.timedelta(days=-days)
+    ).weekday()
+    max_duration = max(item["duration"] for item in calendar) if calendar else 0
+    return {
+        "calendar": calendar,
+        "max_duration": max_duration,
+        "start_day_offset": start_day_offset,
+    }
+
+
+def legacy_incident_summary(incidents):
+    down = [i for i in incidents if i["status"]["status_code"] == MonitorStatus(0)]
+    durations = [i.get("duration_seconds", 0) for i in down]
+    return {
+        "incident_count": len(down),
+        "total_incident_time": sum(durations),
+        "average_incident_time": sum(durations) / len(down) if down else 0,
+        "longest_incident_time": max(durations, default=0),
+        "total_maintenance_time": sum(
+            i.get("duration_seconds", 0)
+            for i in incidents
+            if i["status"]["status_code"] == MonitorStatus(3)
+        ),
+    }
+
+
+def generate_heartbeats(rng, days, interval_minutes, statuses):
+    now = datetime.datetime.now()
+    time = now - datetime.timedelta(days=days)
+    heartbeats = []
+    while time < now:
+        heartbeats.append({"status": rng.choice(statuses), "time": time.isoformat()})
+        time += datetime.timedelta(minutes=rng.randint(1, interval_minutes))
+    return heartbeats
+
+
+class IncidentAnalyticsDifferentialTestCase(unittest.TestCase):
+    def assertSameAnalytics(self, incidents, days):
+        analytics = IncidentAnalytics(incidents, days)
+        self.assertEqual(
+            analytics.calendar_count, legacy_incident_calendar_count(days, incidents)
+        )
+        self.assertEqual(
+            analytics.calendar_duration,
+            legacy_incident_calendar_duration(days, incidents),
+        )
+        legacy_calendar = legacy_incident_calendar_heartbeats(incidents, days)
+        self.assertEqual(
+            [
+                {key: day[key] for key in ["time", "title", "status"]}
+                for day in analytics.calendar_heartbeats
+            ],
+            legacy_calendar,
+        )
+        # the parsed and formatted times are added for the heartbeats graph
+        for day, legacy_day in zip(analytics.calendar_heartbeats, legacy_calendar):
+            self.assertEqual(day["datetime"].isoformat(), legacy_day["time"])
+            self.assertEqual(day["pretty_time"], pretty_datetime(legacy_day["time"]))
+        for name, value in legacy_incident_summary(incidents).items():
+            self.assertEqual(getattr(analytics, name), value)
+
+    def test_random_incidents(self):
+        rng = random.Random(20030201)
+        for days, history_days, interval_minutes, statuses in [
+            (7, 10, 240, [0, 1, 1, 1, 2, 3]),
+            (30, 35, 600, [0, 1, 2, 3]),
+            (30, 20, 900, [0, 0, 0, 1]),
+            (90, 100, 2880, [0, 1, 1, 3, 3]),
+            (1, 3, 60, [0, 1]),
+        ]:
+            for _ in range(5):
+                heartbeats = generate_heartbeats(
+                    rng, history_days, interval_minutes, statuses
+                )
+                for valid_earliest_heartbeat_start in [False, True]:
+                    self.assertSameAnalytics(
+                        find_incidents(heartbeats, valid_earliest_heartbeat_start),
+                        days,
+                    )
+
+    def test_monitor_status_incidents(self):
+        rng = random.Random(1)
+        heartbeats = [
+            {**heartbeat, "status": MonitorStatus(heartbeat["status"])}
+            for heartbeat in generate_heartbeats(rng, 14, 600, [0, 1, 2, 3])
+        ]
+        self.assertSameAnalytics(find_incidents(heartbeats, True), 7)
+
+    def test_no_incidents(self):
+        self.assertSameAnalytics([], 30)
+
+    def test_incident_spanning_days(self):
+        now = datetime.datetime(2003, 2, 10, 12)
+        incident = {
+            "start": {"status": 0, "time": "2003-02-07T23:00:00"},
+            "end": {"status": 1, "time": "2003-02-09T01:00:00"},
+            "duration_seconds": 26 * 60 * 60,
+            "status": {"status_code": 0},
+        }
+        analytics = IncidentAnalytics([incident], 4, now=now)
+        self.assertEqual(
+            [day["status"] for day in analytics.calendar_heartbeats],
+            [MonitorStatus(1)] + [MonitorStatus(0)] * 3 + [MonitorStatus(1)],
+        )
+        self.assertEqual(
+            [day["count"] for day in analytics.calendar_count["calendar"]],
+            [0, 1, 0, 0, 0],
+        )
+        self.assertEqual(
+            analytics.calendar_heartbeats[1]["title"],
+            pretty_date(datetime.datetime(2003, 2, 7)),
+        )
+        self.assertEqual(analytics.calendar_count["start_day_offset"], 3)
@@ -0,0 +1,168 @@
+import datetime
+import random
+import unittest
+
+from app.lib.incidents import find_incidents, pretty_uptime_kuma_status
+from app.lib.uptime_kuma_api.monitor_status import MonitorStatus
+
+
+# The implementation of template_filters.previous_incidents that the incident
+# engine replaced, kept to check that both find the same incidents
+def legacy_previous_incidents(heartbeats, valid_earliest_heartbeat_start=False):
+    if not heartbeats or not any(
+        heartbeat.get("status") == MonitorStatus(0)
+        or heartbeat.get("status") == MonitorStatus(3)
+        for heartbeat in heartbeats
+    ):
+        return []
+    heartbeats = sorted(heartbeats, key=lambda x: x.get("time", ""), reverse=True)
+    incidents = []
+    start = None
+    end = None
+    has_start = False
+    has_end = False
+    is_ongoing_incident = heartbeats[0].get("status") == MonitorStatus(0) or heartbeats[
+        0
+    ].get("status") == MonitorStatus(3)
+    for index, heartbeat in enumerate(heartbeats):
+        if index == 0 and is_ongoing_incident:
+            end = heartbeat
+        elif index == len(heartbeats) - 1 and (
+            heartbeat.get("status") == MonitorStatus(0)
+            or heartbeat.get("status") == MonitorStatus(3)
+        ):
+            start = heartbeat
+            if valid_earliest_heartbeat_start:
+                has_start = True
+        if end:
+            if heartbeat.get("status") != MonitorStatus(0) and heartbeat.get(
+                "status"
+            ) != MonitorStatus(3):
+                start = heartbeats[index - 1] if index > 0 else heartbeat
+                has_start = True
+        elif heartbeat.get("status") == MonitorStatus(0) or heartbeat.get(
+            "status"
+        ) == MonitorStatus(3):
+            end = heartbeats[index - 1] if index > 0 else heartbeat
+            has_end = True
+        if start and end:
+            incidents.append(
+                {
+                    "start": start,
+                    "end": end if has_end else None,
+                    "has_start": has_start,
+                    "has_end": has_end,
+                    "duration_seconds": int(
+                        (
+                            (
+                                datetime.datetime.fromisoformat(end.get("time"))
+                                if has_end
+                                else datetime.datetime.now()
+                            )
+                            - datetime.datetime.fromisoformat(start.get("time"))
+                        ).total_seconds()
+                    ),
+                    "status": pretty_uptime_kuma_status(
+                        MonitorStatus(start.get("status"))
+                        if start
+                        else (
+                            MonitorStatus(heartbeats[-1].get("status"))
+                            if index == len(heartbeats) - 1 and not has_start
+                            else (MonitorStatus(end.get("status")) if end else None)
+                        )
+                    ),
+                }
+            )
+            start = None
+            end = None
+            has_start = False
+            has_end = False
+    return incidents
+
+
+def generate_heartbeats(rng, count, statuses):
+    start = datetime.datetime(2003, 2, 1)
+    heartbeats = []
+    for i in range(count):
+        time = start + datetime.timedelta(seconds=60 * i + rng.randint(0, 59))
+        heartbeats.append(
+            {
+                "id": i,
+                "status": rng.choice(statuses),
+                "time": time.isoformat(sep=" "),
+                "msg": f"message {i}",
+            }
+        )
+    return heartbeats
+
+
+class IncidentsDifferentialTestCase(unittest.TestCase):
+    def assertSameIncidents(self, heartbeats, valid_earliest_heartbeat_start):
+        expected = legacy_previous_incidents(heartbeats, valid_earliest_heartbeat_start)
+        actual = find_incidents(heartbeats, valid_earliest_heartbeat_start)
+        self.assertEqual(len(actual), len(expected))
+        for actual_incident, expected_incident in zip(actual, expected):
+            for key in ["start", "end", "has_start", "has_end", "status"]:
+                self.assertEqual(actual_incident[key], expected_incident[key])
+                self.assertIs(type(actual_incident[key]), type(expected_incident[key]))
+            # ongoing incidents are measured up to now
+            self.assertAlmostEqual(
+                actual_incident["duration_seconds"],
+                expected_incident["duration_seconds"],
+                delta=0 if expected_incident["has_end"] else 1,
+            )
+
+    def test_random_heartbeats(self):
+        rng = random.Random(20030201)
+        for statuses in [
+            [0, 1, 2, 3],
+            [1, 1, 1, 1, 1, 1, 0],
+            [0, 0, 0, 1],
+            [1, 2],
+            [0, 3],
+        ]:
+            for count in list(range(0, 12)) + [50, 200]:
+                for _ in range(20):
+                    heartbeats = generate_heartbeats(rng, count, statuses)
+                    for valid_earliest_heartbeat_start in [False, True]:
+                        self.assertSameIncidents(
+                            heartbeats, valid_earliest_heartbeat_start
+                        )
+
+    def test_unordered_heartbeats(self):
+        rng = random.Random(1)
+        for count in range(0, 30):
+            heartbeats = generate_heartbeats(rng, count, [0, 1, 2, 3])
+            rng.shuffle(heartbeats)
+            self.assertSameIncidents(heartbeats, False)
+            self.assertSameIncidents(heartbeats, True)
+
+    def test_heartbeats_sharing_a_time(self):
+        rng = random.Random(2)
+        for count in range(2, 30):
+            heartbeats = generate_heartbeats(rng, count, [0, 1, 3])
+            for i in range(1, count, 3):
+                heartbeats[i] = {**heartbeats[i], "time": heartbeats[i - 1]["time"]}
+            self.assertSameIncidents(heartbeats, False)
+
+    def test_monitor_status_heartbeats(self):
+        rng = random.Random(3)
+        heartbeats = [
+            {**heartbeat, "status": MonitorStatus(heartbeat["status"])}
+            for heartbeat in generate_heartbeats(rng, 100, [0, 1, 2, 3])
+        ]
+        self.assertSameIncidents(heartbeats, False)
+        self.assertSameIncidents(heartbeats, True)
+
+    def test_incident_status(self):
+        heartbeats = [
+            {"status": 1, "time": "2003-02-01T00:00:00"},
+            {"status": 3, "time": "2003-02-01T00:01:00"},
+            {"status": 1, "time": "2003-02-01T00:02:00"},
+        ]
+        result = find_incidents(heartbeats)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["status"], pretty_uptime_kuma_status(3))
+        self.assertEqual(result[0]["start"], heartbeats[1])
+        self.assertEqual(result[0]["end"], heartbeats[2])
+        self.assertEqual(result[0]["duration_seconds"], 60)
@@ -0,0 +1,23 @@
+import unittest
+
+from app.lib.markdown_renderer import MarkdownRenderer
+
+
+class MarkdownRendererTestCase(unittest.TestCase):
+    def test_render(self):
+        renderer = MarkdownRenderer()
+        self.assertEqual(renderer.render("**Down**"), "<p><strong>Down</strong></p>\n")
+        self.assertEqual(renderer.render("**Down**"), "<p><strong>Down</strong></p>\n")
+        self.assertEqual(renderer.hits, 1)
+        self.assertEqual(renderer.misses, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        renderer = MarkdownRenderer(max_size=2)
+        renderer.render("a")
+        renderer.render("b")
+        renderer.render("a")
+        renderer.render("c")
+        renderer.render("a")
+        self.assertEqual(renderer.hits, 2)
+        renderer.render("b")
+        self.assertEqual(renderer.misses, 4)
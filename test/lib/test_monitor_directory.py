@@ -0,0 +1,45 @@
+import unittest
+
+from app.lib.monitor_directory import MonitorDirectory
+
+STATUS_PAGE = {
+    "publicGroupList": [
+        {
+            "name": "Services",
+            "monitorList": [{"id": 1, "name": "Web site"}, {"id": 2, "name": "API"}],
+        },
+        {"name": "Other", "monitorList": [{"id": 3, "name": "Search"}]},
+    ]
+}
+
+
+class MonitorDirectoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = MonitorDirectory(STATUS_PAGE)
+
+    def test_status_page_monitors(self):
+        self.assertEqual(self.directory.get("web-site"), {"id": 1, "name": "Web site"})
+        self.assertEqual(self.directory.by_id[3], {"id": 3, "name": "Search"})
+        self.assertEqual(self.directory.slugs, {1: "web-site", 2: "api", 3: "search"})
+        self.assertIsNone(self.directory.get("unknown"))
+
+    def test_monitor_and_children(self):
+        monitors = [
+            {"id": 1, "name": "Web site", "childrenIDs": [5, 4, 99]},
+            {"id": 4, "name": "Web server B", "childrenIDs": []},
+            {"id": 5, "name": "Web server A", "childrenIDs": []},
+        ]
+        monitor, children = self.directory.monitor_and_children(monitors, 1)
+        self.assertIs(monitor, monitors[0])
+        self.assertEqual(children, [monitors[2], monitors[1]])
+        self.assertEqual(self.directory.monitor_and_children(monitors, 4)[1], [])
+        self.assertEqual(self.directory.monitor_and_children(monitors, 2), (None, []))
+
+    def test_monitor_list_indexed_once(self):
+        monitors = [{"id": 1, "name": "Web site", "childrenIDs": []}]
+        self.directory.monitor_and_children(monitors, 1)
+        index = self.directory._monitor_list_index
+        self.directory.monitor_and_children(list(monitors), 1)
+        self.assertIs(self.directory._monitor_list_index, index)
+        updated = [{"id": 1, "name": "Website", "childrenIDs": []}]
+        self.assertIs(self.directory.monitor_and_children(updated, 1)[0], updated[0])
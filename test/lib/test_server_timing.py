@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app import create_app
+from app.lib.monitor_directory import MonitorDirectory
+from app.lib.server_timing import RequestTimings, server_timing
+from app.lib.status_poller import StatusPageSnapshot, status_poller
+from app.lib.uptime_kuma_api import UptimeKumaApi
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
+
+
+class RequestTimingsTestCase(unittest.TestCase):
+    def test_header(self):
+        timings = RequestTimings()
+        timings.add("render", 0.0123)
+        timings.add("uk-getMonitorBeats", 0.1)
+        timings.add("uk-getMonitorBeats", 0.2)
+        timings.add("bad name", 0.001)
+        self.assertEqual(
+            timings.header(0.5),
+            'render;dur=12.3, uk-getMonitorBeats;dur=300.0;desc="2 calls",'
+            " bad_name;dur=1.0, total;dur=500.0",
+        )
+        self.assertEqual(
+            timings.as_dict()["uk-getMonitorBeats"], {"ms": 300.0, "count": 2}
+        )
+
+
+class ServerTimingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("config.Test")
+        self.app.config["UPTIME_KUMA_URL"] = "http://uptime-kuma.test"
+        self.app.config["UPTIME_KUMA_STATUS_PAGE_SLUG"] = "test"
+        self.app.config["SERVER_TIMING_ENABLED"] = True
+        server_timing.init_app(self.app)
+        status_poller.init_app(self.app)
+        status_poller.start = lambda: None
+        data = {
+            "config": {"title": "Test services"},
+            "publicGroupList": [
+                {"name": "Services", "monitorList": [{"id": 1, "name": "Web"}]}
+            ],
+        }
+        status_poller._snapshot = StatusPageSnapshot(
+            data=data,
+            heartbeats={
+                "heartbeatList": {"1": [{"status": 1, "time": "2003-02-01 00:00:00"}]}
+            },
+            fetched_at=time.time(),
+            directory=MonitorDirectory(data),
+        )
+        status_poller._ready.set()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        del status_poller.start
+        status_poller._snapshot = None
+        status_poller._ready.clear()
+        server_timing.enabled = False
+
+    def test_index_timings(self):
+        with self.assertLogs(self.app.logger, level="INFO") as logs:
+            rv = self.client.get("/status/")
+        self.assertEqual(rv.status_code, 200)
+        metrics = [m.split(";")[0] for m in rv.headers["Server-Timing"].split(", ")]
+        self.assertIn("snapshot", metrics)
+        self.assertIn("render", metrics)
+        self.assertIn("incidents", metrics)
+        self.assertEqual(metrics[-1], "total")
+        self.assertIn('"path":"/status/","status":200', logs.output[-1])
+
+    def test_logs_at_default_log_level(self):
+        self.app.logger.setLevel(logging.WARNING)
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        self.app.logger.addHandler(handler)
+        try:
+            self.client.get("/status/")
+        finally:
+            self.app.logger.removeHandler(handler)
+        self.assertIn('"path":"/status/","status":200', records[-1].getMessage())
+
+    def test_disabled(self):
+        app = create_app("config.Test")
+        app.config["UPTIME_KUMA_URL"] = "http://uptime-kuma.test"
+        app.config["UPTIME_KUMA_STATUS_PAGE_SLUG"] = "test"
+        status_poller.init_app(app)
+        rv = app.test_client().get("/status/")
+        self.assertNotIn("Server-Timing", rv.headers)
+        with app.test_request_context("/status/"):
+            with server_timing.span("render"):
+                pass
+            self.assertIsNone(server_timing.current())
+
+    @mock.patch.object(UptimeKumaApi, "connect", lambda self: None)
+    def test_record_calls_from_other_threads(self):
+        api = UptimeKumaApi("http://uptime-kuma.test")
+        with self.app.test_request_context("/status/web/"):
+            self.app.preprocess_request()
+            timings = server_timing.current()
+            with server_timing.record(api):
+                thread = threading.Thread(
+                    target=api._report_timing,
+                    args=("getMonitorBeats", time.perf_counter()),
+                )
+                thread.start()
+                thread.join()
+            api._report_timing("getMonitorBeats", time.perf_counter())
+            uptime_kuma_pool._report_timing("connect", time.perf_counter())
+        self.assertEqual(timings.as_dict()["uk-getMonitorBeats"]["count"], 1)
+        self.assertEqual(timings.as_dict()["uk-connect"]["count"], 1)
+        self.assertEqual(api.timing_listeners, [])
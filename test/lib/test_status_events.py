@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+import unittest
+
+from app.lib.monitor_directory import MonitorDirectory
+from app.lib.status_events import StatusEvents
+from app.lib.status_poller import StatusPageSnapshot
+
+STATUS_PAGE = {
+    "publicGroupList": [
+        {
+            "name": "Services",
+            "monitorList": [{"id": 1, "name": "Web"}, {"id": 2, "name": "API"}],
+        }
+    ]
+}
+
+
+def snapshot(*latest):
+    return StatusPageSnapshot(
+        data=STATUS_PAGE,
+        heartbeats={
+            "heartbeatList": {
+                str(monitor_id): [
+                    {"status": 1, "time": "2003-02-01 00:00:00"},
+                    {"status": status, "time": time},
+                ]
+                for monitor_id, status, time in latest
+            }
+        },
+        fetched_at=time.time(),
+        directory=MonitorDirectory(STATUS_PAGE),
+    )
+
+
+def parse_event(event):
+    fields = dict(line.split(": ", 1) for line in event.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+class StatusEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.events = StatusEvents()
+        self.events.keepalive = 0.01
+        self.events.queue_size = 2
+        self.first = snapshot(
+            (1, 1, "2003-02-01 00:01:00"), (2, 1, "2003-02-01 00:01:00")
+        )
+
+    def test_new_subscribers_get_every_monitor(self):
+        subscription = self.events.subscribe(self.first)
+        event, monitors = parse_event(subscription.get(0))
+        self.assertEqual(event, "snapshot")
+        self.assertEqual([monitor["slug"] for monitor in monitors], ["web", "api"])
+
+    def test_only_changed_monitors_are_sent(self):
+        self.events.publish(self.first)
+        subscription = self.events.subscribe()
+        subscription.get(0)
+        self.assertEqual(self.events.publish(self.first), 0)
+        self.events.publish(
+            snapshot((1, 0, "2003-02-01 00:02:00"), (2, 1, "2003-02-01 00:01:00"))
+        )
+        event, monitors = parse_event(subscription.get(0))
+        self.assertEqual(event, "monitors")
+        self.assertEqual(len(monitors), 1)
+        self.assertEqual(monitors[0]["id"], 1)
+        self.assertEqual(monitors[0]["status_class"], "down")
+        self.assertEqual(monitors[0]["time"], "2003-02-01 00:02:00")
+        self.assertIsNone(subscription.get(0))
+
+    def test_slow_subscribers_are_dropped(self):
+        slow = self.events.subscribe(self.first)
+        fast = self.events.subscribe(self.first)
+        for minute in range(2, 5):
+            fast.get(0)
+            self.events.publish(snapshot((1, 1, f"2003-02-01 00:0{minute}:00")))
+        self.assertTrue(slow.dropped)
+        self.assertFalse(fast.dropped)
+        self.assertEqual(self.events.subscriber_count, 1)
+        self.assertEqual(list(self.events.stream(slow)), ["retry: 10\n\n"])
+
+    def test_stream_sends_keepalives_and_unsubscribes(self):
+        self.events.max_duration = 0.05
+        subscription = self.events.subscribe(self.first)
+        messages = list(self.events.stream(subscription))
+        self.assertEqual(parse_event(messages[1])[0], "snapshot")
+        self.assertIn(": keepalive\n\n", messages)
+        self.assertEqual(self.events.subscriber_count, 0)
+
+    def test_stream_ends_while_events_keep_arriving(self):
+        self.events.max_duration = 0.1
+        self.events.queue_size = 1000
+        subscription = self.events.subscribe(self.first)
+        stop = threading.Event()
+
+        def publish():
+            second = 0
+            while not stop.wait(0.005):
+                second = (second + 1) % 60
+                self.events.publish(
+                    snapshot((1, second % 2, f"2003-02-01 00:01:{second:02}"))
+                )
+
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        try:
+            started = time.monotonic()
+            messages = list(self.events.stream(subscription))
+            elapsed = time.monotonic() - started
+        finally:
+            stop.set()
+            publisher.join()
+        self.assertGreater(len(messages), 2)
+        self.assertLess(elapsed, 1)
+        self.assertFalse(subscription.dropped)
+        self.assertEqual(self.events.subscriber_count, 0)
+
+    def test_page_changes_send_reload(self):
+        subscription = self.events.subscribe(self.first)
+        subscription.get(0)
+        self.assertEqual(self.events.publish(self.first), 0)
+        self.assertIsNone(subscription.get(0))
+        changed = self.first._replace(
+            data={
+                **STATUS_PAGE,
+                "incidents": [{"title": "Slow searches", "content": "Slow"}],
+            }
+        )
+        self.assertEqual(self.events.publish(changed), 0)
+        self.assertEqual(parse_event(subscription.get(0)), ("reload", {}))
+        self.assertEqual(self.events.publish(changed), 0)
+        self.assertIsNone(subscription.get(0))
@@ -0,0 +1,64 @@
+import unittest
+
+import requests_mock
+
+from app import create_app
+from app.lib.status_poller import StatusPagePoller
+from app.lib.uptime_kuma_api.heartbeat import Heartbeat
+
+UPTIME_KUMA_URL = "http://uptime-kuma.test"
+
+
+class StatusPagePollerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("config.Test")
+        self.app.config["UPTIME_KUMA_URL"] = UPTIME_KUMA_URL
+        self.app.config["UPTIME_KUMA_STATUS_PAGE_SLUG"] = "test"
+        self.poller = StatusPagePoller(self.app)
+
+    def test_disabled_without_settings(self):
+        poller = StatusPagePoller(create_app("config.Test"))
+        self.assertFalse(poller.enabled)
+        self.assertIsNone(poller.get_snapshot())
+
+    def test_refresh_publishes_snapshot(self):
+        with requests_mock.Mocker() as m:
+            m.get(f"{UPTIME_KUMA_URL}/api/status-page/test", json={"config": {}})
+            m.get(
+                f"{UPTIME_KUMA_URL}/api/status-page/heartbeat/test",
+                json={"heartbeatList": {}},
+            )
+            snapshot = self.poller.refresh()
+        self.assertEqual(snapshot.data, {"config": {}})
+        self.assertEqual(snapshot.heartbeats, {"heartbeatList": {}})
+        self.assertIs(self.poller._snapshot, snapshot)
+
+    def test_heartbeats_are_records(self):
+        with requests_mock.Mocker() as m:
+            m.get(f"{UPTIME_KUMA_URL}/api/status-page/test", json={"config": {}})
+            m.get(
+                f"{UPTIME_KUMA_URL}/api/status-page/heartbeat/test",
+                json={
+                    "heartbeatList": {
+                        "1": [{"status": 0, "time": "2003-02-01 00:00:00"}]
+                    },
+                    "uptimeList": {"1_24": 1},
+                },
+            )
+            snapshot = self.poller.refresh()
+        heartbeat = snapshot.heartbeats["heartbeatList"]["1"][0]
+        self.assertIsInstance(heartbeat, Heartbeat)
+        self.assertEqual(heartbeat.pretty_time, "1 February 2003, 00:00")
+        self.assertEqual(snapshot.heartbeats["uptimeList"], {"1_24": 1})
+
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        with requests_mock.Mocker() as m:
+            m.get(f"{UPTIME_KUMA_URL}/api/status-page/test", json={"config": {}})
+            m.get(
+                f"{UPTIME_KUMA_URL}/api/status-page/heartbeat/test",
+                json={"heartbeatList": {}},
+            )
+            snapshot = self.poller.refresh()
+            m.get(f"{UPTIME_KUMA_URL}/api/status-page/test", status_code=500)
+            self.assertIsNone(self.poller.refresh())
+        self.assertIs(self.poller._snapshot, snapshot)
@@ -1,6 +1,6 @@
 import unittest
 
-from app.lib.template_filters import previous_incidents
+from app.lib.template_filters import heartbeats_version, previous_incidents
 
 
 class TemplateFiltersTestCase(unittest.TestCase):
@@ -109,3 +109,14 @@ class TemplateFiltersTestCase(unittest.TestCase):
         self.assertFalse(result[1].get("has_start"))
         self.assertTrue(result[1].get("has_end"))
         self.assertIsNotNone(result[1].get("duration_seconds"))
+
+    def test_heartbeats_version(self):
+        heartbeats = [
+            {"status": 1, "time": "2003-02-01T00:00:00"},
+            {"status": 1, "time": "2003-02-01T00:01:00"},
+        ]
+        version = heartbeats_version(heartbeats)
+        self.assertEqual(heartbeats_version([]), "0")
+        self.assertEqual(heartbeats_version(list(heartbeats)), version)
+        heartbeats.append({"status": 0, "time": "2003-02-01T00:02:00"})
+        self.assertNotEqual(heartbeats_version(heartbeats), version)
@@ -0,0 +1,139 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.lib.uptime_kuma_api import MonitorStatus, Timeout, UptimeKumaApi
+
+
+@mock.patch.object(UptimeKumaApi, "connect", lambda self: None)
+class UptimeKumaApiTestCase(unittest.TestCase):
+    def test_get_monitors_beats_is_concurrent(self):
+        api = UptimeKumaApi("http://uptime-kuma.test")
+        barrier = threading.Barrier(3, timeout=1)
+
+        def get_monitor_beats(id_, hours, series=False):
+            barrier.wait()
+            return [{"monitor_id": id_, "hours": hours}]
+
+        with mock.patch.object(api, "get_monitor_beats", get_monitor_beats):
+            result = api.get_monitors_beats([1, 2, 3], 24, max_workers=3)
+        self.assertEqual(
+            result,
+            {
+                1: [{"monitor_id": 1, "hours": 24}],
+                2: [{"monitor_id": 2, "hours": 24}],
+                3: [{"monitor_id": 3, "hours": 24}],
+            },
+        )
+
+    def test_get_monitors_beats_deadline(self):
+        api = UptimeKumaApi("http://uptime-kuma.test")
+
+        def get_monitor_beats(id_, hours, series=False):
+            time.sleep(0.5 if id_ == 2 else 0)
+            return []
+
+        with mock.patch.object(api, "get_monitor_beats", get_monitor_beats):
+            with self.assertRaises(Timeout):
+                api.get_monitors_beats([1, 2], 24, timeout=0.1)
+
+    def test_busy_events_do_not_delay_calls(self):
+        api = UptimeKumaApi("http://uptime-kuma.test", wait_events=0.1, timeout=5)
+        stop = threading.Event()
+
+        def push():
+            # a busy Uptime Kuma sends an average ping with every heartbeat
+            while not stop.is_set():
+                api._event_avg_ping("1", 10)
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=push)
+        thread.start()
+        try:
+            started = time.monotonic()
+            self.assertEqual(api.avg_ping(), {1: 10})
+            self.assertLess(time.monotonic() - started, 1)
+            started = time.monotonic()
+            api.avg_ping()
+            self.assertLess(time.monotonic() - started, 0.05)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_heartbeats_are_shared_snapshots(self):
+        api = UptimeKumaApi("http://uptime-kuma.test", wait_events=0)
+        api._event_heartbeat_list("1", [{"id": 1, "status": 1, "important": 0}], True)
+        api._event_heartbeat_list("2", [{"id": 2, "status": 0, "important": 1}], True)
+        first = api.get_heartbeats()
+        self.assertIs(first, api.get_heartbeats())
+        self.assertEqual(first[1][0]["status"], MonitorStatus.UP)
+        self.assertFalse(first[1][0]["important"])
+        with self.assertRaises(TypeError):
+            first[1][0]["status"] = 0
+
+        api._event_heartbeat({"id": 3, "monitorID": 1, "status": 0, "important": 1})
+        second = api.get_heartbeats()
+        self.assertEqual(len(first[1]), 1)
+        self.assertEqual(len(second[1]), 2)
+        self.assertIs(first[2], second[2])
+        self.assertEqual(api.get_important_heartbeats()[1][0]["id"], 3)
+
+    def test_monitors_are_parsed_once(self):
+        api = UptimeKumaApi("http://uptime-kuma.test", wait_events=0)
+        api._call = lambda event, data=None: {}
+        api._event_monitor_list(
+            {
+                "1": {
+                    "id": 1,
+                    "type": "http",
+                    "active": 1,
+                    "notificationIDList": {"2": True},
+                }
+            }
+        )
+        monitors = api.get_monitors()
+        self.assertTrue(monitors[0]["active"])
+        self.assertEqual(monitors[0]["notificationIDList"], [2])
+        self.assertIs(monitors[0], api.get_monitors()[0])
+
+    def test_monitor_tags_update_the_shared_monitor_list(self):
+        api = UptimeKumaApi("http://uptime-kuma.test", wait_events=0)
+        monitor = {"id": 1, "type": "http", "active": 1, "notificationIDList": {}}
+        tag = {"monitor_id": 1, "tag_id": 2, "value": "live"}
+        api._event_monitor_list({"1": {**monitor, "tags": []}})
+        server_tags = []
+
+        def call(event, data=None):
+            if event == "addMonitorTag":
+                server_tags.append(tag)
+            elif event == "deleteMonitorTag":
+                server_tags.remove(tag)
+            elif event == "getMonitor":
+                return {"monitor": {**monitor, "tags": list(server_tags)}}
+            return {"msg": "OK"}
+
+        api._call = call
+        before = api.get_monitors()
+        api.add_monitor_tag(2, 1, "live")
+        self.assertEqual(api.get_monitors()[0]["tags"], [tag])
+        self.assertEqual(before[0]["tags"], [])
+        self.assertTrue(api.get_monitors()[0]["active"])
+        api.delete_monitor_tag(2, 1, "live")
+        self.assertEqual(api.get_monitors()[0]["tags"], [])
+
+    def test_timing_listeners(self):
+        api = UptimeKumaApi("http://uptime-kuma.test", wait_events=0)
+        timings = []
+        api.timing_listeners.append(lambda name, seconds, error: timings.append(name))
+
+        def emit(event, data, callback):
+            callback({"ok": True, "data": []})
+
+        with mock.patch.object(api.sio, "emit", emit):
+            api.get_monitor_beats(1, 24)
+            api._event_monitor_list({})
+            api.get_monitors()
+        self.assertEqual(
+            timings, ["getMonitorBeats", "getMonitorList", "monitorList-wait"]
+        )
@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests_mock
+from tna_utilities.api import ResourceNotFoundError
+
+from app.lib.uptime_kuma_http import UptimeKumaHttpClient
+
+UPTIME_KUMA_URL = "http://uptime-kuma.test"
+
+
+class SlowJsonHandler(BaseHTTPRequestHandler):
+    delay = 0.2
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UptimeKumaHttpClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = UptimeKumaHttpClient(UPTIME_KUMA_URL, pool_size=4)
+        self.timings = []
+        self.client.timing_listeners.append(
+            lambda path, seconds, error: self.timings.append(path)
+        )
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_get_many_runs_requests_concurrently(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SlowJsonHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = UptimeKumaHttpClient(f"http://127.0.0.1:{server.server_address[1]}")
+        try:
+            started = time.monotonic()
+            results = client.get_many(["a", "b", "c"])
+            elapsed = time.monotonic() - started
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(results, [{"path": f"/api/{path}"} for path in "abc"])
+        self.assertLess(elapsed, SlowJsonHandler.delay * 2)
+
+    def test_session_is_reused(self):
+        with requests_mock.Mocker() as m:
+            m.get(f"{UPTIME_KUMA_URL}/api/a", json={})
+            self.client.get("a")
+            session = self.client._session
+            self.client.get_many(["a", "a"])
+        self.assertIs(self.client._session, session)
+
+    def test_get_many_reports_timings(self):
+        with requests_mock.Mocker() as m:
+            m.get(f"{UPTIME_KUMA_URL}/api/a", json={})
+            m.get(f"{UPTIME_KUMA_URL}/api/b", json={})
+            self.client.get_many(["a", "b"])
+        self.assertEqual(sorted(self.timings), ["a", "b"])
+
+    def test_get_many_raises_errors(self):
+        with requests_mock.Mocker() as m:
+            m.get(f"{UPTIME_KUMA_URL}/api/a", json={})
+            m.get(f"{UPTIME_KUMA_URL}/api/b", status_code=404)
+            with self.assertRaises(ResourceNotFoundError):
+                self.client.get_many(["a", "b"])
+        self.assertEqual(sorted(self.timings), ["a", "b"])
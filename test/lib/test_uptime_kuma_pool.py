@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from app import create_app
+from app.lib.uptime_kuma_api import Timeout
+from app.lib.uptime_kuma_pool import UptimeKumaSessionPool
+
+
+class FakeSocket:
+    def __init__(self):
+        self.connected = True
+        self.sid = "sid-1"
+
+
+class FakeUptimeKumaApi:
+    def __init__(self, url):
+        self.url = url
+        self.sio = FakeSocket()
+        self.logins = 0
+        self.disconnected = False
+        self.timing_listeners = []
+
+    def login_by_token(self, token):
+        self.logins += 1
+
+    def disconnect(self):
+        self.disconnected = True
+        self.sio.connected = False
+
+
+@mock.patch("app.lib.uptime_kuma_pool.UptimeKumaApi", FakeUptimeKumaApi)
+class UptimeKumaSessionPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("config.Test")
+        self.app.config["UPTIME_KUMA_URL"] = "http://uptime-kuma.test"
+        self.app.config["UPTIME_KUMA_POOL_SIZE"] = 1
+        self.app.config["UPTIME_KUMA_POOL_TIMEOUT"] = 0
+        self.pool = UptimeKumaSessionPool(self.app)
+
+    def test_sessions_are_reused(self):
+        with self.pool.session() as first:
+            self.assertEqual(first.logins, 1)
+        with self.pool.session() as second:
+            self.assertIs(first, second)
+        self.assertEqual(second.logins, 1)
+
+    def test_pool_is_bounded(self):
+        with self.pool.session():
+            with self.assertRaises(Timeout):
+                with self.pool.session():
+                    pass
+
+    def test_disconnected_sessions_are_replaced(self):
+        with self.pool.session() as first:
+            first.sio.connected = False
+        with self.pool.session() as second:
+            self.assertIsNot(first, second)
+        self.assertTrue(first.disconnected)
+
+    def test_reconnected_sessions_log_in_again(self):
+        with self.pool.session() as api:
+            api.sio.sid = "sid-2"
+        with self.pool.session() as api:
+            self.assertEqual(api.logins, 2)
+
+    def test_failed_sessions_are_closed(self):
+        with self.assertRaises(ValueError):
+            with self.pool.session() as first:
+                raise ValueError()
+        self.assertTrue(first.disconnected)
+        with self.pool.session() as second:
+            self.assertIsNot(first, second)
+
+    def test_drain(self):
+        with self.pool.session() as api:
+            pass
+        self.pool.drain()
+        self.assertTrue(api.disconnected)
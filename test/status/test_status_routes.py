@@ -0,0 +1,299 @@
+import time
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+from app import create_app
+from app.lib.cache import cache
+from app.lib.metrics import metrics
+from app.lib.monitor_directory import MonitorDirectory
+from app.lib.status_events import status_events
+from app.lib.status_poller import StatusPageSnapshot, status_poller
+from app.lib.uptime_kuma_api import HeartbeatSeries
+from app.lib.uptime_kuma_api.monitor_type import MonitorType
+from app.lib.uptime_kuma_pool import uptime_kuma_pool
+
+
+class FakeUptimeKumaApi:
+    """A session that knows about a group monitor and its two children."""
+
+    def __init__(self):
+        self.monitors = [
+            {"id": 1, "name": "Services", "type": MonitorType.GROUP},
+            {"id": 2, "name": "Web", "type": MonitorType.HTTP, "childrenIDs": []},
+            {"id": 3, "name": "API", "type": MonitorType.HTTP, "childrenIDs": []},
+        ]
+        self.monitors[0]["childrenIDs"] = [2, 3]
+        self.heartbeats = {
+            id_: [{"status": 1, "time": "2003-02-01 00:01:00"}] for id_ in [1, 2, 3]
+        }
+
+    def get_monitors(self):
+        return self.monitors
+
+    def get_heartbeats(self):
+        return self.heartbeats
+
+    def avg_ping(self):
+        return {id_: 100 for id_ in self.heartbeats}
+
+    def uptime(self):
+        return {id_: {24: 1, 720: 1, "1y": 1} for id_ in self.heartbeats}
+
+    def get_monitors_beats(self, ids, hours, max_workers=4, timeout=None, series=False):
+        return {
+            id_: HeartbeatSeries.from_heartbeats(id_, self.heartbeats[id_])
+            for id_ in ids
+        }
+
+
+class StatusBlueprintTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("config.Test")
+        self.app.config["UPTIME_KUMA_URL"] = "http://uptime-kuma.test"
+        self.app.config["UPTIME_KUMA_STATUS_PAGE_SLUG"] = "test"
+        status_poller.init_app(self.app)
+        status_poller.start = lambda: None
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        del status_poller.start
+        status_poller._snapshot = None
+        status_poller._ready.clear()
+
+    def publish(self, data, heartbeats):
+        status_poller._snapshot = StatusPageSnapshot(
+            data=data,
+            heartbeats=heartbeats,
+            fetched_at=time.time(),
+            directory=MonitorDirectory(data),
+        )
+        status_poller._ready.set()
+
+    def test_index_renders_from_snapshot(self):
+        self.publish(
+            {
+                "config": {"title": "Test services"},
+                "publicGroupList": [
+                    {"name": "Services", "monitorList": [{"id": 1, "name": "Web"}]}
+                ],
+            },
+            {
+                "heartbeatList": {
+                    "1": [
+                        {"status": 1, "time": "2003-02-01 00:00:00"},
+                        {"status": 0, "time": "2003-02-01 00:01:00"},
+                    ]
+                }
+            },
+        )
+        rv = self.client.get("/status/")
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn("Test services", rv.text)
+        self.assertIn('id="service-web"', rv.text)
+
+    def test_events_stream_starts_with_snapshot(self):
+        self.publish(
+            {
+                "publicGroupList": [
+                    {"name": "Services", "monitorList": [{"id": 1, "name": "Web"}]}
+                ]
+            },
+            {"heartbeatList": {"1": [{"status": 0, "time": "2003-02-01 00:01:00"}]}},
+        )
+        status_events.keepalive = 0.01
+        status_events.max_duration = 0.05
+        rv = self.client.get("/status/events")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.mimetype, "text/event-stream")
+        self.assertIn("event: snapshot", rv.text)
+        self.assertIn('"slug":"web","time":"2003-02-01 00:01:00"', rv.text)
+
+    def publish_two_monitors(self, api_time):
+        self.publish(
+            {
+                "publicGroupList": [
+                    {
+                        "name": "Services",
+                        "monitorList": [
+                            {"id": 1, "name": "Web"},
+                            {"id": 2, "name": "API"},
+                        ],
+                    }
+                ],
+                "config": {"title": "Test services"},
+                "incidents": [],
+                "maintenanceList": [],
+            },
+            {
+                "heartbeatList": {
+                    "1": [
+                        {"status": 1, "time": "2003-01-31 23:59:00"},
+                        {"status": 0, "time": "2003-02-01 00:00:00"},
+                        {"status": 1, "time": "2003-02-01 00:01:00"},
+                    ],
+                    "2": [{"status": 1, "time": api_time}],
+                }
+            },
+        )
+
+    def test_snapshot_api(self):
+        self.publish_two_monitors("2003-02-01 00:02:00")
+        rv = self.client.get("/status/api/snapshot")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.json["version"], 1044057720000)
+        self.assertEqual(
+            [(m["slug"], m["status"]) for m in rv.json["monitors"]],
+            [("web", 1), ("api", 1)],
+        )
+        self.assertEqual(
+            rv.json["monitors"][0]["incidents"],
+            [
+                {
+                    "status": 0,
+                    "start": "2003-02-01 00:00:00",
+                    "end": "2003-02-01 00:01:00",
+                    "duration_seconds": 60,
+                }
+            ],
+        )
+        etag = rv.headers["ETag"]
+        rv = self.client.get("/status/api/snapshot", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 304)
+        self.publish_two_monitors("2003-02-01 00:03:00")
+        rv = self.client.get("/status/api/snapshot", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers["ETag"], etag)
+
+    def test_snapshot_api_since(self):
+        self.publish_two_monitors("2003-02-01 00:02:00")
+        rv = self.client.get("/status/api/snapshot?since=1044057660000")
+        self.assertEqual([m["slug"] for m in rv.json["monitors"]], ["api"])
+        self.assertEqual(rv.json["since"], 1044057660000)
+        rv = self.client.get("/status/api/snapshot?since=yesterday")
+        self.assertEqual(rv.status_code, 400)
+
+    def test_index_conditional_get(self):
+        self.publish_two_monitors("2003-02-01 00:02:00")
+        rv = self.client.get("/status/")
+        self.assertEqual(rv.status_code, 200)
+        etag = rv.headers["ETag"]
+        self.assertEqual(rv.headers["Last-Modified"], "Sat, 01 Feb 2003 00:02:00 GMT")
+        with mock.patch("app.status.routes.render_template") as render_template:
+            rv = self.client.get("/status/", headers={"If-None-Match": etag})
+            self.assertEqual(rv.status_code, 304)
+            rv = self.client.get(
+                "/status/",
+                headers={"If-Modified-Since": "Sat, 01 Feb 2003 00:02:00 GMT"},
+            )
+            self.assertEqual(rv.status_code, 304)
+            rv = self.client.get(
+                "/status/", headers={"If-None-Match": etag[:-1] + '-gzip"'}
+            )
+            self.assertEqual(rv.status_code, 304)
+        render_template.assert_not_called()
+        rv = self.client.get("/status/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(rv.headers["Content-Encoding"], "gzip")
+        self.assertEqual(rv.headers["ETag"], etag[:-1] + '-gzip"')
+        rv = self.client.get("/status/?refresh", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 200)
+        self.publish_two_monitors("2003-02-01 00:03:00")
+        # the cached page is still from the old data
+        rv = self.client.get("/status/", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 304)
+        cache.clear()
+        rv = self.client.get("/status/", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers["ETag"], etag)
+
+    def test_index_etag_changes_with_monitor_urls(self):
+        self.publish_two_monitors("2003-02-01 00:02:00")
+        etag = self.client.get("/status/").headers["ETag"]
+        status_poller._snapshot.data["publicGroupList"][0]["monitorList"][0][
+            "url"
+        ] = "https://example.com"
+        cache.clear()
+        rv = self.client.get("/status/", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn("https://example.com", rv.text)
+
+    def test_index_monitor_fragments(self):
+        def fragment_keys():
+            return {
+                key
+                for key in cache.cache._cache
+                if "_template_fragment_cache_status-index-monitor" in key
+            }
+
+        self.publish_two_monitors("2003-02-01 00:02:00")
+        self.client.get("/status/")
+        first = fragment_keys()
+        self.assertEqual(len(first), 2)
+        self.publish_two_monitors("2003-02-01 00:03:00")
+        rv = self.client.get("/status/?refresh")
+        self.assertIn('id="service-api"', rv.text)
+        # only the monitor with a new heartbeat is rendered again
+        self.assertEqual(len(fragment_keys() - first), 1)
+
+    def test_details_conditional_get(self):
+        self.app.config["UPTIME_KUMA_JWT"] = "jwt"
+        self.app.config["DETAILED_SERVICE_REPORT_CACHE_DURATION"] = 60
+        self.publish(
+            {
+                "publicGroupList": [
+                    {"name": "Groups", "monitorList": [{"id": 1, "name": "Services"}]}
+                ]
+            },
+            {"heartbeatList": {"1": [{"status": 1, "time": "2003-02-01 00:01:00"}]}},
+        )
+        api = FakeUptimeKumaApi()
+        sessions = []
+
+        @contextmanager
+        def session():
+            sessions.append(api)
+            yield api
+
+        with mock.patch.object(uptime_kuma_pool, "session", session):
+            rv = self.client.get("/status/services/")
+            self.assertEqual(rv.status_code, 200)
+            self.assertIn('id="monitor-web"', rv.text)
+            self.assertEqual(
+                rv.headers["Last-Modified"], "Sat, 01 Feb 2003 00:01:00 GMT"
+            )
+            etag = rv.headers["ETag"]
+            page_cache = metrics.page_cache.state()
+            rv = self.client.get("/status/services/", headers={"If-None-Match": etag})
+            self.assertEqual(rv.status_code, 304)
+            # answered from the version saved with the page, without reading the
+            # cached page or using Uptime Kuma
+            self.assertEqual(metrics.page_cache.state(), page_cache)
+            self.assertEqual(len(sessions), 1)
+            # a new heartbeat for a child that isn't on the status page
+            api.heartbeats[3] = api.heartbeats[3] + [
+                {"status": 0, "time": "2003-02-01 00:02:00"}
+            ]
+            cache.clear()
+            rv = self.client.get("/status/services/", headers={"If-None-Match": etag})
+            self.assertEqual(rv.status_code, 200)
+            self.assertNotEqual(rv.headers["ETag"], etag)
+
+    def test_index_without_snapshot(self):
+        status_poller.wait_timeout = 0
+        rv = self.client.get("/status/")
+        self.assertEqual(rv.status_code, 502)
+
+    def test_details_unknown_monitor(self):
+        self.app.config["UPTIME_KUMA_JWT"] = "jwt"
+        self.publish(
+            {
+                "publicGroupList": [
+                    {"name": "Services", "monitorList": [{"id": 1, "name": "Web"}]}
+                ]
+            },
+            {"heartbeatList": {}},
+        )
+        with mock.patch.object(uptime_kuma_pool, "session") as session:
+            rv = self.client.get("/status/not-a-monitor/")
+        self.assertEqual(rv.status_code, 404)
+        session.assert_not_called()